@@ -10,8 +10,88 @@ import yaml
 import argparse
 import subprocess
 import shutil
+import hashlib
+import pickle
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+# 优先使用 libyaml 的 C 实现解析/输出 YAML，未编译 C 扩展时回退到纯 Python 实现
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+# 解析后的配置缓存目录，缓存文件以 (路径, mtime, 大小) 为键，配置文件变化后自动失效
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'ai_edge'
+
+
+def _cache_prefix(path: Path) -> str:
+    """同一配置文件的各版本缓存共用的文件名前缀"""
+    return f"deploy_config.{hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:12]}"
+
+
+def _invalidate_cache(path: Path):
+    """删除配置文件的所有缓存"""
+    for stale in CACHE_DIR.glob(f"{_cache_prefix(path)}.*.pkl"):
+        try:
+            stale.unlink()
+        except OSError:
+            pass
+
+
+def _probe(cmd: List[str]) -> Tuple[bool, str]:
+    """执行一条检查命令，返回 (是否成功, 标准输出)"""
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        return True, result.stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False, ''
+
+
+def _run_probes(probes: Dict[str, List[str]]) -> Dict[str, Tuple[bool, str]]:
+    """并发执行互不依赖的检查命令，总耗时约为最慢的一条"""
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = {name: executor.submit(_probe, cmd) for name, cmd in probes.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def _cached_load(path: Path, stat: Optional[os.stat_result] = None) -> Dict:
+    """
+    加载 YAML 配置，文件未变化时直接读取 pickle 缓存
+    
+    缓存目录不可写或缓存损坏时退化为直接解析，不影响命令执行；
+    调用方已 stat 过文件时可传入 stat 结果复用
+    """
+    if stat is None:
+        stat = path.stat()
+    state = hashlib.sha1(f"{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:12]
+    cache_file = CACHE_DIR / f"{_cache_prefix(path)}.{state}.pkl"
+    
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError):
+        pass
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        config = yaml.load(f, Loader=SafeLoader)
+    
+    try:
+        _invalidate_cache(path)
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再原子替换，并发执行的命令不会读到半个缓存文件
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_file)
+    except OSError:
+        pass
+    
+    return config
+
 
 class DeploymentManager:
     """部署管理器"""
@@ -25,17 +105,20 @@ class DeploymentManager:
     def _load_config(self) -> Dict:
         """加载配置文件"""
         config_file = Path(__file__).parent / self.config_path
-        if not config_file.exists():
-            raise FileNotFoundError(f"配置文件不存在: {config_file}")
+        # 一次 stat 同时完成存在性检查和缓存键计算
+        try:
+            stat = config_file.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"配置文件不存在: {config_file}") from None
             
-        with open(config_file, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        return _cached_load(config_file, stat)
     
     def _save_config(self):
         """保存配置文件"""
         config_file = Path(__file__).parent / self.config_path
         with open(config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(self.config, f, default_flow_style=False, allow_unicode=True)
+            yaml.dump(self.config, f, Dumper=SafeDumper, default_flow_style=False, allow_unicode=True)
+        _invalidate_cache(config_file)
     
     def list_platforms(self) -> List[str]:
         """列出支持的平台"""
@@ -47,7 +130,7 @@ class DeploymentManager:
     
     def set_platform(self, platform: str):
         """设置当前平台"""
-        if platform not in self.list_platforms():
+        if platform not in self.config['platforms']:
             raise ValueError(f"不支持的平台: {platform}. 支持的平台: {self.list_platforms()}")
         
         self.config['deployment']['platform'] = platform
@@ -79,13 +162,19 @@ class DeploymentManager:
             
         print(f"🔍 检查 {platform} 平台要求...")
         
+        # Docker 检查与平台命令检查互不依赖，一起并发执行
+        probes = dict(self._DOCKER_PROBES)
+        if platform == "nvidia_gpu":
+            probes.update(self._NVIDIA_PROBES)
+        results = _run_probes(probes)
+        
         # 检查Docker
-        if not self._check_docker():
+        if not self._check_docker(results):
             return False
             
         # 检查平台特定要求
         if platform == "nvidia_gpu":
-            return self._check_nvidia_requirements()
+            return self._check_nvidia_requirements(results)
         elif platform == "atlas_npu":
             return self._check_atlas_requirements()
         elif platform == "cpu":
@@ -93,39 +182,60 @@ class DeploymentManager:
         
         return True
     
-    def _check_docker(self) -> bool:
+    _DOCKER_PROBES = {
+        'docker': ['docker', '--version'],
+        'compose': ['docker', 'compose', 'version'],
+    }
+    _NVIDIA_PROBES = {
+        'nvidia_smi': ['nvidia-smi', '--query-gpu=driver_version', '--format=csv,noheader'],
+    }
+    _NVIDIA_DOCKER_PROBE = ['docker', 'run', '--rm', '--gpus', 'all',
+                            'nvidia/cuda:11.8-base-ubuntu20.04', 'nvidia-smi']
+    # 容器 GPU 运行时检查成功后的标记有效期（秒）
+    _NVIDIA_PROBE_TTL = 24 * 3600
+    
+    def _check_docker(self, results: Optional[Dict[str, Tuple[bool, str]]] = None) -> bool:
         """检查Docker是否可用"""
-        try:
-            result = subprocess.run(['docker', '--version'], 
-                                  capture_output=True, text=True, check=True)
-            print(f"✅ Docker: {result.stdout.strip()}")
-            
-            # 检查Docker Compose
-            result = subprocess.run(['docker', 'compose', 'version'], 
-                                  capture_output=True, text=True, check=True)
-            print(f"✅ Docker Compose: {result.stdout.strip()}")
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        if results is None:
+            results = _run_probes(self._DOCKER_PROBES)
+        (docker_ok, docker_out), (compose_ok, compose_out) = results['docker'], results['compose']
+        if not (docker_ok and compose_ok):
             print("❌ Docker或Docker Compose未安装或不可用")
             return False
+        print(f"✅ Docker: {docker_out}")
+        print(f"✅ Docker Compose: {compose_out}")
+        return True
     
-    def _check_nvidia_requirements(self) -> bool:
+    def _check_nvidia_requirements(self, results: Optional[Dict[str, Tuple[bool, str]]] = None) -> bool:
         """检查NVIDIA GPU要求"""
+        if results is None:
+            results = _run_probes(self._NVIDIA_PROBES)
+        smi_ok, driver_versions = results['nvidia_smi']
+        if not smi_ok:
+            print("❌ NVIDIA GPU驱动或Docker运行时不可用")
+            return False
+        print("✅ NVIDIA GPU驱动可用")
+        
+        # 启动 CUDA 容器需要数秒，同一驱动版本下检查成功后缓存结果
+        driver = driver_versions.splitlines()[0].strip() if driver_versions else 'unknown'
+        marker = CACHE_DIR / f"nvidia_probe_ok.{driver}"
         try:
-            # 检查nvidia-smi
-            result = subprocess.run(['nvidia-smi'], 
-                                  capture_output=True, text=True, check=True)
-            print("✅ NVIDIA GPU驱动可用")
-            
-            # 检查nvidia-docker
-            result = subprocess.run(['docker', 'run', '--rm', '--gpus', 'all', 
-                                   'nvidia/cuda:11.8-base-ubuntu20.04', 'nvidia-smi'], 
-                                  capture_output=True, text=True, check=True)
-            print("✅ NVIDIA Docker运行时可用")
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
+            if time.time() - marker.stat().st_mtime < self._NVIDIA_PROBE_TTL:
+                print("✅ NVIDIA Docker运行时可用")
+                return True
+        except OSError:
+            pass
+        
+        if not _probe(self._NVIDIA_DOCKER_PROBE)[0]:
             print("❌ NVIDIA GPU驱动或Docker运行时不可用")
             return False
+        print("✅ NVIDIA Docker运行时可用")
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            marker.touch()
+        except OSError:
+            pass
+        return True
     
     def _check_atlas_requirements(self) -> bool:
         """检查Atlas NPU要求"""
@@ -167,7 +277,7 @@ class DeploymentManager:
         if platform is None:
             platform = self.get_current_platform()
         
-        if platform not in self.list_platforms():
+        if platform not in self.config['platforms']:
             raise ValueError(f"不支持的平台: {platform}")
         
         print(f"🚀 开始部署 {platform} 平台...")
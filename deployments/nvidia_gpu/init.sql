@@ -146,7 +146,7 @@ CREATE TABLE IF NOT EXISTS alerts (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (task_id) REFERENCES tasks(id) ON DELETE SET NULL,
     INDEX idx_task_status (task_id, status),
-    INDEX idx_created_at (created_at DESC)
+    INDEX idx_created_at (created_at DESC, id DESC)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='告警记录表';
 
 CREATE TABLE IF NOT EXISTS operation_logs (
@@ -197,4 +197,8 @@ ON DUPLICATE KEY UPDATE description=VALUES(description), recommended_models=VALU
 CREATE INDEX idx_models_status ON models(status);
 CREATE INDEX idx_tasks_status ON tasks(status);
 CREATE INDEX idx_alerts_task_status ON alerts(task_id, status);
-CREATE INDEX idx_alerts_created_at ON alerts(created_at DESC); 
\ No newline at end of file
+CREATE INDEX idx_alerts_created_at ON alerts(created_at DESC, id DESC);
+
+-- 关键词搜索使用的全文索引（ngram 解析器支持中文）
+CREATE FULLTEXT INDEX ft_models_name_description ON models(name, description) WITH PARSER ngram;
+CREATE FULLTEXT INDEX ft_alerts_title_description ON alerts(title, description) WITH PARSER ngram; 
\ No newline at end of file
@@ -8,6 +8,7 @@ import os
 import sys
 import logging
 import argparse
+from importlib.util import find_spec
 
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -23,30 +24,30 @@ def check_dependencies():
     """检查依赖"""
     print("🔍 检查依赖...")
     
-    try:
-        import fastapi
-        import uvicorn
-        import numpy
-        import cv2
-        import onnxruntime
-        print("✅ 基础依赖检查通过")
-        return True
-    except ImportError as e:
-        print(f"❌ 依赖检查失败: {e}")
-        print("请运行: pip install -r requirements/base.txt -r requirements/cpu.txt")
-        return False
+    # 只查找模块而不导入：cv2、onnxruntime 等导入耗时较长，且服务进程启动时还会再导入一次
+    for name in ('fastapi', 'uvicorn', 'numpy', 'cv2', 'onnxruntime'):
+        if find_spec(name) is None:
+            print(f"❌ 依赖检查失败: No module named '{name}'")
+            print("请运行: pip install -r requirements/base.txt -r requirements/cpu.txt")
+            return False
+    
+    print("✅ 基础依赖检查通过")
+    return True
 
 def check_model():
     """检查模型文件"""
     print("🔍 检查模型文件...")
     
     model_path = "models/onnx/person.onnx"
-    if os.path.exists(model_path):
-        print(f"✅ 找到模型文件: {model_path}")
-        return model_path
-    else:
+    try:
+        st = os.stat(model_path)
+    except FileNotFoundError:
         print(f"❌ 模型文件不存在: {model_path}")
         return None
+    
+    # 输出文件大小，便于发现空文件或未下载完整的模型
+    print(f"✅ 找到模型文件: {model_path} ({st.st_size / 1024 / 1024:.1f} MB)")
+    return model_path
 
 def test_inference_engine():
     """测试推理引擎"""
@@ -79,6 +80,7 @@ def main():
     parser.add_argument("--host", default="0.0.0.0", help="API服务主机")
     parser.add_argument("--platform", help="指定平台 (cpu_x86, cpu_arm, etc.)")
     parser.add_argument("--check-only", action="store_true", help="仅检查环境，不启动服务")
+    parser.add_argument("--reload", action="store_true", help="代码变更时自动重载服务（开发模式）")
     
     args = parser.parse_args()
     
@@ -117,7 +119,7 @@ def main():
             "api.main:app",
             host=args.host,
             port=args.port,
-            reload=True,
+            reload=args.reload,
             log_level="info"
         )
     except KeyboardInterrupt:
@@ -11,6 +11,15 @@ import argparse
 import logging
 import signal
 import atexit
+import functools
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import docker
+    DOCKER_SDK_AVAILABLE = True
+except ImportError:
+    DOCKER_SDK_AVAILABLE = False
 
 # 配置日志
 logging.basicConfig(
@@ -22,32 +31,87 @@ logger = logging.getLogger("local_backend")
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+_docker_client = None
+
+def get_docker_client():
+    """
+    获取 docker SDK 客户端，通过 UNIX socket 直接访问 Docker 守护进程
+    
+    未安装 docker 包或无法连接时返回 None，调用方回退到 docker 命令行
+    """
+    global _docker_client
+    if _docker_client is None:
+        _docker_client = False
+        if DOCKER_SDK_AVAILABLE:
+            try:
+                _docker_client = docker.from_env()
+            except docker.errors.DockerException as e:
+                logger.warning(f"无法连接Docker守护进程，改用docker命令行: {e}")
+    return _docker_client or None
+
 def check_docker_services():
     """检查必要的Docker服务是否运行"""
     required_services = ["ai_edge_unified_db", "ai_edge_unified_redis", "ai_edge_unified_frontend"]
     missing_services = []
     running_services = []
     
-    for service in required_services:
+    client = get_docker_client()
+    if client:
+        # 一次列出全部运行中的容器，代替每个服务一次 docker ps
         try:
-            result = subprocess.run(
-                ["docker", "ps", "--filter", f"name={service}", "--format", "{{.Names}}"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            if result.stdout.strip():
+            names = [c.name for c in client.containers.list()]
+        except docker.errors.APIError as e:
+            logger.error(f"检查Docker服务时出错: {e}")
+            return list(required_services), running_services
+        for service in required_services:
+            if any(service in name for name in names):
                 running_services.append(service)
             else:
                 missing_services.append(service)
-        except subprocess.CalledProcessError as e:
-            logger.error(f"检查Docker服务时出错: {e}")
+        return missing_services, running_services
+    
+    # 各服务的 docker ps 互不依赖，并发执行，总耗时取决于最慢的一次
+    with ThreadPoolExecutor(max_workers=len(required_services)) as executor:
+        results = list(executor.map(_probe_service, required_services))
+    
+    for service, running in zip(required_services, results):
+        if running:
+            running_services.append(service)
+        else:
             missing_services.append(service)
     
     return missing_services, running_services
 
+def _probe_service(service):
+    """通过 docker ps 检查单个服务容器是否在运行"""
+    try:
+        result = subprocess.run(
+            ["docker", "ps", "--filter", f"name={service}", "--format", "{{.Names}}"],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return bool(result.stdout.strip())
+    except subprocess.CalledProcessError as e:
+        logger.error(f"检查Docker服务时出错: {e}")
+        return False
+
 def check_service_health(service_name):
     """检查Docker服务的健康状态"""
+    client = get_docker_client()
+    if client:
+        try:
+            health = client.containers.get(service_name).attrs['State'].get('Health')
+        except docker.errors.DockerException as e:
+            logger.error(f"检查服务健康状态时出错: {e}")
+            return "unknown"
+        if not health:
+            logger.error(f"检查服务健康状态时出错: {service_name} 未配置健康检查")
+            return "unknown"
+        health_status = health['Status']
+        logger.info(f"服务 {service_name} 健康状态: {health_status}")
+        return health_status
+    
     try:
         result = subprocess.run(
             ["docker", "inspect", "--format", "{{.State.Health.Status}}", service_name],
@@ -69,16 +133,20 @@ def start_service(service_name):
     try:
         # 先尝试停止可能已经存在但不健康的容器
         try:
-            subprocess.run(
-                ["docker", "stop", f"ai_edge_unified_{service_name}"],
-                check=False,
-                capture_output=True
-            )
+            client = get_docker_client()
+            if client:
+                client.containers.get(f"ai_edge_unified_{service_name}").stop()
+            else:
+                subprocess.run(
+                    ["docker", "stop", f"ai_edge_unified_{service_name}"],
+                    check=False,
+                    capture_output=True
+                )
             logger.info(f"已停止现有的 {service_name} 容器")
         except:
             pass
         
-        # 启动服务
+        # 启动服务（docker SDK 不支持 compose，仍使用 docker-compose 命令）
         subprocess.run(
             ["docker-compose", "up", "-d", service_name],
             check=True
@@ -88,12 +156,16 @@ def start_service(service_name):
         # 等待服务健康
         if service_name == "db":
             logger.info("等待数据库服务就绪...")
-            for i in range(30):  # 最多等待30*2=60秒
+            # 指数退避：从 100ms 开始逐次翻倍，最长间隔 2 秒，最多等待 60 秒
+            delay = 0.1
+            deadline = time.monotonic() + 60
+            while time.monotonic() < deadline:
                 health = check_service_health(f"ai_edge_unified_{service_name}")
                 if health == "healthy":
                     logger.info("数据库服务已就绪")
                     return True
-                time.sleep(2)
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
             logger.warning("数据库服务未能在超时时间内就绪，但将继续尝试")
         
         return True
@@ -141,23 +213,32 @@ def setup_environment():
     # Python路径
     os.environ["PYTHONPATH"] = f"{os.getcwd()}/src"
 
-def start_backend_service():
-    """启动后端服务"""
+# 后端运行所需的本地目录
+_RUNTIME_DIRS = ("models", "logs", "alert_images")
+
+@functools.lru_cache(maxsize=None)
+def ensure_runtime_dirs():
+    """创建后端运行所需的目录（每个进程只执行一次）"""
+    for name in _RUNTIME_DIRS:
+        Path(name).mkdir(parents=True, exist_ok=True)
+
+def start_backend_service(reload=False):
+    """启动后端服务（reload 为 True 时启用代码变更自动重载，仅用于开发）"""
     logger.info("启动后端服务...")
     
     # 创建必要的目录
-    os.makedirs("models", exist_ok=True)
-    os.makedirs("logs", exist_ok=True)
-    os.makedirs("alert_images", exist_ok=True)
+    ensure_runtime_dirs()
     
     # 启动后端服务
     cmd = [
         "python", "-m", "uvicorn", 
         "src.api.main:app", 
         "--host", "0.0.0.0", 
-        "--port", "8000",
-        "--reload"  # 开发模式下自动重载
+        "--port", "8000"
     ]
+    if reload:
+        # 文件监视会额外启动一个进程并持续扫描源码，只在开发时按需开启
+        cmd.append("--reload")
     
     backend_process = subprocess.Popen(cmd)
     logger.info(f"后端服务已启动，进程ID: {backend_process.pid}")
@@ -183,6 +264,18 @@ def signal_handler(sig, frame, process):
 
 def show_docker_logs(service_name, lines=50):
     """显示Docker服务的日志"""
+    client = get_docker_client()
+    if client:
+        try:
+            output = client.containers.get(f"ai_edge_unified_{service_name}").logs(tail=lines)
+        except docker.errors.DockerException as e:
+            logger.error(f"获取 {service_name} 日志失败: {e}")
+            return
+        logger.info(f"{service_name} 服务的最近 {lines} 行日志:")
+        for line in output.decode('utf-8', errors='replace').splitlines():
+            print(f"  {line}")
+        return
+    
     try:
         result = subprocess.run(
             ["docker", "logs", f"ai_edge_unified_{service_name}", "--tail", str(lines)],
@@ -202,6 +295,7 @@ def main():
     parser.add_argument("--db-only", action="store_true", help="只启动数据库服务")
     parser.add_argument("--show-db-logs", action="store_true", help="显示数据库日志")
     parser.add_argument("--fix-db", action="store_true", help="尝试修复数据库")
+    parser.add_argument("--reload", action="store_true", help="代码变更时自动重载后端服务（开发模式）")
     args = parser.parse_args()
     
     if args.show_db_logs:
@@ -254,14 +348,15 @@ def main():
     setup_environment()
     
     # 启动后端服务
-    backend_process = start_backend_service()
+    backend_process = start_backend_service(reload=args.reload)
     
     # 注册清理函数
     atexit.register(cleanup, backend_process)
     
     # 注册信号处理
-    signal.signal(signal.SIGINT, lambda sig, frame: signal_handler(sig, frame, backend_process))
-    signal.signal(signal.SIGTERM, lambda sig, frame: signal_handler(sig, frame, backend_process))
+    handler = functools.partial(signal_handler, process=backend_process)
+    signal.signal(signal.SIGINT, handler)
+    signal.signal(signal.SIGTERM, handler)
     
     # 保持脚本运行
     try:
@@ -15,28 +15,36 @@ from contextlib import asynccontextmanager
 import time
 import concurrent.futures
 import base64
+import shutil
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, APIRouter, status, WebSocket, WebSocketDisconnect, Query, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 import uvicorn
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from inference.factory import InferenceFactory
+from inference.batcher import InferenceBatcher
 from utils.platform_detector import auto_detect_platform
 from utils.config_parser import ConfigParser
 
 # 数据库相关导入
-from database.database import DatabaseManager
-from database.repositories import ModelRepository, UserRepository, TaskRepository, AlertRepository, SystemConfigRepository
+from database.database import DatabaseManager, get_db
+from database.repositories import ModelRepository, UserRepository, TaskRepository, AlertRepository, SystemConfigRepository, ensure_fulltext_indexes
 from database.models import (
     Model, ModelCreate, ModelUpdate, ModelStatusUpdate, User, UserCreate, Task, TaskCreate, Alert, AlertCreate,
-    PaginatedModelResponse, PaginatedTaskResponse, PaginatedAlertResponse
+    PaginatedModelResponse, PaginatedTaskResponse, PaginatedAlertResponse, warmup as warmup_models
 )
 
 # 组件导入
@@ -51,6 +59,7 @@ logger = logging.getLogger(__name__)
 
 # 全局变量
 inference_engine = None
+inference_batcher = None
 app_config = None
 db_manager = None
 model_repository = None
@@ -72,6 +81,7 @@ async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     # 启动时初始化
     logger.info("🚀 AI Edge API服务启动中...")
+    warmup_models()
     await initialize_services()
     
     yield
@@ -81,11 +91,18 @@ async def lifespan(app: FastAPI):
     await cleanup_services()
 
 # 创建FastAPI应用
+# 安装了 orjson 时使用 ORJSONResponse（已启用 numpy 序列化），检测结果等大响应体序列化更快
+if ORJSON_AVAILABLE:
+    DefaultResponse = ORJSONResponse
+else:
+    DefaultResponse = JSONResponse
+
 app = FastAPI(
     title="AI Edge统一API",
     description="支持多平台的AI推理服务",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=DefaultResponse
 )
 
 # CORS配置
@@ -105,7 +122,7 @@ app.mount("/alert_images", StaticFiles(directory=ALERT_IMAGE_DIR), name="alert_i
 
 async def initialize_services():
     """初始化服务"""
-    global inference_engine, app_config, db_manager, model_repository, user_repository
+    global inference_engine, inference_batcher, app_config, db_manager, model_repository, user_repository
     global task_repository, alert_repository, config_repository, current_model, task_scheduler
     
     try:
@@ -127,7 +144,7 @@ async def initialize_services():
         
         for attempt in range(1, max_retries + 1):
             try:
-                db_manager = DatabaseManager()
+                db_manager = get_db()
                 model_repository = ModelRepository()
                 user_repository = UserRepository()
                 task_repository = TaskRepository()
@@ -149,6 +166,15 @@ async def initialize_services():
                 else:
                     logger.error("❌ 数据库连接最终失败，服务将在无数据库模式下启动")
         
+        # 为旧数据库补建关键词搜索使用的 FULLTEXT 索引（init.sql 只在首次建库时执行）
+        if db_connected:
+            try:
+                created = await asyncio.to_thread(ensure_fulltext_indexes, db_manager)
+                if created:
+                    logger.info(f"已补建 FULLTEXT 索引: {', '.join(created)}")
+            except Exception as e:
+                logger.warning(f"检查 FULLTEXT 索引失败，关键词搜索使用 LIKE: {e}")
+        
         # 2. 获取平台参数
         platform = os.getenv('PLATFORM')
         if not platform:
@@ -212,6 +238,8 @@ async def initialize_services():
             # 加载模型
             if inference_engine.load_model(model_path):
                 logger.info("✅ 推理引擎初始化成功")
+                inference_batcher = InferenceBatcher(inference_engine)
+                inference_batcher.start()
             else:
                 logger.error("❌ 推理引擎初始化失败")
                 inference_engine = None
@@ -229,7 +257,13 @@ async def initialize_services():
 
 async def cleanup_services():
     """清理服务"""
-    global inference_engine, task_scheduler
+    global inference_engine, inference_batcher, task_scheduler
+    
+    if inference_batcher:
+        try:
+            await inference_batcher.stop()
+        except Exception as e:
+            logger.error(f"推理微批处理停止失败: {e}")
     
     if task_scheduler:
         try:
@@ -244,6 +278,11 @@ async def cleanup_services():
             logger.info("推理引擎资源已释放")
         except Exception as e:
             logger.error(f"资源释放失败: {e}")
+    
+    try:
+        await DatabaseManager.close_async_pool()
+    except Exception as e:
+        logger.error(f"异步数据库连接池关闭失败: {e}")
 
 def get_model_path(platform: str) -> Optional[str]:
     """获取模型文件路径"""
@@ -396,6 +435,11 @@ async def update_model_status(model_id: int, status_data: dict):
         raise HTTPException(status_code=404, detail="模型不存在")
     return updated_model
 
+def _save_upload_file(upload_file: UploadFile, path: str, chunk_size: int = 1 << 20):
+    """按 1MiB 分块将上传文件流式写入磁盘，不把整个文件读入内存；供 asyncio.to_thread 调用"""
+    with open(path, "wb") as file_object:
+        shutil.copyfileobj(upload_file.file, file_object, length=chunk_size)
+
 @api_router.post("/models/upload", response_model=Model)
 async def upload_model(
     name: str = Form(...),
@@ -419,11 +463,9 @@ async def upload_model(
         
     file_location = os.path.join(models_dir, sanitized_filename)
 
-    # 保存上传的文件
+    # 保存上传的文件（磁盘写入放到线程池，不阻塞事件循环）
     try:
-        with open(file_location, "wb+") as file_object:
-            contents = await file.read()
-            file_object.write(contents)
+        await asyncio.to_thread(_save_upload_file, file, file_location)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"文件保存失败: {e}")
 
@@ -767,21 +809,27 @@ async def get_alerts(
     level: Optional[str] = None,
     status: Optional[str] = None,
     start_date: Optional[str] = None,
-    end_date: Optional[str] = None
+    end_date: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
-    """获取告警列表"""
-    return alert_repository.get_all_alerts(
-        page=page, page_size=page_size, keyword=keyword, level=level,
-        status=status, start_date=start_date, end_date=end_date
-    )
+    """获取告警列表（传入 cursor 时按游标翻页）"""
+    try:
+        return alert_repository.get_all_alerts(
+            page=page, page_size=page_size, keyword=keyword, level=level,
+            status=status, start_date=start_date, end_date=end_date, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # 告警统计 - 放在{alert_id}路由之前
 @api_router.get("/alerts/stats")
 async def get_alert_stats():
     """获取告警统计"""
-    counts_by_status = alert_repository.get_alert_counts_by_status()
-    counts_by_day = alert_repository.get_alert_counts_by_day(days=7)
-    latest_alerts = alert_repository.get_latest_alerts(limit=5)
+    counts_by_status, counts_by_day, latest_alerts = await asyncio.gather(
+        alert_repository.get_alert_counts_by_status_async(),
+        alert_repository.get_alert_counts_by_day_async(days=7),
+        alert_repository.get_latest_alerts_async(limit=5)
+    )
     
     return {
         "counts_by_status": counts_by_status,
@@ -793,7 +841,7 @@ async def get_alert_stats():
 @api_router.get("/alerts/trends")
 async def get_alert_trends():
     """获取告警趋势"""
-    trends = alert_repository.get_alert_counts_by_day(days=30)
+    trends = await alert_repository.get_alert_counts_by_day_async(days=30)
     return {"trends": trends}
 
 # 导出告警 - 放在{alert_id}路由之前
@@ -833,7 +881,7 @@ async def batch_update_alerts(update_request: BatchAlertUpdateRequest):
 @api_router.get("/alerts/{alert_id}")
 async def get_alert(alert_id: int):
     """获取单个告警详情"""
-    alert = alert_repository.get_alert_by_id(alert_id)
+    alert = await alert_repository.get_alert_by_id_async(alert_id)
     if not alert:
         raise HTTPException(status_code=404, detail="告警不存在")
     return alert
@@ -864,32 +912,38 @@ async def delete_alert(alert_id: int):
 @api_router.post("/inference/detect")
 async def detect_objects(
     file: UploadFile = File(...),
-    confidence_threshold: float = Form(0.5),
-    nms_threshold: float = Form(0.4)
+    confidence_threshold: Optional[float] = Form(None),
+    nms_threshold: Optional[float] = Form(None)
 ):
-    """目标检测接口"""
-    if not inference_engine:
+    """
+    目标检测接口
+    
+    推理由微批处理器合并执行，统一使用引擎阈值；请求阈值在推理后对该请求的结果再过滤，
+    只能比引擎阈值更严格，实际生效的阈值随结果返回
+    """
+    if not inference_engine or not inference_batcher:
         raise HTTPException(status_code=503, detail="推理引擎未就绪")
     
     try:
-        # 读取图片
+        # 读取图片（解码和推理均为阻塞调用，放到线程池执行）
         contents = await file.read()
         nparr = np.frombuffer(contents, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        image = await asyncio.to_thread(cv2.imdecode, nparr, cv2.IMREAD_COLOR)
         
         if image is None:
             raise HTTPException(status_code=400, detail="无效的图片文件")
         
-        # 执行推理
-        results = inference_engine.detect(
-            image, 
-            confidence_threshold=confidence_threshold,
-            nms_threshold=nms_threshold
-        )
+        # 执行推理（并发请求由微批处理器合并为一次推理）
+        detections, inference_time = await inference_batcher.detect(image)
+        detections = inference_engine.filter_detections(detections, confidence_threshold, nms_threshold)
         
         return {
             "status": "success",
-            "results": results,
+            "results": (detections, inference_time),
+            "thresholds": {
+                "confidence": max(confidence_threshold or 0.0, inference_engine.confidence_threshold),
+                "nms": min(nms_threshold if nms_threshold is not None else 1.0, inference_engine.nms_threshold)
+            },
             "inference_time": inference_engine.get_performance_stats().get("last_inference_time", 0)
         }
         
@@ -925,7 +979,7 @@ async def get_system_stats():
     
     # 获取告警统计
     alert_counts = alert_repository.get_alert_counts_by_status()
-    recent_alerts = len(alert_repository.get_latest_alerts(limit=10))
+    recent_alerts = alert_repository.get_recent_alert_count(limit=10)
     
     # 扁平结构（向后兼容）
     stats = {
@@ -1,9 +1,14 @@
+import os
+from pathlib import Path
 import cv2
 import numpy as np
 import onnxruntime as ort
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List
 from .base import BaseModel
 
+# 标签文件解析缓存，按 (路径, mtime_ns) 失效，多个模型共用同一标签文件时只解析一次
+_LABEL_CACHE: Dict[Tuple[str, int], List[str]] = {}
+
 class ClassificationModel(BaseModel):
     def __init__(self, model_path: str, labels_path: str):
         self.labels_path = labels_path
@@ -13,8 +18,12 @@ class ClassificationModel(BaseModel):
     def _load_labels(self) -> list:
         """加载标签文件"""
         try:
-            with open(self.labels_path, 'r', encoding='utf-8') as f:
-                return [line.strip() for line in f.readlines()]
+            key = (os.path.abspath(self.labels_path), os.stat(self.labels_path).st_mtime_ns)
+            labels = _LABEL_CACHE.get(key)
+            if labels is None:
+                text = Path(self.labels_path).read_text(encoding='utf-8')
+                labels = _LABEL_CACHE[key] = [line.strip() for line in text.splitlines()]
+            return list(labels)
         except Exception as e:
             print(f"加载标签文件失败: {e}")
             return []
@@ -38,17 +47,14 @@ class ClassificationModel(BaseModel):
         # 调整图像大小
         image = cv2.resize(image, self.input_size)
         
-        # 转换为RGB
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # 归一化
-        image = image.astype(np.float32) / 255.0
+        # 调整维度顺序 (H, W, C) -> (C, H, W)，同时反转通道转换为RGB（均为视图，无复制）
+        chw = np.transpose(image, (2, 0, 1))[::-1]
         
-        # 调整维度顺序 (H, W, C) -> (1, C, H, W)
-        image = np.transpose(image, (2, 0, 1))
-        image = np.expand_dims(image, axis=0)
+        # 归一化，直接写入 (1, C, H, W) 连续张量
+        tensor = np.empty((1,) + chw.shape, dtype=np.float32)
+        np.multiply(chw, np.float32(1.0 / 255.0), out=tensor[0])
         
-        return image
+        return tensor
 
     def postprocess(self, output: np.ndarray) -> Dict[str, Any]:
         """结果后处理"""
@@ -2,9 +2,11 @@ import cv2
 import numpy as np
 from .base import BaseModel
 import onnxruntime as ort
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 from PIL import Image, ImageDraw, ImageFont
+import logging
 import os
+import threading
 import time
 try:
     import acl
@@ -18,13 +20,74 @@ except ImportError:
             return not_implemented
     acl = DummyAcl()
 
+logger = logging.getLogger(__name__)
+
+# 像素归一化系数（float32，避免运算提升为 float64）
+_INV_255 = np.float32(1.0 / 255.0)
+
+# 未知类别使用的默认框颜色
+DEFAULT_COLOR = (0, 255, 0)
+
+
+def build_palette(num_classes: int) -> List[Tuple[int, int, int]]:
+    """
+    按类别生成固定的颜色表（RGB 元组），固定随机种子保证各帧、各次启动颜色一致
+    
+    取值范围 100-255，保证黑色标签文字清晰可读
+    """
+    rng = np.random.default_rng(0)
+    return [tuple(color) for color in rng.integers(100, 256, size=(num_classes, 3)).tolist()]
+
+
+def text_size(draw: ImageDraw.ImageDraw, font, text: str) -> Tuple[int, int]:
+    """测量文字绘制尺寸 (宽, 高)，兼容不支持 textbbox 的旧版 Pillow"""
+    try:
+        left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+        return right - left, bottom - top
+    except AttributeError:
+        return draw.textsize(text, font=font)
+
+
+def build_detections(x1: np.ndarray, y1: np.ndarray, boxes: np.ndarray, scores: np.ndarray,
+                     class_ids: np.ndarray, indices, labels: List[str]) -> List[Dict[str, Any]]:
+    """
+    将 NMS 保留的结果整理为检测字典列表
+    
+    坐标、分数、类别先按数组整体转换为 Python 列表，循环内只做字典组装
+    """
+    if len(indices) == 0:
+        return []
+    keep = np.asarray(indices).flatten()
+    # astype 与 int() 一样向零截断
+    out_boxes = np.column_stack([x1[keep], y1[keep], boxes[keep, 2], boxes[keep, 3]]).astype(np.int32).tolist()
+    out_scores = scores[keep].tolist()
+    out_class_ids = class_ids[keep].tolist()
+    num_labels = len(labels) if labels else 0
+    return [
+        {
+            "box": box,
+            "score": score,
+            "label": labels[class_id] if class_id < num_labels else f'class_{class_id}',
+            "class_id": class_id
+        }
+        for box, score, class_id in zip(out_boxes, out_scores, out_class_ids)
+    ]
+
+
 class ONNXDetectionModel(BaseModel):
-    def __init__(self, path: str, labels: List[str] = None, **kwargs):
+    def __init__(self, path: str, labels: List[str] = None, quantize: bool = False,
+                 intra_op_threads: Optional[int] = None, **kwargs):
         self.labels = labels if labels else []
+        # INT8 动态量化会影响精度，默认关闭，可通过参数或环境变量 ONNX_QUANTIZE_INT8=true 开启
+        self.quantize = quantize or os.getenv('ONNX_QUANTIZE_INT8', 'false').lower() == 'true'
+        self.intra_op_threads = intra_op_threads or int(os.getenv('ORT_INTRA_OP_THREADS', '0')) or (os.cpu_count() or 1)
+        self._lock = threading.Lock()
         # Call super().__init__ with the correct argument name 'model_path'
         super().__init__(model_path=path)
         # Generate a color palette for each label
-        self.colors = np.random.uniform(100, 255, size=(len(self.labels), 3)) if self.labels else []
+        self.colors = build_palette(len(self.labels))
+        # 标签背景尺寸缓存：字体固定，按 "label: 0.99" 测量一次后复用（数字等宽）
+        self._label_sizes: Dict[str, Tuple[int, int]] = {}
         
         # Load a font that supports CJK characters
         font_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'fonts', 'NotoSansCJK-Regular.otf')
@@ -33,11 +96,34 @@ class ONNXDetectionModel(BaseModel):
         except IOError:
             self.font = ImageFont.load_default()
 
+    def _quantized_model_path(self) -> str:
+        """
+        返回 INT8 动态量化后的模型路径（缓存在原模型旁，原模型更新后重新生成）
+        
+        量化失败时返回原模型路径
+        """
+        quantized_path = os.path.splitext(self.model_path)[0] + '.int8.onnx'
+        if os.path.exists(quantized_path) and os.path.getmtime(quantized_path) >= os.path.getmtime(self.model_path):
+            return quantized_path
+        try:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            quantize_dynamic(self.model_path, quantized_path, weight_type=QuantType.QInt8)
+            logger.info(f"已生成INT8量化模型: {quantized_path}")
+            return quantized_path
+        except Exception as e:
+            logger.warning(f"INT8量化失败，使用原模型: {e}")
+            return self.model_path
+
     def load_model(self):
         """Loads the ONNX model and initializes the session."""
         try:
+            session_options = ort.SessionOptions()
+            session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            session_options.intra_op_num_threads = self.intra_op_threads
             self.session = ort.InferenceSession(
-                self.model_path,
+                self._quantized_model_path() if self.quantize else self.model_path,
+                sess_options=session_options,
                 providers=['CPUExecutionProvider']
             )
             self.input_name = self.session.get_inputs()[0].name
@@ -48,28 +134,47 @@ class ONNXDetectionModel(BaseModel):
             self.input_width = input_shape[3] if isinstance(input_shape[3], int) else 640
             # Set the input_size attribute required by the BaseModel
             self.input_size = (self.input_width, self.input_height)
+            # 预分配 NCHW 输入张量，预处理直接写入，不再生成中间图像
+            self._input_buf = np.empty((1, 3, self.input_height, self.input_width), dtype=np.float32)
+            self._input_layout = None
+
+            # 输入通过 IOBinding 绑定一次：CPU 上 OrtValue 与 _input_buf 共享内存，每次推理无需再拷贝输入
+            self._input_ort = ort.OrtValue.ortvalue_from_numpy(self._input_buf)
+            self._io_binding = self.session.io_binding()
+            self._io_binding.bind_ortvalue_input(self.input_name, self._input_ort)
+            for name in self.output_names:
+                self._io_binding.bind_output(name, 'cpu')
 
         except Exception as e:
             raise RuntimeError(f"Failed to load ONNX model {self.model_path}: {e}")
 
     def preprocess(self, image: np.ndarray):
-        self.img_height, self.img_width = image.shape[:2]
+        # 不使用 cv2.dnn.blobFromImage(WithParams)：其 letterbox 固定使用 INTER_LINEAR 且缩放尺寸取整方式不同，
+        # 与 postprocess 的坐标还原不一致；这里写入预分配缓冲区，同样没有中间张量
+        img_height, img_width = image.shape[:2]
         
-        scale = min(self.input_width / self.img_width, self.input_height / self.img_height)
-        resized_width = int(self.img_width * scale)
-        resized_height = int(self.img_height * scale)
+        scale = min(self.input_width / img_width, self.input_height / img_height)
+        resized_width = int(img_width * scale)
+        resized_height = int(img_height * scale)
         
         resized_image = cv2.resize(image, (resized_width, resized_height), interpolation=cv2.INTER_AREA)
         
-        padded_image = np.full((self.input_height, self.input_width, 3), 114, dtype=np.uint8)
-        padded_image[(self.input_height - resized_height) // 2:(self.input_height - resized_height) // 2 + resized_height, 
-                     (self.input_width - resized_width) // 2:(self.input_width - resized_width) // 2 + resized_width, :] = resized_image
+        top = (self.input_height - resized_height) // 2
+        left = (self.input_width - resized_width) // 2
+        input_tensor = self._input_buf
+        # 填充区域只在缩放后尺寸变化时重写（视频帧尺寸通常固定）
+        if self._input_layout != (resized_width, resized_height):
+            input_tensor.fill(114 / 255.0)
+            self._input_layout = (resized_width, resized_height)
 
-        input_tensor = padded_image.astype(np.float32) / 255.0
-        input_tensor = input_tensor.transpose(2, 0, 1)
-        return np.expand_dims(input_tensor, axis=0)
+        # 归一化与 HWC->CHW 一次完成，直接写入输入张量的有效区域
+        region = input_tensor[0, :, top:top + resized_height, left:left + resized_width]
+        for c in range(3):
+            np.multiply(resized_image[:, :, c], _INV_255, out=region[c])
+        return input_tensor
 
-    def postprocess(self, outputs: List[np.ndarray]) -> List[Dict[str, Any]]:
+    def postprocess(self, outputs: List[np.ndarray], original_image_shape: Tuple[int, int]) -> List[Dict[str, Any]]:
+        img_height, img_width = original_image_shape
         predictions = np.squeeze(outputs[0])
         
         obj_confidence = predictions[:, 4]
@@ -86,9 +191,9 @@ class ONNXDetectionModel(BaseModel):
         class_ids = np.argmax(predictions[:, 5:], axis=1)
         boxes = predictions[:, :4]
 
-        scale = min(self.input_width / self.img_width, self.input_height / self.img_height)
-        pad_x = (self.input_width - self.img_width * scale) / 2
-        pad_y = (self.input_height - self.img_height * scale) / 2
+        scale = min(self.input_width / img_width, self.input_height / img_height)
+        pad_x = (self.input_width - img_width * scale) / 2
+        pad_y = (self.input_height - img_height * scale) / 2
 
         boxes[:, 0] = (boxes[:, 0] - pad_x) / scale
         boxes[:, 1] = (boxes[:, 1] - pad_y) / scale
@@ -105,30 +210,20 @@ class ONNXDetectionModel(BaseModel):
             0.45
         )
         
-        detections = []
-        if len(indices) > 0:
-            for i in indices.flatten():
-                class_id = class_ids[i]
-                label = self.labels[class_id] if self.labels and len(self.labels) > class_id else f'class_{class_id}'
-                detection = {
-                    "box": [int(x1[i]), int(y1[i]), int(boxes[i, 2]), int(boxes[i, 3])],
-                    "score": float(scores[i]),
-                    "label": label,
-                    "class_id": int(class_id)
-                }
-                detections.append(detection)
-        
-        return detections
+        return build_detections(x1, y1, boxes, scores, class_ids, indices, self.labels)
 
     def inference(self, image: np.ndarray) -> Tuple[List[Dict[str, Any]], float]:
-        import time
-        preprocessed_image = self.preprocess(image)
-        
-        start_time = time.time()
-        outputs = self.session.run(self.output_names, {self.input_name: preprocessed_image})
-        inference_time = time.time() - start_time
+        # 输入缓冲区和 IOBinding 为实例共享，预处理到取回输出期间加锁；后处理只使用局部变量，可并发执行
+        with self._lock:
+            # preprocess 直接写入已绑定的 _input_buf，无需再更新绑定的输入
+            self.preprocess(image)
+            
+            start_time = time.time()
+            self.session.run_with_iobinding(self._io_binding)
+            outputs = self._io_binding.copy_outputs_to_cpu()
+            inference_time = time.time() - start_time
         
-        detections = self.postprocess(outputs)
+        detections = self.postprocess(outputs, image.shape[:2])
         return detections, inference_time
 
     def draw_result(self, image: np.ndarray, detections: List[Dict[str, Any]]) -> np.ndarray:
@@ -143,14 +238,13 @@ class ONNXDetectionModel(BaseModel):
             label = detection["label"]
             class_id = detection.get("class_id", 0)
             x, y, w, h = box
-            color = tuple(self.colors[class_id].astype(int).tolist()) if len(self.colors) > 0 and class_id < len(self.colors) else (0, 255, 0)
+            color = self.colors[class_id] if class_id < len(self.colors) else DEFAULT_COLOR
             draw.rectangle([x, y, x + w, y + h], outline=color, width=2)
             label_text = f"{label}: {score:.2f}"
-            try:
-                text_bbox = draw.textbbox((x, y), label_text, font=self.font)
-                text_w, text_h = text_bbox[2] - text_bbox[0], text_bbox[3] - text_bbox[1]
-            except AttributeError:
-                text_w, text_h = draw.textsize(label_text, font=self.font)
+            label_size = self._label_sizes.get(label)
+            if label_size is None:
+                label_size = self._label_sizes[label] = text_size(draw, self.font, f"{label}: 0.99")
+            text_w, text_h = label_size
             label_bg_y = y - text_h - 5
             draw.rectangle([x, label_bg_y, x + text_w + 4, y], fill=color)
             draw.text((x + 2, label_bg_y), label_text, font=self.font, fill=(0, 0, 0))
@@ -168,9 +262,12 @@ class AtlasDetectionModel(BaseModel):
         self.labels = kwargs.get('labels', [])
         self.confidence_threshold = kwargs.get('confidence_threshold', 0.4)
         self.nms_threshold = kwargs.get('nms_threshold', 0.45)
+        self._lock = threading.Lock()
         
         # Generate a color palette for each label
-        self.colors = np.random.uniform(100, 255, size=(len(self.labels), 3)) if self.labels else []
+        self.colors = build_palette(len(self.labels))
+        # 标签背景尺寸缓存：字体固定，按 "label: 0.99" 测量一次后复用（数字等宽）
+        self._label_sizes: Dict[str, Tuple[int, int]] = {}
         
         # Load a font that supports CJK characters
         font_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'fonts', 'NotoSansCJK-Regular.otf')
@@ -305,7 +402,7 @@ class AtlasDetectionModel(BaseModel):
         return outputs
 
     def postprocess(self, outputs: List[np.ndarray], original_image_shape: Tuple[int, int]) -> List[Dict[str, Any]]:
-        self.img_height, self.img_width = original_image_shape
+        img_height, img_width = original_image_shape
         predictions = np.squeeze(outputs[0])
         
         obj_confidence = predictions[:, 4]
@@ -319,9 +416,9 @@ class AtlasDetectionModel(BaseModel):
         class_ids = np.argmax(predictions[:, 5:], axis=1)
         boxes = predictions[:, :4]
 
-        scale = min(self.input_width / self.img_width, self.input_height / self.img_height)
-        pad_x = (self.input_width - self.img_width * scale) / 2
-        pad_y = (self.input_height - self.img_height * scale) / 2
+        scale = min(self.input_width / img_width, self.input_height / img_height)
+        pad_x = (self.input_width - img_width * scale) / 2
+        pad_y = (self.input_height - img_height * scale) / 2
 
         boxes[:, 0] = (boxes[:, 0] - pad_x) / scale
         boxes[:, 1] = (boxes[:, 1] - pad_y) / scale
@@ -333,26 +430,17 @@ class AtlasDetectionModel(BaseModel):
         
         indices = cv2.dnn.NMSBoxes(np.column_stack([x1, y1, boxes[:, 2], boxes[:, 3]]).tolist(), scores.tolist(), self.confidence_threshold, self.nms_threshold)
         
-        detections = []
-        if len(indices) > 0:
-            for i in indices.flatten():
-                class_id = class_ids[i]
-                detection = {
-                    "box": [int(x1[i]), int(y1[i]), int(boxes[i, 2]), int(boxes[i, 3])],
-                    "score": float(scores[i]),
-                    "label": self.labels[class_id] if self.labels and class_id < len(self.labels) else f'class_{class_id}',
-                    "class_id": int(class_id)
-                }
-                detections.append(detection)
-        return detections
+        return build_detections(x1, y1, boxes, scores, class_ids, indices, self.labels)
     
     def inference(self, image: np.ndarray) -> Tuple[List[Dict[str, Any]], float]:
         original_shape = image.shape[:2]
         preprocessed_image = self.preprocess(image)
         
-        start_time = time.time()
-        raw_outputs = self._execute_model(preprocessed_image.tobytes())
-        inference_time = time.time() - start_time
+        # 设备输入/输出缓冲区为实例共享，执行期间加锁
+        with self._lock:
+            start_time = time.time()
+            raw_outputs = self._execute_model(preprocessed_image.tobytes())
+            inference_time = time.time() - start_time
         
         detections = self.postprocess(raw_outputs, original_shape)
         return detections, inference_time
@@ -369,14 +457,13 @@ class AtlasDetectionModel(BaseModel):
             label = detection["label"]
             class_id = detection.get("class_id", 0)
             x, y, w, h = box
-            color = tuple(self.colors[class_id].astype(int).tolist()) if len(self.colors) > 0 and class_id < len(self.colors) else (0, 255, 0)
+            color = self.colors[class_id] if class_id < len(self.colors) else DEFAULT_COLOR
             draw.rectangle([x, y, x + w, y + h], outline=color, width=2)
             label_text = f"{label}: {score:.2f}"
-            try:
-                text_bbox = draw.textbbox((x, y), label_text, font=self.font)
-                text_w, text_h = text_bbox[2] - text_bbox[0], text_bbox[3] - text_bbox[1]
-            except AttributeError:
-                text_w, text_h = draw.textsize(label_text, font=self.font)
+            label_size = self._label_sizes.get(label)
+            if label_size is None:
+                label_size = self._label_sizes[label] = text_size(draw, self.font, f"{label}: 0.99")
+            text_w, text_h = label_size
             label_bg_y = y - text_h - 5
             draw.rectangle([x, label_bg_y, x + text_w + 4, y], fill=color)
             draw.text((x + 2, label_bg_y), label_text, font=self.font, fill=(0, 0, 0))
@@ -1,21 +1,63 @@
+import json
 import logging
 import os
+import threading
+from collections import OrderedDict
 from .base import BaseModel
 from .detection import ONNXDetectionModel, AtlasDetectionModel
 from .classification import ClassificationModel
 
 logger = logging.getLogger(__name__)
 
+# 已创建模型实例的缓存（LRU），键包含模型文件的修改时间，文件更新后自动重新加载
+_MODEL_CACHE_SIZE = 8
+_model_cache: "OrderedDict[tuple, BaseModel]" = OrderedDict()
+_model_cache_lock = threading.Lock()
+
+
 class ModelFactory:
     @staticmethod
     def create_model(model_config: dict) -> BaseModel:
-        model_type = model_config.get('type')
+        """
+        按配置创建模型，相同配置且模型文件未变化时复用已创建的实例
+        
+        推理会话的构建（解析模型、图优化）开销较大，不应在每次请求时重复执行
+        """
         model_path = model_config.get('path', '')
         
         # 检查模型文件是否存在
-        if not os.path.exists(model_path):
+        try:
+            mtime_ns = os.stat(model_path).st_mtime_ns
+        except OSError:
             raise FileNotFoundError(f"模型文件不存在: {model_path}")
 
+        key = (model_path, mtime_ns, json.dumps(model_config, sort_keys=True, default=str))
+        with _model_cache_lock:
+            model = _model_cache.get(key)
+            if model is not None:
+                _model_cache.move_to_end(key)
+                return model
+
+        model = ModelFactory._create_model(model_config)
+        with _model_cache_lock:
+            # 并发创建同一模型时保留先写入缓存的实例
+            model = _model_cache.setdefault(key, model)
+            _model_cache.move_to_end(key)
+            while len(_model_cache) > _MODEL_CACHE_SIZE:
+                _model_cache.popitem(last=False)
+        return model
+
+    @staticmethod
+    def clear_cache():
+        """清空模型实例缓存"""
+        with _model_cache_lock:
+            _model_cache.clear()
+
+    @staticmethod
+    def _create_model(model_config: dict) -> BaseModel:
+        model_type = model_config.get('type')
+        model_path = model_config.get('path', '')
+
         if model_type == 'detection' or model_type == 'object_detection':
             # 根据文件扩展名智能判断模型类型
             if model_path.endswith('.onnx'):
@@ -5,13 +5,18 @@
 
 import os
 import time
+import queue
 import hashlib
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from utils.logging import logger
 from utils.config_parser import ConfigParser
 from utils.image_utils import ImageProcessor
 
+# 告警图片写盘队列上限，队列满时阻塞生产者形成背压
+ALERT_WRITER_QUEUE_SIZE = 64
+
 
 class AlertInfo:
     """告警信息结构"""
@@ -102,7 +107,7 @@ class DebounceManager:
             del self.alert_history[key]
         
         if expired_keys:
-            logger.debug(f"清理了 {len(expired_keys)} 个过期的告警记录")
+            logger.debug("清理了 %d 个过期的告警记录", len(expired_keys))
 
 
 class AlertManager:
@@ -116,14 +121,85 @@ class AlertManager:
         )
         self.image_processor = ImageProcessor()
         
-        # 告警统计
+        # 告警统计（写盘线程和调用方线程都会更新，修改时持有 _stats_lock）
         self.total_alerts = 0
         self.saved_images = 0
         self.failed_saves = 0
+        self._stats_lock = threading.Lock()
+        
+        # 图片写盘失败时在写盘线程中调用，参数为 _save_alert_image 已返回给调用方的图片路径
+        self.on_image_failed: Optional[Callable[[str], None]] = None
+        
+        # 告警图片由后台线程写盘，避免 imwrite 阻塞推理循环
+        self._alert_writer = queue.Queue(maxsize=ALERT_WRITER_QUEUE_SIZE)
+        self._writer_thread = None
+        self._writer_lock = threading.Lock()
         
         # 确保图片保存目录存在
         self._ensure_image_directory()
     
+    def _ensure_writer(self):
+        """按需启动告警图片写盘线程"""
+        if self._writer_thread is not None and self._writer_thread.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer_thread is None or not self._writer_thread.is_alive():
+                self._writer_thread = threading.Thread(
+                    target=self._alert_writer_loop, name="alert-image-writer", daemon=True
+                )
+                self._writer_thread.start()
+    
+    def _alert_writer_loop(self):
+        """后台写盘循环，收到 None 时退出"""
+        while True:
+            item = self._alert_writer.get()
+            try:
+                if item is None:
+                    return
+                image, full_path, quality = item
+                try:
+                    saved = self.image_processor.save_image(image, full_path, quality)
+                except Exception as e:
+                    logger.error(f"保存告警图片异常: {e}")
+                    saved = False
+                if saved:
+                    self._count('saved_images')
+                else:
+                    self._count('failed_saves')
+                    logger.error(f"告警图片保存失败: {os.path.basename(full_path)}")
+                    self._notify_image_failed(full_path)
+            finally:
+                self._alert_writer.task_done()
+    
+    def _count(self, name: str):
+        """统计计数加一"""
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+    
+    def _notify_image_failed(self, image_path: str):
+        """通知调用方图片写盘失败，以便去掉告警记录中的图片引用"""
+        callback = self.on_image_failed
+        if callback is None:
+            return
+        try:
+            callback(image_path)
+        except Exception as e:
+            logger.error(f"处理告警图片写盘失败回调异常: {e}")
+    
+    def flush(self):
+        """等待已提交的告警图片全部写盘"""
+        if self._writer_thread is not None and self._writer_thread.is_alive():
+            self._alert_writer.join()
+    
+    def close(self, timeout: float = 5.0):
+        """写完剩余图片后停止写盘线程"""
+        thread = self._writer_thread
+        if thread is None or not thread.is_alive():
+            return
+        self._alert_writer.put(None)
+        thread.join(timeout=timeout)
+        self._writer_thread = None
+    
     def _ensure_image_directory(self):
         """确保图片保存目录存在"""
         image_path = self.alert_config.get('image_path', '/app/alert_images')
@@ -150,8 +226,8 @@ class AlertManager:
             
             # 检查防抖
             if not self.debounce_manager.should_alert(detection):
-                logger.debug(f"告警被防抖过滤: {detection.get('class_name', '')} "
-                           f"置信度: {confidence:.3f}")
+                logger.debug("告警被防抖过滤: %s 置信度: %.3f",
+                             detection.get('class_name', ''), confidence)
                 continue
             
             # 创建告警信息
@@ -162,7 +238,7 @@ class AlertManager:
                 self._save_alert_image(alert_info)
             
             alerts.append(alert_info)
-            self.total_alerts += 1
+            self._count('total_alerts')
             
             # 记录告警日志
             logger.log_alert(
@@ -175,7 +251,12 @@ class AlertManager:
         return alerts
     
     def _save_alert_image(self, alert_info: AlertInfo) -> bool:
-        """保存告警图片"""
+        """
+        保存告警图片（异步写盘，返回是否已提交）
+        
+        返回 True 时 alert_info.image_path 已设置，但文件由后台线程写入，此时可能尚未落盘；
+        写盘失败会计入 failed_saves 并以该路径调用 on_image_failed
+        """
         try:
             # 生成图片文件名
             timestamp_str = datetime.fromtimestamp(alert_info.timestamp).strftime('%Y%m%d_%H%M%S_%f')[:-3]
@@ -189,25 +270,24 @@ class AlertManager:
             full_path = os.path.join(image_path, filename)
             
             # 在图像上绘制检测结果
+            # draw_detections 在帧的副本上绘制，入队的图像不与采集线程共享内存，无需再复制一次
             detection_image = self._draw_detection_on_image(alert_info)
+            if detection_image is alert_info.frame:
+                # 绘制失败时返回的是原始帧，复制一份以免写盘前被采集线程覆盖
+                detection_image = detection_image.copy()
             
-            # 保存图片
+            # 提交到后台线程写盘，路径先行返回供告警记录引用
             quality = self.alert_config.get('image_quality', 95)
-            success = self.image_processor.save_image(detection_image, full_path, quality)
+            self._ensure_writer()
+            self._alert_writer.put((detection_image, full_path, quality))
             
-            if success:
-                alert_info.image_path = full_path
-                alert_info.image_url = self._generate_image_url(filename)
-                self.saved_images += 1
-                logger.info(f"告警图片保存成功: {filename}")
-                return True
-            else:
-                self.failed_saves += 1
-                logger.error(f"告警图片保存失败: {filename}")
-                return False
+            alert_info.image_path = full_path
+            alert_info.image_url = self._generate_image_url(filename)
+            logger.debug("告警图片已提交写盘: %s", filename)
+            return True
                 
         except Exception as e:
-            self.failed_saves += 1
+            self._count('failed_saves')
             logger.error(f"保存告警图片异常: {e}")
             return False
     
@@ -278,12 +358,13 @@ class AlertManager:
     
     def get_alert_stats(self) -> Dict[str, Any]:
         """获取告警统计信息"""
-        return {
-            'total_alerts': self.total_alerts,
-            'saved_images': self.saved_images,
-            'failed_saves': self.failed_saves,
-            'debounce_history_count': len(self.debounce_manager.alert_history)
-        }
+        with self._stats_lock:
+            return {
+                'total_alerts': self.total_alerts,
+                'saved_images': self.saved_images,
+                'failed_saves': self.failed_saves,
+                'debounce_history_count': len(self.debounce_manager.alert_history)
+            }
     
     def should_debounce_alert(self, alert_key: str, debounce_interval: int) -> bool:
         """检查是否应该防抖过滤告警（兼容旧接口）"""
@@ -320,7 +401,11 @@ class AlertManager:
         pass
     
     def save_alert_image(self, frame, detection: Dict[str, Any], task_name: str, class_name: str) -> Optional[str]:
-        """保存告警图片（兼容旧接口）"""
+        """
+        保存告警图片（兼容旧接口）
+        
+        返回的路径在文件写盘前即可用于告警记录，写盘失败时通过 on_image_failed 通知
+        """
         try:
             # 创建AlertInfo对象
             alert_info = AlertInfo(detection, frame, time.time())
@@ -333,13 +418,14 @@ class AlertManager:
                 
         except Exception as e:
             logger.error(f"保存告警图片失败: {e}")
-            self.failed_saves += 1
+            self._count('failed_saves')
             return None
 
     def reset_stats(self):
         """重置统计信息"""
-        self.total_alerts = 0
-        self.saved_images = 0
-        self.failed_saves = 0
+        with self._stats_lock:
+            self.total_alerts = 0
+            self.saved_images = 0
+            self.failed_saves = 0
         self.debounce_manager.alert_history.clear()
         logger.info("告警统计已重置") 
\ No newline at end of file
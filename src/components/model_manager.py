@@ -73,12 +73,19 @@ class ModelManager:
         self.current_model: Optional[AtlasInference] = None
         self.current_model_name: Optional[str] = None
         self.current_preset: Optional[str] = None
+        # 当前模型版本号，每次加载/切换/释放模型时递增
+        self._version = 0
         
         # 加载配置文件
         self._load_config()
         
         logger.info("模型管理器初始化完成")
     
+    @property
+    def version(self) -> int:
+        """当前模型版本号，模型加载、切换或释放后变化"""
+        return self._version
+    
     def _load_config(self):
         """加载模型配置文件"""
         try:
@@ -236,6 +243,7 @@ class ModelManager:
             
             self.current_model_name = model_id
             self.current_preset = preset_id
+            self._version += 1
             
             logger.info(f"成功加载模型: {model_config.name}")
             if preset_id:
@@ -374,6 +382,7 @@ class ModelManager:
                 self.current_model.cleanup()
             except:
                 pass
+            self._version += 1
         
         # 加载新模型
         return self.load_model(model_id, preset_id)
@@ -389,6 +398,7 @@ class ModelManager:
         self.current_model = None
         self.current_model_name = None
         self.current_preset = None
+        self._version += 1
         
         logger.info("模型管理器资源已释放")
     
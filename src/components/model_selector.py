@@ -19,6 +19,12 @@ logger = get_logger(__name__)
 class ModelSelector:
     """模型选择器"""
     
+    # 配置模式 -> 加载函数
+    _LOADERS = {
+        'scenario': lambda self, c: self.model_manager.load_scenario(c['scenario_id']),
+        'model': lambda self, c: self.model_manager.load_model(c['model_id'], c.get('preset_id')),
+    }
+    
     def __init__(self, models_config_path: str = "config/models.yml"):
         """
         初始化模型选择器
@@ -27,6 +33,9 @@ class ModelSelector:
             models_config_path: 模型配置文件路径
         """
         self.model_manager = ModelManager(models_config_path)
+        # 当前模型信息缓存，按模型管理器版本号失效
+        self._info_cache: Optional[Dict[str, Any]] = None
+        self._info_version = -1
         logger.info("模型选择器初始化完成")
     
     def interactive_select(self) -> Optional[Dict[str, Any]]:
@@ -85,11 +94,17 @@ class ModelSelector:
             print(f"   告警规则: {len(scenario['alert_rules'])} 条")
             print()
         
+        prompt = f"请选择场景 (1-{len(scenarios)}): "
+        invalid_msg = f"无效选择，请输入 1-{len(scenarios)}"
+        
         while True:
             try:
-                choice = input(f"请选择场景 (1-{len(scenarios)}): ").strip()
-                choice_idx = int(choice) - 1
+                choice = input(prompt).strip()
+                if not choice.isdigit():
+                    print("请输入有效的数字")
+                    continue
                 
+                choice_idx = int(choice) - 1
                 if 0 <= choice_idx < len(scenarios):
                     selected_scenario = scenarios[choice_idx]
                     scenario_id = selected_scenario['id']
@@ -99,7 +114,7 @@ class ModelSelector:
                         print(f"\n✓ 成功加载场景: {scenario_id}")
                         
                         # 获取当前模型信息
-                        model_info = self.model_manager.get_current_model_info()
+                        model_info = self.get_current_model_info()
                         alert_rules = self.model_manager.get_scenario_alert_rules(scenario_id)
                         
                         return {
@@ -112,9 +127,7 @@ class ModelSelector:
                         print(f"✗ 加载场景失败: {scenario_id}")
                         return None
                 else:
-                    print(f"无效选择，请输入 1-{len(scenarios)}")
-            except ValueError:
-                print("请输入有效的数字")
+                    print(invalid_msg)
             except KeyboardInterrupt:
                 print("\n\n用户取消选择")
                 return None
@@ -137,19 +150,23 @@ class ModelSelector:
             print()
         
         # 选择模型
+        prompt = f"请选择模型 (1-{len(models)}): "
+        invalid_msg = f"无效选择，请输入 1-{len(models)}"
+        
         while True:
             try:
-                choice = input(f"请选择模型 (1-{len(models)}): ").strip()
-                choice_idx = int(choice) - 1
+                choice = input(prompt).strip()
+                if not choice.isdigit():
+                    print("请输入有效的数字")
+                    continue
                 
+                choice_idx = int(choice) - 1
                 if 0 <= choice_idx < len(models):
                     selected_model = models[choice_idx]
                     model_id = selected_model['id']
                     break
                 else:
-                    print(f"无效选择，请输入 1-{len(models)}")
-            except ValueError:
-                print("请输入有效的数字")
+                    print(invalid_msg)
             except KeyboardInterrupt:
                 print("\n\n用户取消选择")
                 return None
@@ -164,7 +181,7 @@ class ModelSelector:
                 print(f"✓ 应用预设: {preset_id}")
             
             # 获取当前模型信息
-            model_info = self.model_manager.get_current_model_info()
+            model_info = self.get_current_model_info()
             
             return {
                 'mode': 'model',
@@ -195,9 +212,15 @@ class ModelSelector:
                 print(f"   输入尺寸: {preset['input_size']}")
             print()
         
+        prompt = f"请选择预设 (0-{len(presets)}): "
+        invalid_msg = f"无效选择，请输入 0-{len(presets)}"
+        
         while True:
             try:
-                choice = input(f"请选择预设 (0-{len(presets)}): ").strip()
+                choice = input(prompt).strip()
+                if not choice.isdigit():
+                    print("请输入有效的数字")
+                    continue
                 
                 if choice == "0":
                     return None
@@ -206,9 +229,7 @@ class ModelSelector:
                 if 0 <= choice_idx < len(presets):
                     return presets[choice_idx]['id']
                 else:
-                    print(f"无效选择，请输入 0-{len(presets)}")
-            except ValueError:
-                print("请输入有效的数字")
+                    print(invalid_msg)
             except KeyboardInterrupt:
                 print("\n\n用户取消选择")
                 return None
@@ -223,19 +244,13 @@ class ModelSelector:
         Returns:
             是否加载成功
         """
-        try:
-            if config.get('mode') == 'scenario':
-                scenario_id = config.get('scenario_id')
-                if scenario_id:
-                    return self.model_manager.load_scenario(scenario_id)
-            elif config.get('mode') == 'model':
-                model_id = config.get('model_id')
-                preset_id = config.get('preset_id')
-                if model_id:
-                    return self.model_manager.load_model(model_id, preset_id)
-            
+        loader = self._LOADERS.get(config.get('mode'))
+        if loader is None:
             return False
-        except Exception as e:
+        
+        try:
+            return loader(self, config)
+        except (KeyError, ValueError) as e:
             logger.error(f"从配置加载模型失败: {e}")
             return False
     
@@ -244,8 +259,12 @@ class ModelSelector:
         return self.model_manager.current_model
     
     def get_current_model_info(self):
-        """获取当前模型信息"""
-        return self.model_manager.get_current_model_info()
+        """获取当前模型信息（模型未切换时复用缓存，返回其浅拷贝以免调用方修改缓存）"""
+        version = self.model_manager.version
+        if version != self._info_version:
+            self._info_cache = self.model_manager.get_current_model_info()
+            self._info_version = version
+        return dict(self._info_cache) if self._info_cache is not None else None
     
     def switch_model(self, model_id: str, preset_id: Optional[str] = None) -> bool:
         """
@@ -5,11 +5,16 @@
 
 import json
 import time
+import weakref
 import threading
-from typing import Dict, Any, List, Optional
+import collections
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Any, List, Optional
 from utils.logging import logger
 from utils.config_parser import ConfigParser
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 
 try:
@@ -28,22 +33,180 @@ except ImportError:
 
 try:
     from kafka import KafkaProducer
+    from kafka.errors import KafkaError
+    from kafka.codec import has_lz4
     KAFKA_PYTHON_AVAILABLE = True
 except ImportError:
     KAFKA_PYTHON_AVAILABLE = False
     logging.warning("kafka-python library not installed, Kafka push will not be available.")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def _encode_json(obj: Any) -> bytes:
+        """将告警数据序列化为 UTF-8 编码的 JSON"""
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+else:
+    def _encode_json(obj: Any) -> bytes:
+        """将告警数据序列化为 UTF-8 编码的 JSON"""
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def _serialize_kafka_value(value: Any) -> bytes:
+    """Kafka 消息序列化，已序列化的 JSON 直接发送"""
+    if isinstance(value, bytes):
+        return value
+    return _encode_json(value)
+
+
+class CircuitBreaker:
+    """熔断器：连续失败达到阈值后，在冷却期内直接跳过推送，避免反复等待不可达的服务"""
+    
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._fail_count = 0
+        self._open_until = 0.0
+        # record() 在发送 I/O 线程和 Kafka 回调线程中调用，计数的读改写需要加锁
+        self._lock = threading.Lock()
+    
+    @property
+    def is_open(self) -> bool:
+        """熔断器是否处于打开（跳过推送）状态"""
+        # 单个 float 的读取是原子的，热路径上不加锁
+        return time.monotonic() < self._open_until
+    
+    def record(self, success: bool):
+        """记录一次推送结果"""
+        with self._lock:
+            if success:
+                self._fail_count = 0
+                return
+            
+            self._fail_count += 1
+            if self._fail_count < self.failure_threshold:
+                return
+            self._open_until = time.monotonic() + self.cooldown
+            self._fail_count = 0
+        logger.warning(f"{self.name} 推送连续失败，熔断 {self.cooldown} 秒")
+
+
+class SendQueue:
+    """
+    推送发送队列
+    
+    调用方线程只负责入队，由专用 I/O 线程批量取出并发送，检测线程不再阻塞在网络 I/O 上。
+    deque 的 append/popleft 在 CPython 中是原子操作，入队无需加锁
+    """
+    
+    def __init__(self, name: str, send_batch: Callable[[List[Any]], Any],
+                 max_size: int = 10000, batch_size: int = 64, interval: float = 0.05,
+                 on_idle: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            name: 队列名称，用于日志和线程名
+            send_batch: 批量发送函数，在 I/O 线程中调用
+            max_size: 队列上限，超出时拒绝入队
+            batch_size: 每批最多发送的消息数
+            interval: I/O 线程空闲时的唤醒间隔（秒）
+            on_idle: 每轮发送完成后在 I/O 线程中调用，可用于处理心跳等
+        """
+        self.name = name
+        self._send_batch = send_batch
+        self._on_idle = on_idle
+        self._max_size = max_size
+        self._batch_size = batch_size
+        self._interval = interval
+        self._queue = collections.deque()
+        self._event = threading.Event()
+        self._running = False
+        self._thread = None
+    
+    def __len__(self) -> int:
+        return len(self._queue)
+    
+    def start(self):
+        """启动 I/O 线程"""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}_sender", daemon=True)
+        self._thread.start()
+    
+    def put(self, item: Any) -> bool:
+        """入队，队列已满时返回 False"""
+        if len(self._queue) >= self._max_size:
+            return False
+        self._queue.append(item)
+        self._event.set()
+        return True
+    
+    def _take_batch(self) -> List[Any]:
+        batch = []
+        popleft = self._queue.popleft
+        try:
+            for _ in range(self._batch_size):
+                batch.append(popleft())
+        except IndexError:
+            pass
+        return batch
+    
+    def drain(self):
+        """发送队列中剩余的全部消息"""
+        while self._queue:
+            batch = self._take_batch()
+            if batch:
+                self._send_batch(batch)
+    
+    def _run(self):
+        """I/O 线程主循环"""
+        while self._running:
+            self._event.wait(timeout=self._interval)
+            self._event.clear()
+            try:
+                self.drain()
+                if self._on_idle:
+                    self._on_idle()
+            except Exception as e:
+                logger.error(f"{self.name} 后台发送线程异常: {e}")
+    
+    def stop(self, timeout: float = 5.0):
+        """停止 I/O 线程，队列中剩余的消息需调用 drain() 发送"""
+        self._running = False
+        self._event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
 
 class MQTTPusher:
     """MQTT 推送器"""
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        self.breaker = CircuitBreaker(
+            'MQTT',
+            failure_threshold=config.get('circuit_failure_threshold', 5),
+            cooldown=config.get('circuit_cooldown', 30.0)
+        )
         self.client = None
         self.is_connected = False
+        self._connected_event = threading.Event()
         self.connection_retries = 0
         self.max_retries = 3
         
+        # 推送热路径使用的配置项
+        self._topic = config.get('topic', 'atlas/alerts')
+        # 告警默认尽力而为（QoS 0），reliable 为真时使用 QoS 1；
+        # publish 本身不阻塞，QoS 1 的确认结果由 _on_publish 回调处理
+        self._qos = config.get('qos', 1 if config.get('reliable', False) else 0)
+        
         if MQTT_AVAILABLE:
             self._init_client()
     
@@ -60,6 +223,10 @@ class MQTTPusher:
             if username and password:
                 self.client.username_pw_set(username, password)
             
+            # 设置在途窗口和离线队列上限，避免告警突发时阻塞或内存无限增长
+            self.client.max_inflight_messages_set(self.config.get('max_inflight', 1000))
+            self.client.max_queued_messages_set(self.config.get('max_queued', 10000))
+            
             # 设置回调
             self.client.on_connect = self._on_connect
             self.client.on_disconnect = self._on_disconnect
@@ -75,14 +242,17 @@ class MQTTPusher:
         if rc == 0:
             self.is_connected = True
             self.connection_retries = 0
+            self._connected_event.set()
             logger.info("MQTT 连接成功")
         else:
             self.is_connected = False
+            self._connected_event.clear()
             logger.error(f"MQTT 连接失败，错误码: {rc}")
     
     def _on_disconnect(self, client, userdata, rc):
         """断开连接回调"""
         self.is_connected = False
+        self._connected_event.clear()
         logger.warning("MQTT 连接断开")
     
     def _on_publish(self, client, userdata, mid):
@@ -102,13 +272,8 @@ class MQTTPusher:
             self.client.connect(broker, port, keepalive)
             self.client.loop_start()
             
-            # 等待连接
-            timeout = 5
-            while not self.is_connected and timeout > 0:
-                time.sleep(0.1)
-                timeout -= 0.1
-            
-            return self.is_connected
+            # 等待连接回调
+            return self._connected_event.wait(timeout=5) and self.is_connected
             
         except Exception as e:
             logger.error(f"MQTT 连接异常: {e}")
@@ -120,28 +285,39 @@ class MQTTPusher:
             self.client.loop_stop()
             self.client.disconnect()
             self.is_connected = False
+            self._connected_event.clear()
+    
+    def push(self, alert_info: Dict[str, Any], payload: Optional[bytes] = None) -> bool:
+        """推送告警信息，payload 为已序列化的告警 JSON（可选）"""
+        if self.breaker.is_open:
+            return False
+        
+        success = self._send(alert_info, payload)
+        self.breaker.record(success)
+        return success
     
-    def push(self, alert_info: Dict[str, Any]) -> bool:
-        """推送告警信息"""
+    def _send(self, alert_info: Dict[str, Any], payload: Optional[bytes]) -> bool:
+        """发送单条告警"""
         if not MQTT_AVAILABLE or not self.client or not self.is_connected:
             return False
         
+        topic = self._topic
+        if payload is None:
+            payload = _encode_json(alert_info)
+        
         try:
-            topic = self.config.get('topic', 'atlas/alerts')
-            payload = json.dumps(alert_info, ensure_ascii=False)
-            
-            result = self.client.publish(topic, payload, qos=1)
-            
-            if result.rc == mqtt.MQTT_ERR_SUCCESS:
-                logger.log_push("MQTT", True, f"消息已发送到主题: {topic}")
-                return True
-            else:
-                logger.log_push("MQTT", False, f"发送失败，错误码: {result.rc}")
-                return False
-                
-        except Exception as e:
+            result = self.client.publish(topic, payload, qos=self._qos)
+        except (ValueError, OSError) as e:
             logger.log_push("MQTT", False, f"推送异常: {e}")
             return False
+        
+        if result.rc == mqtt.MQTT_ERR_SUCCESS:
+            if logger.isEnabledFor(logging.INFO):
+                logger.log_push("MQTT", True, f"消息已发送到主题: {topic}")
+            return True
+        
+        logger.log_push("MQTT", False, f"发送失败，错误码: {result.rc}")
+        return False
 
 
 class HTTPPusher:
@@ -149,68 +325,135 @@ class HTTPPusher:
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        self.breaker = CircuitBreaker(
+            'HTTP',
+            failure_threshold=config.get('circuit_failure_threshold', 5),
+            cooldown=config.get('circuit_cooldown', 30.0)
+        )
         self.session = None
+        # 预构建的请求模板与环境设置（代理/证书），推送时只需填充请求体
+        self._prepared = None
+        self._send_kwargs = {}
+        
+        # 推送热路径使用的配置项
+        self._url = config.get('url')
+        self._method = config.get('method', 'POST').upper()
+        self._timeout = config.get('timeout', 10)
+        # (连接超时, 读取超时)，requests 会忽略 Session.timeout 属性，必须按请求传入
+        self._request_timeout = (config.get('connect_timeout', 3), self._timeout)
+        # 请求头部：清理自定义 header 键值的前后空格，避免HTTP请求错误
+        self._custom_headers = {
+            str(key).strip(): str(value).strip()
+            for key, value in (config.get('headers') or {}).items()
+        }
+        self._headers = {'Content-Type': 'application/json', **self._custom_headers}
+        
+        # 异步发送：告警入队后由专用 I/O 线程逐条发送
+        self._queue = None
+        if config.get('async_send', True):
+            self._queue = SendQueue(
+                'HTTP', self._send_batch,
+                max_size=config.get('buffer_size', 10000),
+                batch_size=config.get('flush_batch_size', 64)
+            )
         
         if requests.Session:
             self._init_session()
+            if self._queue:
+                self._queue.start()
     
     def _init_session(self):
         """初始化 HTTP 会话"""
         try:
             self.session = requests.Session()
             
-            # 设置默认头部
-            headers = self.config.get('headers', {})
-            if headers:
-                self.session.headers.update(headers)
+            # 连接池与重试：跨告警复用 TCP/TLS 连接
+            pool_size = self.config.get('pool_size', 32)
+            adapter = HTTPAdapter(
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+                max_retries=Retry(
+                    total=self.config.get('max_retries', 2),
+                    backoff_factor=0.1,
+                    status_forcelist=(502, 503, 504)
+                )
+            )
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+            
+            # 设置默认头部，请求时不再逐次合并
+            self.session.headers.update(self._headers)
+            self.session.headers['Connection'] = 'keep-alive'
             
-            # 设置超时
-            timeout = self.config.get('timeout', 10)
-            self.session.timeout = timeout
+            # URL 解析、头部合并及环境代理/证书查找只做一次，
+            # 之后每次推送复制模板并填充请求体，直接经 session.send 发送
+            if self._url and self._method != 'GET':
+                # 除 PUT/PATCH 外均按 POST 发送
+                method = self._method if self._method in ('PUT', 'PATCH') else 'POST'
+                self._prepared = self.session.prepare_request(
+                    requests.Request(method, self._url)
+                )
+                self._send_kwargs = self.session.merge_environment_settings(
+                    self._prepared.url, {}, None, None, None
+                )
             
             logger.info("HTTP 会话初始化成功")
             
         except Exception as e:
             logger.error(f"HTTP 会话初始化失败: {e}")
     
-    def push(self, alert_info: Dict[str, Any]) -> bool:
-        """推送告警信息"""
+    def push(self, alert_info: Dict[str, Any], payload: Optional[bytes] = None) -> bool:
+        """推送告警信息，payload 为已序列化的告警 JSON（可选）"""
+        if self.breaker.is_open:
+            return False
+        
         if not requests.Session or not self.session:
             logger.error("❌ HTTPPusher: Session未初始化")
             return False
         
+        if not self._url:
+            logger.error("❌ HTTPPusher: HTTP推送URL未配置")
+            return False
+        
+        # 准备请求数据
+        data = payload if payload is not None else _encode_json(alert_info)
+        
+        if self._queue is None:
+            success = self._send(alert_info, data)
+            self.breaker.record(success)
+            return success
+        
+        if not self._queue.put((alert_info, data)):
+            logger.log_push("HTTP", False, "发送队列已满，丢弃告警")
+            return False
+        return True
+    
+    def _send_batch(self, batch: List[Any]):
+        """I/O 线程：逐条发送队列中的告警"""
+        for alert_info, data in batch:
+            if self.breaker.is_open:
+                logger.log_push("HTTP", False, "熔断中，丢弃告警")
+                continue
+            self.breaker.record(self._send(alert_info, data))
+    
+    def _send(self, alert_info: Dict[str, Any], data: bytes) -> bool:
+        """发送单条告警"""
+        url = self._url
+        
         try:
-            url = self.config.get('url')
-            if not url:
-                logger.error("❌ HTTPPusher: HTTP推送URL未配置")
-                return False
-            
             # 获取配置信息
-            method = self.config.get('method', 'POST').upper()
-            timeout = self.config.get('timeout', 10)
-            custom_headers = self.config.get('headers', {})
+            method = self._method
+            timeout = self._request_timeout
             
             # 详细日志输出
             logger.info("🔄 ==================== HTTPPusher推送开始 ====================")
             logger.info(f"📍 目标URL: {url}")
             logger.info(f"📋 HTTP方法: {method}")
-            logger.info(f"⏱️ 超时设置: {timeout}秒")
-            
-            # 设置请求头部
-            headers = {'Content-Type': 'application/json'}
-            
-            # 合并自定义headers，并清理空格
-            if custom_headers:
-                cleaned_headers = {}
-                for key, value in custom_headers.items():
-                    # 清理header值中的前后空格，避免HTTP请求错误
-                    cleaned_key = str(key).strip()
-                    cleaned_value = str(value).strip()
-                    cleaned_headers[cleaned_key] = cleaned_value
-                    
-                headers.update(cleaned_headers)
+            logger.info(f"⏱️ 超时设置: {self._timeout}秒")
+            
+            if self._custom_headers:
                 logger.info(f"🔐 自定义Headers:")
-                for key, value in cleaned_headers.items():
+                for key, value in self._custom_headers.items():
                     # 隐藏敏感信息（如token）
                     if 'token' in key.lower() or 'auth' in key.lower() or 'key' in key.lower():
                         logger.info(f"     {key}: {value[:10]}***" if len(str(value)) > 10 else f"     {key}: ***")
@@ -219,8 +462,6 @@ class HTTPPusher:
             else:
                 logger.info("🔐 使用默认Headers: Content-Type: application/json")
             
-            # 准备请求数据
-            data = json.dumps(alert_info, ensure_ascii=False)
             logger.info(f"📦 推送数据:")
             logger.info(f"     数据大小: {len(data)}字节")
             logger.info(f"     数据内容: {json.dumps(alert_info, indent=2, ensure_ascii=False)}")
@@ -230,17 +471,13 @@ class HTTPPusher:
             start_time = time.time()
             
             if method == 'GET':
-                response = self.session.get(url, headers=headers, timeout=timeout, params=alert_info)
+                response = self.session.get(url, timeout=timeout, params=alert_info)
                 logger.info(f"📤 GET请求已发送，查询参数: {alert_info}")
-            elif method == 'PUT':
-                response = self.session.put(url, data=data, headers=headers, timeout=timeout)
-                logger.info(f"📤 PUT请求已发送")
-            elif method == 'PATCH':
-                response = self.session.patch(url, data=data, headers=headers, timeout=timeout)
-                logger.info(f"📤 PATCH请求已发送")
-            else:  # 默认POST
-                response = self.session.post(url, data=data, headers=headers, timeout=timeout)
-                logger.info(f"📤 POST请求已发送")
+            else:
+                request = self._prepared.copy()
+                request.prepare_body(data, None)
+                response = self.session.send(request, timeout=timeout, **self._send_kwargs)
+                logger.info(f"📤 {request.method}请求已发送")
             
             response_time = time.time() - start_time
             
@@ -264,7 +501,8 @@ class HTTPPusher:
             if 200 <= response.status_code < 300:
                 logger.info(f"✅ HTTPPusher推送成功! 状态码: {response.status_code}, 耗时: {response_time:.3f}秒")
                 logger.info("🎉 ==================== HTTPPusher推送完成 ====================")
-                logger.log_push("HTTP", True, f"推送成功，状态码: {response.status_code}", response_time)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.log_push("HTTP", True, f"推送成功，状态码: {response.status_code}", response_time)
                 return True
             else:
                 logger.error(f"❌ HTTPPusher推送失败! HTTP状态码: {response.status_code}")
@@ -274,25 +512,33 @@ class HTTPPusher:
                 return False
                 
         except requests.exceptions.Timeout as e:
-            logger.error(f"⏰ HTTPPusher推送超时! 超时时间: {self.config.get('timeout', 10)}秒")
+            logger.error(f"⏰ HTTPPusher推送超时! 超时时间: {self._timeout}秒")
             logger.error(f"💥 超时详情: {e}")
             logger.error("💔 ==================== HTTPPusher推送超时 ====================")
             logger.log_push("HTTP", False, f"推送超时: {e}")
             return False
             
         except requests.exceptions.ConnectionError as e:
-            logger.error(f"🔌 HTTPPusher连接失败! 无法连接到: {self.config.get('url')}")
+            logger.error(f"🔌 HTTPPusher连接失败! 无法连接到: {self._url}")
             logger.error(f"💥 连接错误: {e}")
             logger.error("💔 ==================== HTTPPusher连接失败 ====================")
             logger.log_push("HTTP", False, f"连接失败: {e}")
             return False
             
-        except Exception as e:
-            logger.error(f"💀 HTTPPusher未知异常!")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"💀 HTTPPusher请求异常!")
             logger.error(f"💥 异常详情: {e}")
             logger.error("💔 ==================== HTTPPusher异常 ====================")
             logger.log_push("HTTP", False, f"推送异常: {e}")
             return False
+    
+    def close(self):
+        """发送剩余告警并关闭会话"""
+        if self._queue:
+            self._queue.stop()
+            self._queue.drain()
+        if self.session:
+            self.session.close()
 
 
 class RabbitMQPusher:
@@ -300,14 +546,45 @@ class RabbitMQPusher:
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        self.breaker = CircuitBreaker(
+            'RabbitMQ',
+            failure_threshold=config.get('circuit_failure_threshold', 5),
+            cooldown=config.get('circuit_cooldown', 30.0)
+        )
         self.connection = None
         self.channel = None
         
+        # 断线重连退避：首次失败后等待 reconnect_delay 秒，之后每次翻倍，不超过 reconnect_max_delay
+        self._reconnect_delay = config.get('reconnect_delay', 1.0)
+        self._reconnect_max_delay = config.get('reconnect_max_delay', 30.0)
+        self._next_delay = self._reconnect_delay
+        self._reconnect_at = 0.0
+        
+        # 推送热路径使用的配置项
+        self._exchange = config.get('exchange', 'atlas_alerts')
+        self._routing_key = config.get('routing_key', 'vision.detection')
+        self._props = None
+        
+        # 发送队列，由专用 I/O 线程批量发送
+        # pika 的 BlockingConnection 不是线程安全的，I/O 线程启动后连接的建立、使用和重连都只在该线程中进行
+        self._queue = SendQueue(
+            'RabbitMQ', self._send_batch,
+            max_size=config.get('buffer_size', 10000),
+            batch_size=config.get('flush_batch_size', 64),
+            interval=config.get('flush_interval', 0.05),
+            on_idle=self._process_events
+        )
+        
         if RABBITMQ_AVAILABLE:
+            self._props = pika.BasicProperties(
+                delivery_mode=2,  # 持久化消息
+                content_type='application/json'
+            )
             self._init_connection()
+            self._queue.start()
     
-    def _init_connection(self):
-        """初始化 RabbitMQ 连接"""
+    def _init_connection(self) -> bool:
+        """初始化 RabbitMQ 连接，失败时安排退避重连"""
         try:
             # 连接参数
             host = self.config.get('host', 'localhost')
@@ -324,48 +601,114 @@ class RabbitMQPusher:
             self.channel = self.connection.channel()
             
             # 声明交换机
-            exchange = self.config.get('exchange', 'atlas_alerts')
-            self.channel.exchange_declare(exchange, 'topic', durable=True)
+            self.channel.exchange_declare(self._exchange, 'topic', durable=True)
+            
+            # 发布确认：BlockingChannel 开启后每次 basic_publish 都会同步等待 broker 确认，
+            # 批量发送退化为逐条往返，默认关闭，需要可靠投递时显式开启
+            if self.config.get('confirm_delivery', False):
+                self.channel.confirm_delivery()
             
+            self._next_delay = self._reconnect_delay
             logger.info("RabbitMQ 连接初始化成功")
+            return True
             
         except Exception as e:
-            logger.error(f"RabbitMQ 连接初始化失败: {e}")
+            self._drop_connection()
+            self._schedule_reconnect(e)
+            return False
+    
+    def _schedule_reconnect(self, error: Exception):
+        """记录一次连接失败并安排下次重连时间（指数退避）"""
+        self.breaker.record(False)
+        delay = self._next_delay
+        self._reconnect_at = time.monotonic() + delay
+        self._next_delay = min(delay * 2, self._reconnect_max_delay)
+        logger.error(f"RabbitMQ 连接不可用，{delay:.1f} 秒后重连: {error}")
+    
+    def _drop_connection(self):
+        """丢弃失效的连接"""
+        connection = self.connection
+        self.connection = None
+        self.channel = None
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
     
-    def push(self, alert_info: Dict[str, Any]) -> bool:
-        """推送告警信息"""
-        if not RABBITMQ_AVAILABLE or not self.channel:
+    def _ensure_connection(self) -> bool:
+        """I/O 线程：连接不可用且到达重连时间时尝试重连"""
+        if self.channel is not None:
+            return True
+        if time.monotonic() < self._reconnect_at:
             return False
+        return self._init_connection()
+    
+    def push(self, alert_info: Dict[str, Any], payload: Optional[bytes] = None) -> bool:
+        """推送告警信息，payload 为已序列化的告警 JSON（可选）"""
+        if self.breaker.is_open:
+            return False
+        
+        # 断线期间不入队，由 I/O 线程按退避重连
+        if not RABBITMQ_AVAILABLE or self.channel is None:
+            return False
+        
+        # 准备消息
+        message = payload if payload is not None else _encode_json(alert_info)
         
+        if not self._queue.put(message):
+            logger.log_push("RabbitMQ", False, "发送队列已满，丢弃告警")
+            return False
+        return True
+    
+    def _process_events(self):
+        """处理心跳等网络事件，保持连接存活；连接断开时按退避重连"""
+        if not self._ensure_connection():
+            return
         try:
-            exchange = self.config.get('exchange', 'atlas_alerts')
-            routing_key = self.config.get('routing_key', 'vision.detection')
-            
-            # 准备消息
-            message = json.dumps(alert_info, ensure_ascii=False)
-            
-            # 发送消息
-            self.channel.basic_publish(
-                exchange=exchange,
-                routing_key=routing_key,
-                body=message,
-                properties=pika.BasicProperties(
-                    delivery_mode=2,  # 持久化消息
-                    content_type='application/json'
+            self.connection.process_data_events(time_limit=0)
+        except pika.exceptions.AMQPConnectionError as e:
+            self._drop_connection()
+            self._schedule_reconnect(e)
+    
+    def _send_batch(self, batch: List[bytes]):
+        """I/O 线程：发送一批消息"""
+        if not self._ensure_connection():
+            logger.log_push("RabbitMQ", False, f"连接不可用，丢弃 {len(batch)} 条消息")
+            return
+        
+        exchange = self._exchange
+        routing_key = self._routing_key
+        props = self._props
+        try:
+            for message in batch:
+                self.channel.basic_publish(
+                    exchange=exchange,
+                    routing_key=routing_key,
+                    body=message,
+                    properties=props
                 )
-            )
-            
-            logger.log_push("RabbitMQ", True, f"消息已发送到交换机: {exchange}")
-            return True
-            
-        except Exception as e:
-            logger.log_push("RabbitMQ", False, f"推送异常: {e}")
-            return False
+        except pika.exceptions.AMQPConnectionError as e:
+            logger.log_push("RabbitMQ", False, f"批量推送异常: {e}")
+            self._drop_connection()
+            self._schedule_reconnect(e)
+            return
+        except pika.exceptions.AMQPError as e:
+            logger.log_push("RabbitMQ", False, f"批量推送异常: {e}")
+            self.breaker.record(False)
+            return
+        
+        self.breaker.record(True)
+        if logger.isEnabledFor(logging.INFO):
+            logger.log_push("RabbitMQ", True, f"{len(batch)} 条消息已发送到交换机: {exchange}")
     
     def close(self):
         """关闭连接"""
-        if self.connection:
-            self.connection.close()
+        self._queue.stop()
+        
+        if self.channel is not None:
+            self._queue.drain()
+        self._drop_connection()
 
 
 class KafkaPusher:
@@ -373,8 +716,27 @@ class KafkaPusher:
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        self.breaker = CircuitBreaker(
+            'Kafka',
+            failure_threshold=config.get('circuit_failure_threshold', 5),
+            cooldown=config.get('circuit_cooldown', 30.0)
+        )
         self.producer = None
         
+        # 推送热路径使用的配置项
+        self._topic = config.get('topic', 'atlas_alerts')
+        # 是否等待 broker 确认；默认不等待，发送失败由回调记录
+        self._await_ack = config.get('await_ack', False)
+        self._ack_timeout = config.get('ack_timeout', 10)
+        
+        # 发送队列，由专用 I/O 线程批量发送
+        self._queue = SendQueue(
+            'Kafka', self._send_batch,
+            max_size=config.get('buffer_size', 10000),
+            batch_size=config.get('flush_batch_size', 500),
+            interval=config.get('flush_interval', 0.05)
+        )
+        
         if KAFKA_PYTHON_AVAILABLE:
             self._init_producer()
     
@@ -384,85 +746,167 @@ class KafkaPusher:
             bootstrap_servers = self.config.get('bootstrap_servers', ['localhost:9092'])
             client_id = self.config.get('client_id', 'atlas_vision_producer')
             
+            compression = self.config.get('compression', 'lz4' if has_lz4() else None)
+            if compression == 'lz4' and not has_lz4():
+                logger.warning("lz4 库未安装，Kafka 消息不压缩")
+                compression = None
+            
             self.producer = KafkaProducer(
                 bootstrap_servers=bootstrap_servers,
                 client_id=client_id,
-                value_serializer=lambda v: json.dumps(v, ensure_ascii=False).encode('utf-8')
+                value_serializer=_serialize_kafka_value,
+                acks=self.config.get('acks', 1),
+                linger_ms=self.config.get('linger_ms', 20),
+                batch_size=self.config.get('batch_size', 65536),
+                compression_type=compression,
+                max_in_flight_requests_per_connection=self.config.get('max_in_flight', 5)
             )
             
+            # 启动 I/O 线程
+            self._queue.start()
+            
             logger.info("Kafka 生产者初始化成功")
             
         except Exception as e:
             logger.error(f"Kafka 生产者初始化失败: {e}")
     
-    def push(self, alert_info: Dict[str, Any]) -> bool:
-        """推送告警信息"""
+    def push(self, alert_info: Dict[str, Any], payload: Optional[bytes] = None) -> bool:
+        """推送告警信息，payload 为已序列化的告警 JSON（可选）"""
+        if self.breaker.is_open:
+            return False
+        
         if not KAFKA_PYTHON_AVAILABLE or not self.producer:
             return False
         
-        try:
-            topic = self.config.get('topic', 'atlas_alerts')
-            
-            # 发送消息
-            future = self.producer.send(topic, alert_info)
-            record_metadata = future.get(timeout=10)
-            
-            logger.log_push("Kafka", True, 
-                          f"消息已发送到主题: {topic}, 分区: {record_metadata.partition}, "
-                          f"偏移量: {record_metadata.offset}")
-            return True
-            
-        except Exception as e:
-            logger.log_push("Kafka", False, f"推送异常: {e}")
+        if not self._queue.put(payload if payload is not None else alert_info):
+            logger.log_push("Kafka", False, "发送队列已满，丢弃告警")
             return False
+        return True
+    
+    def _send_batch(self, batch: List[Any]):
+        """
+        I/O 线程：发送一批消息
+        
+        await_ack 为 True 时整批只等待一次 flush 并检查每条消息的确认结果；
+        否则消息交给生产者后台线程批量发送，不等待确认
+        """
+        topic = self._topic
+        try:
+            if self._await_ack:
+                futures = [self.producer.send(topic, value) for value in batch]
+                self.producer.flush(timeout=self._ack_timeout)
+                for future in futures:
+                    future.get(timeout=self._ack_timeout)
+            else:
+                for value in batch:
+                    self.producer.send(topic, value).add_errback(self._on_send_error)
+        except KafkaError as e:
+            logger.log_push("Kafka", False, f"批量推送异常: {e}")
+            self.breaker.record(False)
+            return
+        
+        self.breaker.record(True)
+        if logger.isEnabledFor(logging.INFO):
+            logger.log_push("Kafka", True, f"{len(batch)} 条消息已发送到主题: {topic}")
+    
+    def _on_send_error(self, exc: Exception):
+        """生产者后台线程：未等待确认的消息发送失败"""
+        logger.log_push("Kafka", False, f"推送异常: {exc}")
+        self.breaker.record(False)
+    
+    def flush(self):
+        """同步发送队列中剩余的消息，并等待生产者缓冲区发送完毕"""
+        if not self.producer:
+            return
+        
+        self._queue.drain()
+        self.producer.flush()
     
     def close(self):
         """关闭生产者"""
+        self._queue.stop()
+        
         if self.producer:
+            self.flush()
             self.producer.close()
 
-    def _send_kafka_notification(self, alert_data: Dict[str, Any]):
-        if not KAFKA_PYTHON_AVAILABLE:
-            logging.error("Kafka push is enabled, but 'kafka-python' library is not installed.")
-            return
 
-        servers = self.config.get('kafka_bootstrap_servers')
-        topic = self.config.get('kafka_topic')
+# 进程内共享的推送器与异步推送线程池：PushNotificationManager 与
+# PushNotificationService 按协议和配置复用同一推送器，避免重复建立连接和 I/O 线程
+_PUSHERS: Dict[tuple, list] = {}  # (协议, 配置) -> [Future(推送器), 引用计数]
+_PUSHERS_LOCK = threading.Lock()
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
 
-        if not servers or not topic:
-            logging.error("Kafka push is enabled, but bootstrap servers or topic is not configured.")
-            return
 
-        logging.info(f"Sending Kafka notification to topic '{topic}' on servers '{servers}'")
-        
-        producer = None
-        try:
-            producer = KafkaProducer(
-                bootstrap_servers=servers.split(','),
-                value_serializer=lambda v: json.dumps(v, ensure_ascii=False).encode('utf-8'),
-                # Add a timeout for producer to avoid blocking indefinitely
-                request_timeout_ms=5000 
-            )
-            
-            # Send the message
-            future = producer.send(topic, value=alert_data)
-            
-            # Block for 'synchronous' sends
-            record_metadata = future.get(timeout=10)
-            
-            logging.info(
-                f"Kafka notification sent successfully. "
-                f"Topic: {record_metadata.topic}, Partition: {record_metadata.partition}, "
-                f"Offset: {record_metadata.offset}"
-            )
+def _pusher_key(protocol: str, config: Dict[str, Any]) -> tuple:
+    return (protocol, json.dumps(config, sort_keys=True, default=str))
+
 
+def _acquire_pusher(protocol: str, pusher_cls: type, config: Dict[str, Any]):
+    """
+    获取共享推送器，不存在时创建（MQTT 推送器同时建立连接）
+    
+    全局锁内只登记占位 Future，推送器的创建和连接在锁外进行，某个服务不可达时
+    不会阻塞其他配置或协议的推送器获取与释放；同一配置的并发获取等待首个创建结果
+    """
+    key = _pusher_key(protocol, config)
+    with _PUSHERS_LOCK:
+        entry = _PUSHERS.get(key)
+        creator = entry is None
+        if creator:
+            entry = _PUSHERS[key] = [Future(), 0]
+        entry[1] += 1
+        future = entry[0]
+    
+    if creator:
+        try:
+            pusher = pusher_cls(config)
+            if hasattr(pusher, 'connect'):
+                pusher.connect()
         except Exception as e:
-            logging.error(f"Failed to send Kafka notification. Error: {e}")
-        finally:
-            if producer:
-                producer.flush()
-                producer.close()
-                logging.info("Kafka producer closed.")
+            # 创建失败时撤销占位，下次获取重新创建
+            with _PUSHERS_LOCK:
+                if _PUSHERS.get(key) is entry:
+                    del _PUSHERS[key]
+            future.set_exception(e)
+            raise
+        future.set_result(pusher)
+    
+    return future.result()
+
+
+def _release_pusher(protocol: str, config: Dict[str, Any]):
+    """释放共享推送器，最后一个使用者释放时关闭"""
+    key = _pusher_key(protocol, config)
+    with _PUSHERS_LOCK:
+        entry = _PUSHERS.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del _PUSHERS[key]
+    
+    # 引用计数归零说明所有获取方都已拿到推送器，Future 已完成
+    pusher = entry[0].result()
+    if hasattr(pusher, 'disconnect'):
+        pusher.disconnect()
+    elif hasattr(pusher, 'close'):
+        pusher.close()
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """获取共享的异步推送线程池，线程数由首次创建时的配置决定"""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix='push'
+                )
+    return _EXECUTOR
 
 
 class PushNotificationManager:
@@ -474,15 +918,47 @@ class PushNotificationManager:
         self.push_threads = {}
         self.is_running = False
         
+        # 会话内不变的告警字段及其预序列化 JSON 前缀
+        self._static_fields: Dict[str, Any] = {}
+        self._static_json: Optional[bytes] = None
+        # 设备ID、模型ID、场景等由 push.static_fields 配置，附加到每条告警
+        self.set_static_fields(config.get('push.static_fields') or {})
+
+        # 突发告警合并：窗口内同一键（默认摄像头+类别）的重复告警只推送首条，
+        # 其余在窗口结束时合并为一条带计数的告警；窗口为 0 时不合并
+        self._coalesce_window = config.get('push.coalesce_ms', 0) / 1000.0
+        self._coalesce_keys = tuple(config.get('push.coalesce_keys', ['camera_id', 'class_name']))
+        self._coalesce: Dict[tuple, list] = {}  # 键 -> [被合并条数, 最后一条告警, 窗口结束时间]
+        self._coalesce_lock = threading.Lock()
+        self._coalesce_cond = threading.Condition(self._coalesce_lock)
+        self._coalesce_thread = None
+        self._coalesce_running = False
+        
+        # 异步推送线程池（进程内共享），限制并发推送线程数
+        self._executor = _get_executor(config.get('push.workers', 4))
+        # 本管理器提交且尚未完成的异步任务，清理时等待其完成
+        self._pending: set = set()
+        # 已获取的共享推送器配置，清理时逐个释放
+        self._pusher_configs: Dict[str, Dict[str, Any]] = {}
+        
         self._init_pushers()
+        
+        # 各协议并行推送线程池，与异步推送线程池分开以避免任务互相等待造成死锁
+        self._push_timeout = config.get('push.timeout', 30)
+        self._fanout_executor = None
+        if len(self.pushers) > 1:
+            self._fanout_executor = ThreadPoolExecutor(
+                max_workers=len(self.pushers),
+                thread_name_prefix='push_fanout'
+            )
     
     def _init_pushers(self):
         """初始化推送器"""
         # MQTT 推送器
         mqtt_config = self.config.get_mqtt_config()
         if mqtt_config.get('enabled', False):
-            self.pushers['mqtt'] = MQTTPusher(mqtt_config)
-            if self.pushers['mqtt'].connect():
+            self._add_pusher('mqtt', MQTTPusher, mqtt_config)
+            if self.pushers['mqtt'].is_connected:
                 logger.info("MQTT 推送器连接成功")
             else:
                 logger.warning("MQTT 推送器连接失败")
@@ -490,47 +966,170 @@ class PushNotificationManager:
         # HTTP 推送器
         http_config = self.config.get_http_config()
         if http_config.get('enabled', False):
-            self.pushers['http'] = HTTPPusher(http_config)
+            self._add_pusher('http', HTTPPusher, http_config)
             logger.info("HTTP 推送器初始化成功")
         
         # RabbitMQ 推送器
         rabbitmq_config = self.config.get_rabbitmq_config()
         if rabbitmq_config.get('enabled', False):
-            self.pushers['rabbitmq'] = RabbitMQPusher(rabbitmq_config)
+            self._add_pusher('rabbitmq', RabbitMQPusher, rabbitmq_config)
             logger.info("RabbitMQ 推送器初始化成功")
         
         # Kafka 推送器
         kafka_config = self.config.get_kafka_config()
         if kafka_config.get('enabled', False):
-            self.pushers['kafka'] = KafkaPusher(kafka_config)
+            self._add_pusher('kafka', KafkaPusher, kafka_config)
             logger.info("Kafka 推送器初始化成功")
         
         logger.info(f"初始化了 {len(self.pushers)} 个推送器")
     
+    def _add_pusher(self, protocol: str, pusher_cls: type, config: Dict[str, Any]):
+        """获取共享推送器并登记到本管理器"""
+        self.pushers[protocol] = _acquire_pusher(protocol, pusher_cls, config)
+        self._pusher_configs[protocol] = config
+    
+    def set_static_fields(self, static_fields: Dict[str, Any]):
+        """
+        设置会话内不变的告警字段（如设备ID、模型ID、场景）
+        
+        静态字段只序列化一次，推送时与每条告警的动态字段直接拼接，
+        同名字段以告警中的动态值为准
+        
+        Args:
+            static_fields: 静态字段，传入空字典可清除
+        """
+        self._static_fields = dict(static_fields)
+        if static_fields:
+            # 去掉结尾的 '}'，留待与动态字段拼接
+            self._static_json = _encode_json(static_fields)[:-1]
+        else:
+            self._static_json = None
+    
+    def _encode_alert(self, alert_info: Dict[str, Any]) -> bytes:
+        """将告警序列化为 JSON，设置了静态字段时与其预序列化前缀拼接"""
+        if self._static_json is None:
+            return _encode_json(alert_info)
+        if not alert_info:
+            return self._static_json + b'}'
+        return self._static_json + b',' + _encode_json(alert_info)[1:]
+    
     def push_alert(self, alert_info: Dict[str, Any]) -> Dict[str, bool]:
-        """推送告警信息"""
+        """
+        推送告警信息
+        
+        启用告警合并时，窗口内被合并的重复告警不会立即推送，返回空字典
+        """
+        if self._coalesce_window > 0 and not self._coalesce_alert(alert_info):
+            return {}
+        return self._dispatch(alert_info)
+    
+    def _coalesce_alert(self, alert_info: Dict[str, Any]) -> bool:
+        """记录告警到合并窗口，返回是否需要立即推送（窗口内首条告警）"""
+        key = tuple(alert_info.get(k) for k in self._coalesce_keys)
+        with self._coalesce_cond:
+            entry = self._coalesce.get(key)
+            if entry is not None:
+                entry[0] += 1
+                entry[1] = alert_info
+                return False
+            
+            self._coalesce[key] = [0, None, time.monotonic() + self._coalesce_window]
+            if self._coalesce_thread is None:
+                self._coalesce_running = True
+                self._coalesce_thread = threading.Thread(
+                    target=self._coalesce_loop, name='push_coalesce', daemon=True
+                )
+                self._coalesce_thread.start()
+            elif len(self._coalesce) == 1:
+                self._coalesce_cond.notify()
+            return True
+    
+    def _coalesce_loop(self):
+        """
+        合并窗口调度线程，所有键的窗口由这一个线程按到期顺序结束
+        
+        窗口长度固定，字典按插入顺序即按到期时间排列，首个键总是最先到期
+        """
+        while True:
+            with self._coalesce_cond:
+                while self._coalesce_running and not self._coalesce:
+                    self._coalesce_cond.wait()
+                if not self._coalesce_running:
+                    return
+                key, entry = next(iter(self._coalesce.items()))
+                delay = entry[2] - time.monotonic()
+                if delay > 0:
+                    self._coalesce_cond.wait(delay)
+                    continue
+            try:
+                self._flush_coalesced(key)
+            except Exception as e:
+                logger.error(f"合并告警推送失败: {e}")
+    
+    def _flush_coalesced(self, key: tuple, sync: bool = False):
+        """窗口结束，将窗口内被合并的告警作为一条带计数的告警推送"""
+        with self._coalesce_lock:
+            entry = self._coalesce.pop(key, None)
+        if not entry or not entry[0]:
+            return
+        
+        count, last_alert, _ = entry
+        merged = dict(last_alert)
+        merged['coalesced_count'] = count
+        if sync:
+            self._dispatch(merged)
+        else:
+            self._submit(self._dispatch, merged)
+    
+    def _dispatch(self, alert_info: Dict[str, Any]) -> Dict[str, bool]:
+        """将告警推送到所有推送器"""
         results = {}
         
-        for protocol, pusher in self.pushers.items():
+        # 每条告警只序列化一次，所有推送器共用同一份 payload
+        payload = self._encode_alert(alert_info)
+        if self._static_fields:
+            alert_info = {**self._static_fields, **alert_info}
+        
+        # 只有一个推送器时直接在当前线程推送
+        if self._fanout_executor is None:
+            for protocol, pusher in self.pushers.items():
+                try:
+                    results[protocol] = pusher.push(alert_info, payload)
+                except Exception as e:
+                    logger.error(f"{protocol} 推送异常: {e}")
+                    results[protocol] = False
+            return results
+        
+        # 各协议并行推送，总耗时取决于最慢的协议
+        futures = {
+            protocol: self._fanout_executor.submit(pusher.push, alert_info, payload)
+            for protocol, pusher in self.pushers.items()
+        }
+        for protocol, future in futures.items():
             try:
-                success = pusher.push(alert_info)
-                results[protocol] = success
+                results[protocol] = future.result(timeout=self._push_timeout)
             except Exception as e:
                 logger.error(f"{protocol} 推送异常: {e}")
                 results[protocol] = False
         
         return results
     
-    def push_alert_async(self, alert_info: Dict[str, Any]):
+    def push_alert_async(self, alert_info: Dict[str, Any]) -> Future:
         """异步推送告警信息"""
         def push_task():
             results = self.push_alert(alert_info)
             success_count = sum(1 for success in results.values() if success)
             logger.info(f"异步推送完成，成功: {success_count}/{len(results)}")
+            return results
         
-        thread = threading.Thread(target=push_task, daemon=True)
-        thread.start()
-        return thread
+        return self._submit(push_task)
+    
+    def _submit(self, fn: Callable, *args) -> Future:
+        """提交到共享线程池，并记录为本管理器的未完成任务"""
+        future = self._executor.submit(fn, *args)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
     
     def get_status(self) -> Dict[str, Any]:
         """获取推送器状态"""
@@ -547,27 +1146,116 @@ class PushNotificationManager:
                     'connected': True,  # 假设可用
                     'available': True
                 }
+            status[protocol]['circuit_open'] = pusher.breaker.is_open
         
         return status
     
     def cleanup(self):
         """清理资源"""
-        for protocol, pusher in self.pushers.items():
+        # 先推送合并窗口中尚未发出的告警
+        with self._coalesce_cond:
+            self._coalesce_running = False
+            self._coalesce_cond.notify()
+        if self._coalesce_thread:
+            self._coalesce_thread.join(timeout=5.0)
+            self._coalesce_thread = None
+        with self._coalesce_lock:
+            pending = list(self._coalesce)
+        for key in pending:
+            self._flush_coalesced(key, sync=True)
+        
+        # 共享线程池不关闭，只等待本管理器提交的任务完成
+        wait(list(self._pending))
+        if self._fanout_executor:
+            self._fanout_executor.shutdown(wait=True)
+        
+        for protocol, config in self._pusher_configs.items():
             try:
-                if hasattr(pusher, 'disconnect'):
-                    pusher.disconnect()
-                elif hasattr(pusher, 'close'):
-                    pusher.close()
+                _release_pusher(protocol, config)
                 logger.info(f"{protocol} 推送器已清理")
             except Exception as e:
                 logger.error(f"清理 {protocol} 推送器失败: {e}")
         
         self.pushers.clear()
+        self._pusher_configs.clear()
+
+
+def _release_service_pushers(pushers: Dict[str, Any], configs: Dict[str, Dict[str, Any]],
+                             lock: threading.Lock):
+    """释放 PushNotificationService 登记的共享推送器，由 close() 和 finalizer 调用"""
+    with lock:
+        protocols = list(pushers)
+        pushers.clear()
+    for protocol in protocols:
+        try:
+            _release_pusher(protocol, configs[protocol])
+            logging.info(f"{protocol} pusher released.")
+        except Exception as e:
+            logging.error(f"Failed to release {protocol} pusher. Error: {e}")
 
 
 class PushNotificationService:
     def __init__(self, config: Dict[str, Any]):
         self.config = config.get('push_notification', {})
+        # 推送时用到的配置项在构造时一次性取出
+        self._enabled = bool(self.config.get('enabled'))
+        self._push_type = self.config.get('type', 'http')
+        self._url = self.config.get('url')
+        self._method = self.config.get('method', 'POST').upper()
+        self._timeout = self.config.get('timeout', 10)
+        # 清理header前后空格，避免HTTP请求错误
+        self._custom_headers = {
+            str(key).strip(): str(value).strip()
+            for key, value in (self.config.get('headers') or {}).items()
+        }
+        self._headers = {'Content-Type': 'application/json', **self._custom_headers}
+        self._mqtt_broker = self.config.get('mqtt_broker')
+        self._mqtt_port = self.config.get('mqtt_port', 1883)
+        self._mqtt_topic = self.config.get('mqtt_topic')
+        self._kafka_servers = self.config.get('kafka_bootstrap_servers')
+        self._kafka_topic = self.config.get('kafka_topic')
+        # 与 PushNotificationManager 共享的推送器配置，首次推送时获取并在后续推送中复用
+        self._mqtt_pusher_config = {
+            'broker': self._mqtt_broker,
+            'port': self._mqtt_port,
+            'topic': self._mqtt_topic,
+            'username': self.config.get('username'),
+            'password': self.config.get('password'),
+            'client_id': 'atlas_vision_notifier',
+            'qos': 1
+        }
+        self._kafka_pusher_config = {
+            'bootstrap_servers': self._kafka_servers.split(',') if self._kafka_servers else [],
+            'topic': self._kafka_topic,
+            'client_id': 'atlas_vision_notifier'
+        }
+        self._pusher_configs = {'mqtt': self._mqtt_pusher_config, 'kafka': self._kafka_pusher_config}
+        self._pushers: Dict[str, Any] = {}
+        self._clients_lock = threading.Lock()
+        # finalizer 不引用实例本身，实例被回收或进程退出时释放推送器
+        weakref.finalize(self, _release_service_pushers, self._pushers, self._pusher_configs, self._clients_lock)
+    
+    def close(self):
+        """释放共享推送器"""
+        _release_service_pushers(self._pushers, self._pusher_configs, self._clients_lock)
+    
+    def _get_pusher(self, protocol: str, pusher_cls: type, config: Dict[str, Any]):
+        """获取共享推送器，首次使用时登记"""
+        with self._clients_lock:
+            pusher = self._pushers.get(protocol)
+        if pusher is not None:
+            return pusher
+        
+        # 首次获取可能建立连接，在锁外进行
+        pusher = _acquire_pusher(protocol, pusher_cls, config)
+        with self._clients_lock:
+            existing = self._pushers.get(protocol)
+            if existing is None:
+                self._pushers[protocol] = pusher
+                return pusher
+        # 其他线程已先登记，归还本次多获取的引用
+        _release_pusher(protocol, config)
+        return existing
 
     def send_notification(self, alert_data: Dict[str, Any]):
         """
@@ -577,12 +1265,12 @@ class PushNotificationService:
         logging.info("🚨 ==================== 告警推送触发 ====================")
         logging.info(f"⏰ 触发时间: {time.strftime('%Y-%m-%d %H:%M:%S')}")
         
-        if not self.config.get('enabled'):
+        if not self._enabled:
             logging.warning("⚠️ 告警推送已禁用，跳过推送")
             logging.info("🔇 ==================== 推送已跳过 ====================")
             return
 
-        push_type = self.config.get('type', 'http')
+        push_type = self._push_type
         logging.info(f"📡 推送类型: {push_type.upper()}")
         logging.info(f"⚙️ 推送配置: {json.dumps(self.config, indent=2, ensure_ascii=False)}")
         logging.info(f"📋 告警数据:")
@@ -606,15 +1294,14 @@ class PushNotificationService:
             logging.error("💔 ==================== 推送执行失败 ====================")
 
     def _send_http_notification(self, alert_data: Dict[str, Any]):
-        url = self.config.get('url')
+        url = self._url
         if not url:
             logging.error("❌ HTTP推送失败: 未配置推送URL")
             return
 
-        # 获取推送配置信息
-        method = self.config.get('method', 'POST').upper()
-        timeout = self.config.get('timeout', 10)
-        custom_headers = self.config.get('headers', {})
+        method = self._method
+        timeout = self._timeout
+        headers = self._headers
         
         # 打印推送配置信息
         logging.info("🚀 ==================== HTTP告警推送开始 ====================")
@@ -622,21 +1309,9 @@ class PushNotificationService:
         logging.info(f"📋 请求方法: {method}")
         logging.info(f"⏱️  超时时间: {timeout}秒")
         
-        # 设置基础headers
-        headers = {'Content-Type': 'application/json'}
-        
-        # 合并自定义headers，并清理空格
-        if custom_headers:
-            cleaned_headers = {}
-            for key, value in custom_headers.items():
-                # 清理header值中的前后空格，避免HTTP请求错误
-                cleaned_key = str(key).strip()
-                cleaned_value = str(value).strip()
-                cleaned_headers[cleaned_key] = cleaned_value
-                
-            headers.update(cleaned_headers)
+        if self._custom_headers:
             logging.info(f"🔐 自定义Headers:")
-            for key, value in cleaned_headers.items():
+            for key, value in self._custom_headers.items():
                 # 隐藏敏感信息（如token）
                 if 'token' in key.lower() or 'auth' in key.lower() or 'key' in key.lower():
                     logging.info(f"     {key}: {value[:10]}***" if len(str(value)) > 10 else f"     {key}: ***")
@@ -729,9 +1404,9 @@ class PushNotificationService:
             logging.error("MQTT push is enabled, but 'paho-mqtt' library is not installed.")
             return
 
-        broker = self.config.get('mqtt_broker')
-        port = self.config.get('mqtt_port', 1883)
-        topic = self.config.get('mqtt_topic')
+        broker = self._mqtt_broker
+        port = self._mqtt_port
+        topic = self._mqtt_topic
 
         if not all([broker, port, topic]):
             logging.error("MQTT push is enabled, but broker, port, or topic is not fully configured.")
@@ -739,44 +1414,27 @@ class PushNotificationService:
             
         logging.info(f"Sending MQTT notification to topic '{topic}' on broker '{broker}:{port}'")
 
-        client = None
         try:
-            client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
-            
-            username = self.config.get('username')
-            password = self.config.get('password')
-            if username:
-                client.username_pw_set(username, password)
+            pusher = self._get_pusher('mqtt', MQTTPusher, self._mqtt_pusher_config)
+            # 连接断开时重新连接
+            if not pusher.is_connected:
+                pusher.connect()
 
-            client.connect(broker, port, 60)
-            client.loop_start()
-
-            payload = json.dumps(alert_data, ensure_ascii=False)
-            msg_info = client.publish(topic, payload, qos=1)
-            
-            # Wait for the message to be published
-            msg_info.wait_for_publish(timeout=5)
-
-            if msg_info.is_published():
+            if pusher.push(alert_data):
                 logging.info(f"MQTT notification sent successfully to topic '{topic}'.")
             else:
-                logging.error("Failed to publish MQTT message in time.")
+                logging.error("Failed to publish MQTT message.")
 
         except Exception as e:
             logging.error(f"Failed to send MQTT notification. Error: {e}")
-        finally:
-            if client:
-                client.loop_stop()
-                client.disconnect()
-                logging.info("MQTT client disconnected.")
 
     def _send_kafka_notification(self, alert_data: Dict[str, Any]):
         if not KAFKA_PYTHON_AVAILABLE:
             logging.error("Kafka push is enabled, but 'kafka-python' library is not installed.")
             return
 
-        servers = self.config.get('kafka_bootstrap_servers')
-        topic = self.config.get('kafka_topic')
+        servers = self._kafka_servers
+        topic = self._kafka_topic
 
         if not servers or not topic:
             logging.error("Kafka push is enabled, but bootstrap servers or topic is not configured.")
@@ -784,34 +1442,15 @@ class PushNotificationService:
 
         logging.info(f"Sending Kafka notification to topic '{topic}' on servers '{servers}'")
         
-        producer = None
         try:
-            producer = KafkaProducer(
-                bootstrap_servers=servers.split(','),
-                value_serializer=lambda v: json.dumps(v, ensure_ascii=False).encode('utf-8'),
-                # Add a timeout for producer to avoid blocking indefinitely
-                request_timeout_ms=5000 
-            )
+            pusher = self._get_pusher('kafka', KafkaPusher, self._kafka_pusher_config)
             
-            # Send the message
-            future = producer.send(topic, value=alert_data)
-            
-            # Block for 'synchronous' sends
-            record_metadata = future.get(timeout=10)
-            
-            logging.info(
-                f"Kafka notification sent successfully. "
-                f"Topic: {record_metadata.topic}, Partition: {record_metadata.partition}, "
-                f"Offset: {record_metadata.offset}"
-            )
+            # 消息进入推送器发送队列，由其 I/O 线程批量发送，发送失败由回调记录
+            if not pusher.push(alert_data):
+                logging.error("Failed to queue Kafka notification.")
 
         except Exception as e:
             logging.error(f"Failed to send Kafka notification. Error: {e}")
-        finally:
-            if producer:
-                producer.flush()
-                producer.close()
-                logging.info("Kafka producer closed.")
 
 # Example usage (for testing purposes)
 def example():
@@ -29,8 +29,15 @@ class TaskExecutor:
         self.video_processors = {}
         self.inference_engine = None
         self.alert_manager = None
+        self.model_labels = []
+        # 执行时间窗口：解析后的 (开始, 结束) 时间，解析失败为 False；以及按秒缓存的检查结果
+        self._schedule_window = None
+        self._execution_check = (0, True)
         self.last_detection_time = {}
         self.execution_thread = None
+        # 告警图片异步写盘：写盘失败但告警尚未入库的图片路径，入库前去掉引用
+        self._failed_images = set()
+        self._image_lock = threading.Lock()
         
         self._initialize()
     
@@ -39,6 +46,7 @@ class TaskExecutor:
         try:
             logger.info(f"开始初始化任务执行器: {self.task.name}")
             self.alert_manager = AlertManager(self.config)
+            self.alert_manager.on_image_failed = self._on_alert_image_failed
             logger.info(f"AlertManager 初始化完成")
             
             # 手动处理video_sources字段，确保它是列表格式
@@ -61,6 +69,8 @@ class TaskExecutor:
             if not model:
                 raise ValueError(f"模型不存在: {self.task.model_id}")
             logger.info(f"模型获取成功: {model.name}")
+            # 模型标签在任务运行期间不变，缓存下来避免每帧查询数据库
+            self.model_labels = model.labels or []
             
             # 处理模型路径，确保使用绝对路径
             model_path = model.file_path
@@ -152,20 +162,32 @@ class TaskExecutor:
         if self.execution_thread:
             self.execution_thread.join(timeout=5.0)
         
+        if self.alert_manager:
+            self.alert_manager.close()
+        
         logger.info(f"任务停止执行: {self.task.name}")
     
     def _execution_loop(self):
         """执行循环"""
+        # 任务配置和处理器在执行期间不变，循环外一次性绑定为局部变量
+        processors = list(self.video_processors.items())
+        last_detection_time = self.last_detection_time
+        inference_interval = self.task.inference_interval
+        confidence_threshold = self.task.confidence_threshold
+        detect = self.inference_engine.detect
+        process_detections = self._process_detections
+        in_execution_time = self._is_in_execution_time
+        
         while self.is_running:
             try:
                 current_time = time.time()
                 
-                if not self._is_in_execution_time():
+                if not in_execution_time():
                     time.sleep(60)
                     continue
                 
-                for source_url, processor in self.video_processors.items():
-                    if current_time - self.last_detection_time[source_url] < self.task.inference_interval:
+                for source_url, processor in processors:
+                    if current_time - last_detection_time[source_url] < inference_interval:
                         continue
                     
                     frame_data = processor.get_frame()
@@ -174,16 +196,17 @@ class TaskExecutor:
                     
                     frame, frame_time = frame_data
                     
-                    detections, inference_time = self.inference_engine.detect(frame)
+                    detections, inference_time = detect(frame)
                     
                     # 根据任务的置信度阈值过滤检测结果
                     filtered_detections = [
                         d for d in detections 
-                        if d.get('confidence', 0.0) >= self.task.confidence_threshold
+                        if d.get('confidence', 0.0) >= confidence_threshold
                     ]
                     
-                    self._process_detections(filtered_detections, source_url, frame, frame_time)
-                    self.last_detection_time[source_url] = current_time
+                    if filtered_detections:
+                        process_detections(filtered_detections, source_url, frame, frame_time)
+                    last_detection_time[source_url] = current_time
                 
                 time.sleep(0.1)
                 
@@ -196,38 +219,44 @@ class TaskExecutor:
         if self.task.schedule_type == 'continuous':
             return True
         
-        now = datetime.now()
-        current_time = now.time()
-        current_weekday = str(now.isoweekday())
-        
-        try:
-            start_time = datetime.strptime(self.task.start_time, '%H:%M:%S').time()
-            end_time = datetime.strptime(self.task.end_time, '%H:%M:%S').time()
-        except:
-            return True
+        # 执行循环约每 0.1 秒检查一次，结果按秒缓存，同一秒内直接复用
+        second = int(time.time())
+        if self._execution_check[0] == second:
+            return self._execution_check[1]
         
-        time_in_range = start_time <= current_time <= end_time
+        # 起止时间只解析一次（strptime 开销较大）
+        if self._schedule_window is None:
+            try:
+                self._schedule_window = (
+                    datetime.strptime(self.task.start_time, '%H:%M:%S').time(),
+                    datetime.strptime(self.task.end_time, '%H:%M:%S').time()
+                )
+            except:
+                self._schedule_window = False
         
-        if self.task.schedule_type == 'daily':
-            return time_in_range
-        elif self.task.schedule_type == 'weekly':
-            return time_in_range and current_weekday in self.task.schedule_days
-        elif self.task.schedule_type == 'monthly':
-            return time_in_range
+        if not self._schedule_window:
+            result = True
+        else:
+            now = datetime.fromtimestamp(second)
+            start_time, end_time = self._schedule_window
+            time_in_range = start_time <= now.time() <= end_time
+            
+            if self.task.schedule_type == 'weekly':
+                result = time_in_range and str(now.isoweekday()) in self.task.schedule_days
+            elif self.task.schedule_type in ('daily', 'monthly'):
+                result = time_in_range
+            else:
+                result = True
         
-        return True
+        self._execution_check = (second, result)
+        return result
     
     def _process_detections(self, detections: List[Dict], source_url: str, frame, frame_time):
         """处理检测结果"""
         if not detections:
             return
         
-        # 获取模型标签
-        model_repo = ModelRepository()
-        model = model_repo.get_model_by_id(self.task.model_id)
-        model_labels = []
-        if model and hasattr(model, 'labels') and model.labels:
-            model_labels = model.labels
+        model_labels = self.model_labels
         
         # 获取ROI区域（如果有）
         roi = None
@@ -236,6 +265,15 @@ class TaskExecutor:
                 roi = source.get('roi')
                 break
         
+        # 同一帧产生的告警先收集，循环结束后一次性写入
+        pending_alerts = []
+        pending_keys = set()
+        
+        # 循环内不变的任务属性只取一次
+        task_id = self.task.id
+        debounce_interval = self.task.alert_debounce_interval
+        should_debounce_alert = self.alert_manager.should_debounce_alert
+        
         for detection in detections:
             confidence = detection.get('confidence', 0.0)
             class_id = detection.get('class_id', 0)
@@ -254,12 +292,11 @@ class TaskExecutor:
                 detection['roi'] = roi
             
             # 生成告警键
-            alert_key = f"task_{self.task.id}_{class_name}"
+            alert_key = f"task_{task_id}_{class_name}"
             
             # 检查防抖
-            debounce_interval = self.task.alert_debounce_interval
-            if self.alert_manager.should_debounce_alert(alert_key, debounce_interval):
-                logger.debug(f"告警被防抖过滤: {class_name}")
+            if alert_key in pending_keys or should_debounce_alert(alert_key, debounce_interval):
+                logger.debug("告警被防抖过滤: %s", class_name)
                 continue
             
             logger.info(f"检测到对象: {class_name}, 置信度: {confidence:.2f}")
@@ -300,14 +337,42 @@ class TaskExecutor:
                     detection_class=class_name
                 )
                 
-                alert_repo = AlertRepository()
-                alert = alert_repo.create_alert(alert_create)
-                
-                logger.info(f"创建告警: {alert.id} - {class_name} (置信度: {confidence:.2f})")
-                self.alert_manager.record_alert_time(alert_key)
+                pending_alerts.append((alert_key, alert_create))
+                pending_keys.add(alert_key)
                 
             except Exception as e:
                 logger.error(f"处理告警失败: {e}")
+        
+        if not pending_alerts:
+            return
+        
+        try:
+            # 与写盘失败回调互斥：图片在入库前写盘失败的告警不再引用该图片
+            with self._image_lock:
+                if self._failed_images:
+                    for _, alert_create in pending_alerts:
+                        if alert_create.alert_image in self._failed_images:
+                            alert_create.alert_image = None
+                    self._failed_images.clear()
+                alert_ids = AlertRepository().bulk_create_alerts([alert for _, alert in pending_alerts])
+        except Exception as e:
+            logger.error(f"写入告警失败: {e}")
+            return
+        
+        for alert_id, (alert_key, alert_create) in zip(alert_ids, pending_alerts):
+            logger.info(f"创建告警: {alert_id} - {alert_create.detection_class} (置信度: {alert_create.confidence:.2f})")
+            self.alert_manager.record_alert_time(alert_key)
+    
+    def _on_alert_image_failed(self, image_path: str):
+        """告警图片写盘失败（写盘线程中调用）：去掉告警记录中对该图片的引用"""
+        with self._image_lock:
+            try:
+                if AlertRepository().clear_alert_image(image_path):
+                    return
+            except Exception as e:
+                logger.error(f"清除告警图片引用失败: {e}")
+            # 告警尚未入库（或更新失败），入库前去掉引用
+            self._failed_images.add(image_path)
     
     def get_status(self) -> Dict[str, Any]:
         """获取任务状态"""
@@ -361,14 +426,19 @@ class TaskScheduler:
         """调度循环"""
         while self.is_running:
             try:
-                tasks = self.task_repo.get_all_tasks_for_scheduling()
+                # 流式读取任务，只保留需要启动的任务；读取结束后再启动，避免长时间占用查询连接
+                active_task_ids = set()
+                tasks_to_start = []
+                for task in self.task_repo.stream_all_tasks():
+                    if task.is_enabled:
+                        active_task_ids.add(task.id)
+                        if task.id not in self.executors:
+                            tasks_to_start.append(task)
                 
-                for task in tasks:
-                    if task.is_enabled and task.id not in self.executors:
-                        self._start_task(task)
+                for task in tasks_to_start:
+                    self._start_task(task)
                 
                 running_task_ids = set(self.executors.keys())
-                active_task_ids = {task.id for task in tasks if task.is_enabled}
                 
                 for task_id in running_task_ids - active_task_ids:
                     self._stop_task(task_id)
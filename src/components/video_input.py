@@ -294,6 +294,8 @@ class VideoCapture(EnhancedVideoCapture):
         self.threaded = threaded
         self.last_frame = None
         self.frame_lock = threading.Lock()
+        # 读取线程写入新帧后置位，消费方据此阻塞等待而不是轮询
+        self.frame_event = threading.Event()
         self.thread = None
         self.running = False
         
@@ -317,6 +319,7 @@ class VideoCapture(EnhancedVideoCapture):
             if ret:
                 with self.frame_lock:
                     self.last_frame = frame
+                self.frame_event.set()
             time.sleep(0.03)  # ~30fps
     
     def read(self):
@@ -329,6 +332,20 @@ class VideoCapture(EnhancedVideoCapture):
         else:
             return super().read()
     
+    def wait_frame(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待读取线程产生新帧（仅线程模式）
+        
+        只保留最新一帧：等待期间到达的多帧只会被消费最后一帧
+        
+        Returns:
+            超时前是否有新帧
+        """
+        if not self.frame_event.wait(timeout):
+            return False
+        self.frame_event.clear()
+        return True
+    
     def stop(self):
         """停止线程和释放资源"""
         self.running = False
@@ -439,6 +456,10 @@ class VideoProcessor:
         """处理循环"""
         while self.is_running:
             try:
+                # 线程模式下等待新帧到达，避免重复处理同一帧
+                if self.capture.threaded and not self.capture.wait_frame(timeout=1.0):
+                    continue
+                
                 # 获取帧
                 ret, frame = self.capture.read()
                 if not ret or frame is None:
@@ -32,6 +32,8 @@ class VisualizationManager:
         self.last_frame = None
         self.last_detections = []
         self.last_fps = 0.0
+        # 右上角系统信息的布局缓存: ((宽, 高), 固定文本, 各行 x 坐标)
+        self._system_info_layout = None
         
         # 初始化显示窗口
         if self.show_window:
@@ -185,19 +187,22 @@ class VisualizationManager:
             
             # 获取图像尺寸
             height, width = image.shape[:2]
+            time_text = f"Time: {time.strftime('%Y-%m-%d %H:%M:%S')}"
             
-            # 系统信息
-            system_info = [
-                f"Atlas Vision System",
-                f"Resolution: {width}x{height}",
-                f"Time: {time.strftime('%Y-%m-%d %H:%M:%S')}"
-            ]
+            # 标题、分辨率及各行右对齐位置只与图像尺寸有关，尺寸不变时复用
+            # （Hershey 字体数字等宽，时间行宽度固定）
+            if self._system_info_layout is None or self._system_info_layout[0] != (width, height):
+                static_info = ["Atlas Vision System", f"Resolution: {width}x{height}"]
+                x_positions = [
+                    width - cv2.getTextSize(info, font, font_scale, thickness)[0][0] - 10
+                    for info in static_info + [time_text]
+                ]
+                self._system_info_layout = ((width, height), static_info, x_positions)
+            _, static_info, x_positions = self._system_info_layout
             
             # 在右上角显示
             y_offset = 30
-            for info in system_info:
-                text_size = cv2.getTextSize(info, font, font_scale, thickness)[0]
-                x_pos = width - text_size[0] - 10
+            for info, x_pos in zip(static_info + [time_text], x_positions):
                 cv2.putText(image, info, (x_pos, y_offset), font, font_scale, color, thickness)
                 y_offset += 20
             
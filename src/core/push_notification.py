@@ -6,6 +6,8 @@
 import json
 import time
 import logging
+import threading
+import weakref
 from typing import Dict, Any
 import requests
 
@@ -24,9 +26,55 @@ except ImportError:
     logging.warning("kafka-python library not installed, Kafka push will not be available.")
 
 
+def _close_clients(clients: Dict[str, Any], lock: threading.Lock):
+    """关闭长连接客户端，由 close() 和对象回收/进程退出时的 finalizer 调用"""
+    with lock:
+        producer = clients.get('kafka')
+        if producer:
+            try:
+                producer.flush()
+                producer.close()
+                logging.info("Kafka producer closed.")
+            except Exception as e:
+                logging.error(f"Failed to close Kafka producer. Error: {e}")
+            clients['kafka'] = None
+        
+        client = clients.get('mqtt')
+        if client:
+            PushNotificationService._close_mqtt_client(client)
+            clients['mqtt'] = None
+
+
 class PushNotificationService:
     def __init__(self, config: Dict[str, Any]):
         self.config = config.get('push_notification', {})
+        # 推送时用到的配置项在构造时一次性取出
+        self._enabled = bool(self.config.get('enabled'))
+        self._push_type = self.config.get('type', 'http')
+        self._url = self.config.get('url')
+        self._method = self.config.get('method', 'POST').upper()
+        self._timeout = self.config.get('timeout', 10)
+        # 清理header前后空格，避免HTTP请求错误
+        self._custom_headers = {
+            str(key).strip(): str(value).strip()
+            for key, value in (self.config.get('headers') or {}).items()
+        }
+        self._headers = {'Content-Type': 'application/json', **self._custom_headers}
+        self._mqtt_broker = self.config.get('mqtt_broker')
+        self._mqtt_port = self.config.get('mqtt_port', 1883)
+        self._mqtt_topic = self.config.get('mqtt_topic')
+        self._kafka_servers = self.config.get('kafka_bootstrap_servers')
+        self._kafka_topic = self.config.get('kafka_topic')
+        # 长连接客户端，首次推送时创建并在后续推送中复用
+        self._clients: Dict[str, Any] = {'kafka': None, 'mqtt': None}
+        self._clients_lock = threading.Lock()
+        # finalizer 只引用客户端字典和锁而不引用实例，实例被回收时关闭客户端，
+        # 进程退出时仍存活的实例也会被关闭
+        weakref.finalize(self, _close_clients, self._clients, self._clients_lock)
+    
+    def close(self):
+        """关闭长连接客户端"""
+        _close_clients(self._clients, self._clients_lock)
 
     def send_notification(self, alert_data: Dict[str, Any]):
         """
@@ -36,12 +84,12 @@ class PushNotificationService:
         logging.info("🚨 ==================== 告警推送触发 ====================")
         logging.info(f"⏰ 触发时间: {time.strftime('%Y-%m-%d %H:%M:%S')}")
         
-        if not self.config.get('enabled'):
+        if not self._enabled:
             logging.warning("⚠️ 告警推送已禁用，跳过推送")
             logging.info("🔇 ==================== 推送已跳过 ====================")
             return
 
-        push_type = self.config.get('type', 'http')
+        push_type = self._push_type
         logging.info(f"📡 推送类型: {push_type.upper()}")
         logging.info(f"⚙️ 推送配置: {json.dumps(self.config, indent=2, ensure_ascii=False)}")
         logging.info(f"📋 告警数据:")
@@ -65,15 +113,14 @@ class PushNotificationService:
             logging.error("💔 ==================== 推送执行失败 ====================")
 
     def _send_http_notification(self, alert_data: Dict[str, Any]):
-        url = self.config.get('url')
+        url = self._url
         if not url:
             logging.error("❌ HTTP推送失败: 未配置推送URL")
             return
 
-        # 获取推送配置信息
-        method = self.config.get('method', 'POST').upper()
-        timeout = self.config.get('timeout', 10)
-        custom_headers = self.config.get('headers', {})
+        method = self._method
+        timeout = self._timeout
+        headers = self._headers
         
         # 打印推送配置信息
         logging.info("🚀 ==================== HTTP告警推送开始 ====================")
@@ -81,21 +128,9 @@ class PushNotificationService:
         logging.info(f"📋 请求方法: {method}")
         logging.info(f"⏱️  超时时间: {timeout}秒")
         
-        # 设置基础headers
-        headers = {'Content-Type': 'application/json'}
-        
-        # 合并自定义headers，并清理空格
-        if custom_headers:
-            cleaned_headers = {}
-            for key, value in custom_headers.items():
-                # 清理header值中的前后空格，避免HTTP请求错误
-                cleaned_key = str(key).strip()
-                cleaned_value = str(value).strip()
-                cleaned_headers[cleaned_key] = cleaned_value
-                
-            headers.update(cleaned_headers)
+        if self._custom_headers:
             logging.info(f"🔐 自定义Headers:")
-            for key, value in cleaned_headers.items():
+            for key, value in self._custom_headers.items():
                 # 隐藏敏感信息（如token）
                 if 'token' in key.lower() or 'auth' in key.lower() or 'key' in key.lower():
                     logging.info(f"     {key}: {value[:10]}***" if len(str(value)) > 10 else f"     {key}: ***")
@@ -198,16 +233,58 @@ class PushNotificationService:
             logging.error("💔 ==================== HTTP告警推送异常 ====================")
             return False
 
+    def _get_mqtt_client(self, broker: str, port: int):
+        """获取长连接 MQTT 客户端，不存在时创建并启动网络循环"""
+        with self._clients_lock:
+            client = self._clients['mqtt']
+        if client is not None:
+            return client
+        
+        # connect() 是阻塞的网络调用，在锁外进行，避免其他推送线程等待
+        client = mqtt.Client()
+        
+        username = self.config.get('mqtt_username')
+        password = self.config.get('mqtt_password')
+        if username and password:
+            client.username_pw_set(username, password)
+        
+        client.connect(broker, port, 60)
+        client.loop_start()
+        
+        with self._clients_lock:
+            existing = self._clients['mqtt']
+            if existing is None:
+                self._clients['mqtt'] = client
+                return client
+        # 其他线程已先建立连接，关闭本次创建的客户端
+        self._close_mqtt_client(client)
+        return existing
+    
+    def _reset_mqtt_client(self):
+        """丢弃异常的 MQTT 客户端，下次推送时重建"""
+        with self._clients_lock:
+            client = self._clients['mqtt']
+            self._clients['mqtt'] = None
+        if client:
+            self._close_mqtt_client(client)
+    
+    @staticmethod
+    def _close_mqtt_client(client):
+        try:
+            client.loop_stop()
+            client.disconnect()
+            logging.info("MQTT client disconnected.")
+        except Exception as e:
+            logging.error(f"Failed to disconnect MQTT client. Error: {e}")
+    
     def _send_mqtt_notification(self, alert_data: Dict[str, Any]):
         if not MQTT_AVAILABLE:
             logging.error("MQTT push is enabled, but 'paho-mqtt' library is not installed.")
             return
 
-        broker = self.config.get('mqtt_broker')
-        port = self.config.get('mqtt_port', 1883)
-        topic = self.config.get('mqtt_topic')
-        username = self.config.get('mqtt_username')
-        password = self.config.get('mqtt_password')
+        broker = self._mqtt_broker
+        port = self._mqtt_port
+        topic = self._mqtt_topic
 
         if not broker or not topic:
             logging.error("MQTT push is enabled, but broker or topic is not configured.")
@@ -215,14 +292,8 @@ class PushNotificationService:
 
         logging.info(f"Sending MQTT notification to broker '{broker}:{port}' on topic '{topic}'")
         
-        client = None
         try:
-            client = mqtt.Client()
-            
-            if username and password:
-                client.username_pw_set(username, password)
-            
-            client.connect(broker, port, 60)
+            client = self._get_mqtt_client(broker, port)
             
             message = json.dumps(alert_data, ensure_ascii=False)
             result = client.publish(topic, message)
@@ -234,18 +305,26 @@ class PushNotificationService:
                 
         except Exception as e:
             logging.error(f"Failed to send MQTT notification. Error: {e}")
-        finally:
-            if client:
-                client.disconnect()
-                logging.info("MQTT client disconnected.")
+            self._reset_mqtt_client()
+
+    def _get_kafka_producer(self, servers: str):
+        """获取长连接 Kafka 生产者，不存在时创建"""
+        with self._clients_lock:
+            if self._clients['kafka'] is None:
+                self._clients['kafka'] = KafkaProducer(
+                    bootstrap_servers=servers.split(','),
+                    value_serializer=lambda v: json.dumps(v, ensure_ascii=False).encode('utf-8'),
+                    request_timeout_ms=5000 
+                )
+            return self._clients['kafka']
 
     def _send_kafka_notification(self, alert_data: Dict[str, Any]):
         if not KAFKA_PYTHON_AVAILABLE:
             logging.error("Kafka push is enabled, but 'kafka-python' library is not installed.")
             return
 
-        servers = self.config.get('kafka_bootstrap_servers')
-        topic = self.config.get('kafka_topic')
+        servers = self._kafka_servers
+        topic = self._kafka_topic
 
         if not servers or not topic:
             logging.error("Kafka push is enabled, but bootstrap servers or topic is not configured.")
@@ -253,30 +332,23 @@ class PushNotificationService:
 
         logging.info(f"Sending Kafka notification to topic '{topic}' on servers '{servers}'")
         
-        producer = None
         try:
-            producer = KafkaProducer(
-                bootstrap_servers=servers.split(','),
-                value_serializer=lambda v: json.dumps(v, ensure_ascii=False).encode('utf-8'),
-                request_timeout_ms=5000 
-            )
+            producer = self._get_kafka_producer(servers)
             
             future = producer.send(topic, value=alert_data)
-            record_metadata = future.get(timeout=10)
-            
-            logging.info(
-                f"Kafka notification sent successfully. "
-                f"Topic: {record_metadata.topic}, Partition: {record_metadata.partition}, "
-                f"Offset: {record_metadata.offset}"
+            future.add_callback(
+                lambda record_metadata: logging.info(
+                    f"Kafka notification sent successfully. "
+                    f"Topic: {record_metadata.topic}, Partition: {record_metadata.partition}, "
+                    f"Offset: {record_metadata.offset}"
+                )
+            )
+            future.add_errback(
+                lambda e: logging.error(f"Failed to send Kafka notification. Error: {e}")
             )
 
         except Exception as e:
             logging.error(f"Failed to send Kafka notification. Error: {e}")
-        finally:
-            if producer:
-                producer.flush()
-                producer.close()
-                logging.info("Kafka producer closed.")
 
 
 def example():
@@ -5,75 +5,151 @@
 """
 
 import os
-import json
+import asyncio
+import threading
 import pymysql
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any
 from pymysql.cursors import DictCursor
 from contextlib import contextmanager
 from utils.logging import get_logger
 import mysql.connector
-from mysql.connector import Error, pooling
+from mysql.connector import Error, InterfaceError, OperationalError, errorcode, pooling
 from dotenv import load_dotenv
 import mysql.connector.locales.eng.client_error
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 
+# JSON 列编解码：优先使用 C 实现的 orjson，未安装时回退到标准库
+try:
+    import orjson
+
+    def json_loads(value: Any) -> Any:
+        return orjson.loads(value)
+
+    def json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    JSONDecodeError = orjson.JSONDecodeError
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+
+    def json_loads(value: Any) -> Any:
+        return json.loads(value)
+
+    def json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    JSONDecodeError = json.JSONDecodeError
+    ORJSON_AVAILABLE = False
+
+# 可选的异步驱动：asyncmy（Cython 实现，协议兼容 PyMySQL）
+try:
+    import asyncmy
+    from asyncmy.cursors import DictCursor as AsyncDictCursor
+    ASYNCMY_AVAILABLE = True
+except ImportError:
+    ASYNCMY_AVAILABLE = False
+
 logger = get_logger(__name__)
 
 load_dotenv()
 
+# mysql.connector 连接池上限为 32
+_POOL_SIZE = min(32, int(os.getenv('MYSQL_POOL_SIZE', max(10, (os.cpu_count() or 1) * 2))))
+# 异步连接池不受该上限约束，连接在 await 期间不占用线程
+_ASYNC_POOL_SIZE = int(os.getenv('MYSQL_ASYNC_POOL_SIZE', 20))
+# 每个连接缓存的服务端预处理语句数量上限
+_PREPARED_CACHE_SIZE = int(os.getenv('MYSQL_PREPARED_CACHE_SIZE', 32))
+
 class DatabaseManager:
     _pool = None
     _engine = None
     _SessionLocal = None
+    # 并发首次使用时避免重复创建连接池/引擎（双重检查加锁）
+    _pool_lock = threading.Lock()
+    _engine_lock = threading.Lock()
+    # asyncmy 连接池（创建任务）绑定创建它的事件循环
+    _async_pool = None
+    _async_pool_loop = None
 
     def __init__(self):
         self._get_pool()
         self._get_engine()
-        self.connection = None
-        self.cursor = None
+        # 事务连接和游标按线程隔离：实例由各仓储共享（见 get_db），各线程的事务互不影响
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        return getattr(self._local, 'connection', None)
+
+    @connection.setter
+    def connection(self, value):
+        self._local.connection = value
+
+    @property
+    def cursor(self):
+        return getattr(self._local, 'cursor', None)
+
+    @cursor.setter
+    def cursor(self, value):
+        self._local.cursor = value
 
     @classmethod
     def _get_engine(cls):
         if cls._engine is None:
-            try:
-                print("Creating SQLAlchemy engine...")
-                db_user = os.getenv('MYSQL_USER', 'ai_edge_user')
-                db_password = os.getenv('MYSQL_PASSWORD', 'your_strong_password')
-                db_host = os.getenv('MYSQL_HOST', 'db')
-                db_port = os.getenv('MYSQL_PORT', '3306')
-                db_name = os.getenv('MYSQL_DATABASE', 'ai_edge')
+            with cls._engine_lock:
+                if cls._engine is None:
+                    try:
+                        print("Creating SQLAlchemy engine...")
+                        db_user = os.getenv('MYSQL_USER', 'ai_edge_user')
+                        db_password = os.getenv('MYSQL_PASSWORD', 'your_strong_password')
+                        db_host = os.getenv('MYSQL_HOST', 'db')
+                        db_port = os.getenv('MYSQL_PORT', '3306')
+                        db_name = os.getenv('MYSQL_DATABASE', 'ai_edge')
                 
-                # SQLAlchemy uses mysqlclient or PyMySQL, not mysql-connector-python for engine URL
-                # Ensure you have PyMySQL installed: pip install PyMySQL
-                database_url = f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+                        # SQLAlchemy uses mysqlclient or PyMySQL, not mysql-connector-python for engine URL
+                        # Ensure you have PyMySQL installed: pip install PyMySQL
+                        database_url = f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
                 
-                cls._engine = create_engine(database_url, pool_pre_ping=True)
-                cls._SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=cls._engine)
-                print("SQLAlchemy engine and session maker created successfully.")
-            except Exception as e:
-                print(f"Error creating SQLAlchemy engine: {e}")
-                raise
+                        engine = create_engine(database_url, pool_pre_ping=True)
+                        cls._SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                        cls._engine = engine
+                        print("SQLAlchemy engine and session maker created successfully.")
+                    except Exception as e:
+                        print(f"Error creating SQLAlchemy engine: {e}")
+                        raise
         return cls._engine
 
     @classmethod
     def _get_pool(cls):
         if cls._pool is None:
-            try:
-                print("Creating database connection pool...")
-                cls._pool = mysql.connector.pooling.MySQLConnectionPool(
-                    pool_name="ai_edge_pool",
-                    pool_size=10,
-                    host=os.getenv('MYSQL_HOST', 'db'),
-                    port=int(os.getenv('MYSQL_PORT', '3306')),
-                    user=os.getenv('MYSQL_USER', 'ai_edge_user'),
-                    password=os.getenv('MYSQL_PASSWORD', 'your_strong_password'),
-                    database=os.getenv('MYSQL_DATABASE', 'ai_edge')
-                )
-                print("Database connection pool created successfully.")
-            except Error as e:
-                print(f"Error creating connection pool: {e}")
-                raise
+            with cls._pool_lock:
+                if cls._pool is None:
+                    try:
+                        print("Creating database connection pool...")
+                        cls._pool = mysql.connector.pooling.MySQLConnectionPool(
+                            pool_name="ai_edge_pool",
+                            pool_size=_POOL_SIZE,
+                            # 归还连接时不发送 RESET CONNECTION，省去一次往返；
+                            # 使用 autocommit 保证连接归还时不会残留未结束的读事务。
+                            # 注意：事务外 commit=False 的写操作也会立即持久化，需要原子性的多条写操作
+                            # 应使用 start_transaction()/commit()
+                            pool_reset_session=False,
+                            autocommit=True,
+                            # 使用 C 扩展解析 MySQL 协议（未安装 C 扩展时连接器自动回退到纯 Python 实现）
+                            use_pure=False,
+                            host=os.getenv('MYSQL_HOST', 'db'),
+                            port=int(os.getenv('MYSQL_PORT', '3306')),
+                            user=os.getenv('MYSQL_USER', 'ai_edge_user'),
+                            password=os.getenv('MYSQL_PASSWORD', 'your_strong_password'),
+                            database=os.getenv('MYSQL_DATABASE', 'ai_edge')
+                        )
+                        print(f"Database connection pool created successfully (C extension: {mysql.connector.HAVE_CEXT}).")
+                    except Error as e:
+                        print(f"Error creating connection pool: {e}")
+                        raise
         return cls._pool
 
     @contextmanager
@@ -113,26 +189,40 @@ class DatabaseManager:
             self.connection.close()
             self.connection = None
 
-    def execute_query(self, query: str, params: Optional[tuple] = None, fetch: Optional[str] = "all", commit: bool = False, last_row_id: bool = False) -> Any:
+    def execute_query(self, query: str, params: Optional[tuple] = None, fetch: Optional[str] = "all", commit: bool = False, last_row_id: bool = False, dict_rows: bool = True) -> Any:
+        """
+        执行 SQL 语句
+        
+        dict_rows 为 False 时不逐行构造字典，查询结果以 (列名元组, 行元组) 的形式返回，
+        调用方可一次性确定列下标后直接按下标取值
+        """
         # If in a transaction, use the existing cursor
         if self.cursor:
-            self.cursor.execute(query, params or ())
+            cursor = self.cursor if dict_rows else self.connection.cursor()
+            cursor.execute(query, params or ())
             if fetch == 'one':
-                return self.cursor.fetchone()
+                result = cursor.fetchone()
             elif fetch == 'all':
-                return self.cursor.fetchall()
+                result = cursor.fetchall()
             else: # fetch is None or something else
-                return self.cursor.rowcount
+                return cursor.lastrowid if last_row_id else cursor.rowcount
+            if not dict_rows:
+                result = (cursor.column_names, result)
+                cursor.close()
+            return result
 
         # Original logic for non-transactional queries
         pool = self._get_pool()
-        connection = None
-        try:
-            connection = pool.get_connection()
-            if connection.is_connected():
-                cursor = connection.cursor(dictionary=True)
+        # 不再用 is_connected() 探测连接（每次都是一次 ping 往返），
+        # 只读查询在连接失效时换一个新连接重试一次；写操作不重试：连接池开启了 autocommit，
+        # commit=False 的写操作也已在服务端生效，连接错误后重试可能重复写入
+        for attempt in range(2):
+            connection = None
+            try:
+                connection = pool.get_connection()
+                cursor = connection.cursor(dictionary=dict_rows)
                 cursor.execute(query, params or ())
-                
+
                 if commit:
                     connection.commit()
                     if last_row_id:
@@ -146,18 +236,195 @@ class DatabaseManager:
                 else: # fetch is None
                     result = None
 
+                if not dict_rows and not commit and fetch in ('one', 'all'):
+                    result = (cursor.column_names, result)
+
                 cursor.close()
                 return result
-            else:
-                raise Error("Failed to get a connected connection from the pool.")
-        except Error as e:
-            print(f"Error during query execution: {e}")
-            if connection:
-                connection.rollback()
+            except (InterfaceError, OperationalError) as e:
+                if attempt == 0 and fetch in ('one', 'all') and not commit:
+                    print(f"Connection lost during query execution, retrying: {e}")
+                    continue
+                print(f"Error during query execution: {e}")
+                raise
+            except Error as e:
+                print(f"Error during query execution: {e}")
+                if connection:
+                    connection.rollback()
+                raise
+            finally:
+                if connection:
+                    connection.close() # Returns the connection to the pool
+
+    @staticmethod
+    def _prepared_cursor(connection, query: str):
+        """
+        取出连接上缓存的预处理游标，不存在时新建
+
+        缓存挂在连接池中的底层连接上，连接归还后仍然保留，超过上限时关闭最久未用的游标
+        """
+        cnx = getattr(connection, '_cnx', connection)
+        cache = getattr(cnx, '_prepared_cursors', None)
+        if cache is None:
+            cache = cnx._prepared_cursors = OrderedDict()
+        cursor = cache.get(query)
+        if cursor is not None:
+            cache.move_to_end(query)
+            return cursor
+        cursor = cnx.cursor(prepared=True)
+        cache[query] = cursor
+        if len(cache) > _PREPARED_CACHE_SIZE:
+            _, stale = cache.popitem(last=False)
+            stale.close()
+        return cursor
+
+    @staticmethod
+    def _drop_prepared(connection, query: Optional[str] = None):
+        """
+        丢弃连接上缓存的预处理游标
+
+        指定 query 时只丢弃该语句的游标，否则清空整个连接的缓存（连接重连后语句句柄失效）
+        """
+        cnx = getattr(connection, '_cnx', connection)
+        cache = getattr(cnx, '_prepared_cursors', None)
+        if not cache:
+            return
+        if query is not None:
+            cursors = [cache.pop(query)] if query in cache else []
+        else:
+            cursors = list(cache.values())
+            cache.clear()
+        for cursor in cursors:
+            try:
+                cursor.close()
+            except Error:
+                pass
+
+    def execute_prepared(self, query: str, params: Optional[tuple] = None, fetch: Optional[str] = "all") -> Any:
+        """
+        以服务端预处理语句执行只读查询，返回值与 execute_query 的字典行一致
+
+        同一连接再次执行相同 SQL 时只发送参数，服务端不再重复解析。
+        二进制协议下 JSON 列的返回类型与文本协议不同，只用于不含 JSON 列的查询
+        """
+        # 事务内沿用事务连接
+        if self.cursor:
+            return self.execute_query(query, params, fetch=fetch)
+
+        pool = self._get_pool()
+        for attempt in range(2):
+            connection = None
+            try:
+                connection = pool.get_connection()
+                cursor = self._prepared_cursor(connection, query)
+                cursor.execute(query, params or ())
+                # 读完全部结果，连接归还时不残留未读数据
+                rows = cursor.fetchall() if fetch in ('one', 'all') else None
+                if rows is None:
+                    return None
+                names = cursor.column_names
+                if fetch == 'one':
+                    return dict(zip(names, rows[0])) if rows else None
+                return [dict(zip(names, row)) for row in rows]
+            except (InterfaceError, OperationalError) as e:
+                # 连接失效时清空该连接的缓存，换一个连接重试一次
+                if connection:
+                    self._drop_prepared(connection)
+                if attempt == 0:
+                    print(f"Connection lost during query execution, retrying: {e}")
+                    continue
+                print(f"Error during query execution: {e}")
+                raise
+            except Error as e:
+                # 连接被重连后缓存的语句句柄失效，清空缓存后重试一次；其他错误（语法、约束等）直接抛出
+                if connection:
+                    self._drop_prepared(connection, None if e.errno == errorcode.ER_UNKNOWN_STMT_HANDLER else query)
+                if attempt == 0 and e.errno == errorcode.ER_UNKNOWN_STMT_HANDLER:
+                    print(f"Prepared statement handle lost, retrying: {e}")
+                    continue
+                print(f"Error during query execution: {e}")
+                raise
+            finally:
+                if connection:
+                    connection.close() # Returns the connection to the pool
+
+    @classmethod
+    async def _get_async_pool(cls):
+        loop = asyncio.get_running_loop()
+        if cls._async_pool is None or cls._async_pool_loop is not loop:
+            # 缓存创建任务本身，同一事件循环内的并发调用共享同一个连接池
+            cls._async_pool_loop = loop
+            cls._async_pool = loop.create_task(asyncmy.create_pool(
+                minsize=2,
+                maxsize=_ASYNC_POOL_SIZE,
+                autocommit=True,
+                host=os.getenv('MYSQL_HOST', 'db'),
+                port=int(os.getenv('MYSQL_PORT', '3306')),
+                user=os.getenv('MYSQL_USER', 'ai_edge_user'),
+                password=os.getenv('MYSQL_PASSWORD', 'your_strong_password'),
+                db=os.getenv('MYSQL_DATABASE', 'ai_edge')
+            ))
+        try:
+            return await cls._async_pool
+        except Exception as e:
+            print(f"Error creating async connection pool: {e}")
+            cls._async_pool = None
+            cls._async_pool_loop = None
             raise
+
+    async def execute_query_async(self, query: str, params: Optional[tuple] = None, fetch: Optional[str] = "all", commit: bool = False, last_row_id: bool = False) -> Any:
+        """
+        execute_query 的异步版本，参数与返回值含义相同
+        
+        安装了 asyncmy 时在事件循环内直接执行，不占用线程；
+        否则放到线程池中执行同步版本，避免阻塞事件循环
+        """
+        if not ASYNCMY_AVAILABLE:
+            return await asyncio.to_thread(self.execute_query, query, params, fetch, commit, last_row_id)
+
+        pool = await self._get_async_pool()
+        async with pool.acquire() as connection:
+            async with connection.cursor(AsyncDictCursor) as cursor:
+                try:
+                    await cursor.execute(query, params or ())
+                    if commit:
+                        await connection.commit()
+                        return cursor.lastrowid if last_row_id else cursor.rowcount
+                    if fetch == 'one':
+                        return await cursor.fetchone()
+                    if fetch == 'all':
+                        return await cursor.fetchall()
+                    return None
+                except Exception as e:
+                    print(f"Error during async query execution: {e}")
+                    await connection.rollback()
+                    raise
+
+    def iter_query(self, query: str, params: Optional[tuple] = None, batch_size: int = 1000):
+        """
+        分批读取查询结果，逐行产出元组，避免一次性 fetchall 占用大量内存
+        
+        第一个产出值为列名元组，其后为各行数据
+        """
+        pool = self._get_pool()
+        connection = pool.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute(query, params or ())
+            yield cursor.column_names
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
         finally:
-            if connection and connection.is_connected():
-                connection.close() # Returns the connection to the pool
+            # 调用方提前停止迭代时需先读掉剩余结果，连接才能归还连接池
+            if connection.unread_result:
+                connection.consume_results()
+            if cursor:
+                cursor.close()
+            connection.close() # Returns the connection to the pool
 
     def close_pool(self):
         # This method might be useful for graceful shutdown
@@ -168,4 +435,28 @@ class DatabaseManager:
             # The pool itself doesn't have a close method.
             # Connections are closed when the application exits.
             self._pool = None
-            print("Connection pool resources released.") 
\ No newline at end of file
+            print("Connection pool resources released.")
+
+    @classmethod
+    async def close_async_pool(cls):
+        """关闭异步连接池（需在创建它的事件循环中调用）"""
+        if cls._async_pool is not None:
+            pool = await cls._async_pool
+            pool.close()
+            await pool.wait_closed()
+            cls._async_pool = None
+            cls._async_pool_loop = None 
+
+
+_db_instance: Optional[DatabaseManager] = None
+_db_instance_lock = threading.Lock()
+
+
+def get_db() -> DatabaseManager:
+    """获取进程内共享的 DatabaseManager 实例（首次调用时创建）"""
+    global _db_instance
+    if _db_instance is None:
+        with _db_instance_lock:
+            if _db_instance is None:
+                _db_instance = DatabaseManager()
+    return _db_instance
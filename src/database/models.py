@@ -1,10 +1,23 @@
-from pydantic import BaseModel, EmailStr, field_validator, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, field_validator, Field, AliasChoices, TypeAdapter
 from typing import Optional, List, Any, Dict, Union
 from datetime import datetime, time, timedelta
 from enum import Enum
 import json
 
+# JSON 字段解析优先使用 orjson（其 JSONDecodeError 是 json.JSONDecodeError 的子类）
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# 只在 API 层使用的模型延迟到首次使用（或 warmup）时才构建校验器，
+# 只导入仓储层的进程（如任务调度）不必为它们付出构建开销
+_DEFERRED_BUILD = ConfigDict(defer_build=True)
+
 class UserBase(BaseModel):
+    model_config = _DEFERRED_BUILD
+
     username: str
     email: EmailStr
 
@@ -44,22 +57,38 @@ class ModelUpdate(ModelBase):
 class Model(ModelBase):
     id: int
     status: str
-    upload_time: datetime
-    update_time: datetime
+    # 数据库行中没有 upload_time/update_time 时使用 created_at/updated_at
+    upload_time: datetime = Field(validation_alias=AliasChoices('upload_time', 'created_at'))
+    update_time: datetime = Field(validation_alias=AliasChoices('update_time', 'updated_at'))
     file_path: str
 
     class Config:
         from_attributes = True
 
+    @field_validator('labels', mode='before')
+    @classmethod
+    def parse_labels(cls, value: Any) -> Any:
+        """数据库中的 labels 为 JSON 字符串，直接在校验时解析"""
+        if isinstance(value, (str, bytes, bytearray)):
+            try:
+                return _json_loads(value)
+            except json.JSONDecodeError:
+                return None
+        return value
+
 from enum import Enum
 class ModelStatus(str, Enum):
     active = "active"
     inactive = "inactive"
 
 class ModelStatusUpdate(BaseModel):
+    model_config = _DEFERRED_BUILD
+
     status: ModelStatus
 
 class InferenceRecordBase(BaseModel):
+    model_config = _DEFERRED_BUILD
+
     model_id: int
     user_id: int
     input_path: str
@@ -170,7 +199,7 @@ class TaskBase(BaseModel):
     def parse_json(cls, value: Any) -> Any:
         if isinstance(value, str):
             try:
-                return json.loads(value)
+                return _json_loads(value)
             except json.JSONDecodeError:
                 return []
         return value
@@ -191,13 +220,16 @@ class Task(TaskBase):
     @field_validator('video_sources', mode='before')
     @classmethod
     def parse_video_sources(cls, v: Any) -> List[Dict[str, Any]]:
+        # 快速路径：已是新格式的列表（绝大多数行）直接返回，不重建列表
+        if type(v) is list and all(type(item) is dict and 'url' in item for item in v):
+            return v
         if v is None:
             return []
         
         loaded = None
         if isinstance(v, str):
             try:
-                loaded = json.loads(v)
+                loaded = _json_loads(v)
             except (json.JSONDecodeError, TypeError):
                 # Case 1: Plain string URL (very old format)
                 return [{'url': v, 'roi': None}]
@@ -220,6 +252,8 @@ class Task(TaskBase):
         return []
 
 class PaginatedResponse(BaseModel):
+    model_config = _DEFERRED_BUILD
+
     total: int
     page: int
     page_size: int
@@ -243,6 +277,9 @@ class AlertStatus(str, Enum):
     RESOLVED = "resolved"
 
 class AlertBase(BaseModel):
+    # 枚举字段（含默认值）直接存为字符串值，写库时无需再取 .value
+    model_config = ConfigDict(use_enum_values=True, validate_default=True)
+
     title: str
     description: Optional[str] = None
     level: AlertLevel = AlertLevel.MEDIUM
@@ -268,6 +305,25 @@ class Alert(AlertBase):
 
 class PaginatedAlertResponse(PaginatedResponse):
     items: List[Alert]
+    next_cursor: Optional[str] = None
 
 class TaskPaginatedResponse(PaginatedResponse):
-    items: List[Task] 
\ No newline at end of file
+    items: List[Task]
+
+# ----------------- Type Adapters -----------------
+# 在导入时构建一次，仓储层整页校验查询结果，避免逐行构造模型的 Python 调度开销
+
+MODEL_LIST_ADAPTER = TypeAdapter(List[Model])
+ALERT_LIST_ADAPTER = TypeAdapter(List[Alert])
+
+# ----------------- Warmup -----------------
+
+_DEFERRED_MODELS = (
+    UserCreate, User, ModelStatusUpdate, InferenceRecordCreate, InferenceRecord,
+    PaginatedModelResponse, PaginatedTaskResponse, PaginatedAlertResponse, TaskPaginatedResponse,
+)
+
+def warmup() -> None:
+    """在服务启动阶段一次性构建延迟构建的模型，避免由首个请求承担构建开销"""
+    for model in _DEFERRED_MODELS:
+        model.model_rebuild(force=True)
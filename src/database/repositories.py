@@ -1,23 +1,87 @@
-from typing import List, Optional, Dict, Any
-from .database import DatabaseManager
-from .models import User, UserCreate, Model, ModelCreate, ModelUpdate, InferenceRecord, InferenceRecordCreate, Task, TaskCreate, Alert, AlertCreate
+from typing import List, Optional, Dict, Any, Iterator
+from .database import DatabaseManager, get_db, json_loads, json_dumps, JSONDecodeError
+from .models import User, UserCreate, Model, ModelCreate, ModelUpdate, InferenceRecord, InferenceRecordCreate, Task, TaskCreate, Alert, AlertCreate, MODEL_LIST_ADAPTER, ALERT_LIST_ADAPTER
 from database.schema import Task as TaskDB, Model as ModelDB
 from passlib.context import CryptContext
-import json
 from datetime import timedelta, datetime
+from collections import OrderedDict
+import base64
+import binascii
+import hashlib
 import os
+import threading
+import time
 from sqlalchemy.orm import joinedload
 from sqlalchemy import func, exc
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt 校验结果缓存：sha256(存储的哈希 + 明文密码) -> 过期时间
+# 键中包含存储的哈希，密码修改后旧缓存自然失效；不保存明文密码
+_VERIFY_CACHE_TTL = 300
+_VERIFY_CACHE_MAX_SIZE = 1024
+_verify_cache: "OrderedDict[str, float]" = OrderedDict()
+_verify_cache_lock = threading.Lock()
+
+# 模型 id -> 名称映射缓存：本进程内增删改模型时立即失效，
+# 另设较短的有效期，覆盖其他进程修改模型的情况
+_MODEL_NAME_MAP_TTL = 60
+_model_name_map: Optional[Dict[int, str]] = None
+_model_name_map_expires = 0.0
+_model_name_map_lock = threading.Lock()
+
+# 批量插入时每条 INSERT 语句包含的最大行数
+BULK_INSERT_BATCH_SIZE = 10000
+
+
+def _bulk_insert(db: DatabaseManager, insert_prefix: str, row_placeholder: str, rows: List[tuple], batch_size: int) -> List[int]:
+    """
+    以多行 VALUES 形式批量插入，所有批次在同一事务中提交
+    
+    单条多行 INSERT 的自增 id 是连续分配的（行数预先确定的 simple insert），
+    因此每批的 id 由 LAST_INSERT_ID()（该批第一行的 id）和行数推算，无需回查
+    
+    Args:
+        db: 数据库管理器
+        insert_prefix: "INSERT INTO 表 (列...) VALUES " 语句前缀
+        row_placeholder: 单行占位符，如 "(%s, %s)"
+        rows: 各行参数元组
+        batch_size: 每条语句的最大行数
+        
+    Returns:
+        按插入顺序排列的新行 id
+    """
+    if not rows:
+        return []
+
+    row_ids = []
+    try:
+        db.start_transaction()
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            query = insert_prefix + ", ".join([row_placeholder] * len(batch))
+            params = tuple(value for row in batch for value in row)
+            first_id = db.execute_query(query, params, fetch=None, last_row_id=True)
+            row_ids.extend(range(first_id, first_id + len(batch)))
+        db.commit()
+    except Exception as e:
+        print(f"Error during bulk insert, rolling back transaction. Error: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close_transaction()
+    return row_ids
+
 class UserRepository:
+    # 高频点查询使用固定的 SQL 文本，作为预处理语句按连接缓存（users 表不含 JSON 列）
+    _BY_USERNAME_QUERY = "SELECT * FROM users WHERE username = %s"
+    _BY_EMAIL_QUERY = "SELECT * FROM users WHERE email = %s"
+
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = get_db()
 
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
-        query = "SELECT * FROM users WHERE username = %s"
-        result = self.db.execute_query(query, (username,), fetch='one')
+        result = self.db.execute_prepared(self._BY_USERNAME_QUERY, (username,), fetch='one')
         if not result:
             return None
         
@@ -28,7 +92,7 @@ class UserRepository:
         # if not hashed_password or not self.verify_password(password, hashed_password):
         #     return None
 
-        return User(**user_data)
+        return User.model_validate(user_data)
 
     def create_user(self, user: UserCreate) -> User:
         hashed_password = pwd_context.hash(user.password)
@@ -40,14 +104,12 @@ class UserRepository:
         return self.get_user_by_username(user.username)
 
     def get_user_by_username(self, username: str) -> Optional[User]:
-        query = "SELECT * FROM users WHERE username = %s"
-        result = self.db.execute_query(query, (username,), fetch='one')
-        return User(**result) if result else None
+        result = self.db.execute_prepared(self._BY_USERNAME_QUERY, (username,), fetch='one')
+        return User.model_validate(result) if result else None
 
     def get_user_by_email(self, email: str) -> Optional[User]:
-        query = "SELECT * FROM users WHERE email = %s"
-        result = self.db.execute_query(query, (email,), fetch='one')
-        return User(**result) if result else None
+        result = self.db.execute_prepared(self._BY_EMAIL_QUERY, (email,), fetch='one')
+        return User.model_validate(result) if result else None
 
     def get_user_by_token(self, token: str) -> Optional[User]:
         """通过令牌获取用户
@@ -73,38 +135,167 @@ class UserRepository:
             return None
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+        """校验密码，短时间内重复校验同一凭据时跳过 bcrypt 计算"""
+        key = hashlib.sha256(f"{hashed_password}\0{plain_password}".encode('utf-8')).hexdigest()
+        now = time.monotonic()
+        with _verify_cache_lock:
+            expires_at = _verify_cache.get(key)
+            if expires_at is not None:
+                if expires_at > now:
+                    _verify_cache.move_to_end(key)
+                    return True
+                del _verify_cache[key]
+
+        if not pwd_context.verify(plain_password, hashed_password):
+            return False
 
-class ModelRepository:
-    def __init__(self):
-        self.db = DatabaseManager()
+        # 只缓存校验成功的结果
+        with _verify_cache_lock:
+            _verify_cache[key] = now + _VERIFY_CACHE_TTL
+            if len(_verify_cache) > _VERIFY_CACHE_MAX_SIZE:
+                _verify_cache.popitem(last=False)
+        return True
 
-    def _process_model_row(self, row: dict) -> dict:
-        if not row:
-            return row
-            
-        # 处理labels字段
-        if 'labels' in row and row['labels'] is not None:
-            if isinstance(row['labels'], str):
-                try:
-                    row['labels'] = json.loads(row['labels'])
-                except json.JSONDecodeError:
-                    row['labels'] = None
+def _page_total(db: DatabaseManager, rows: List[dict], offset: int, count_query: str, count_params: tuple) -> int:
+    """
+    取分页查询中 COUNT(*) OVER() 返回的总数
+    
+    页码超出范围（结果为空且偏移量大于 0）时无法从结果中得到总数，才单独执行计数查询
+    """
+    if rows:
+        return rows[0]['_total']
+    if offset <= 0:
+        return 0
+    result = db.execute_query(count_query, count_params, fetch='one')
+    return result['total'] if result else 0
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """将 (created_at, id) 编码为分页游标"""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}:{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    解析分页游标
+    
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, row_id = raw.rsplit(":", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+# FULLTEXT 索引使用 ngram 解析器（默认 ngram_token_size=2），更短的关键词无法命中索引
+_FULLTEXT_MIN_KEYWORD_LEN = 2
+# 布尔模式下有特殊含义的字符，替换为空格（与 ngram 解析器对分隔符的处理一致）而不是删除，
+# 否则 "yolo-v5" 会被拼成 "yolov5"，与 LIKE 的匹配结果不同
+_FULLTEXT_OPERATORS = str.maketrans('+-<>()~*"@', ' ' * 10)
+# 关键词搜索使用的 FULLTEXT 索引：(表, 索引名, 列)，与 init.sql 保持一致
+_FULLTEXT_INDEXES = (
+    ('models', 'ft_models_name_description', 'name, description'),
+    ('alerts', 'ft_alerts_title_description', 'title, description'),
+)
+# 已确认建有 FULLTEXT 索引的列，未确认的列关键词搜索回退为 LIKE
+_fulltext_columns = set()
+
+
+def ensure_fulltext_indexes(db: Optional[DatabaseManager] = None) -> List[str]:
+    """
+    为已有数据库补建关键词搜索使用的 FULLTEXT 索引（幂等，服务启动时调用）
+    
+    init.sql 只在空数据目录首次启动时执行，旧数据库中没有这些索引，MATCH ... AGAINST 会直接报错。
+    补建失败的表继续使用 LIKE 搜索
+    
+    Returns:
+        本次新建的索引名列表
+    """
+    db = db or get_db()
+    rows = db.execute_query(
+        "SELECT DISTINCT table_name AS table_name, index_name AS index_name "
+        "FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND index_type = 'FULLTEXT'",
+        fetch='all'
+    ) or []
+    existing = {(row['table_name'], row['index_name']) for row in rows}
+    
+    created = []
+    for table, index, columns in _FULLTEXT_INDEXES:
+        if (table, index) not in existing:
+            try:
+                db.execute_query(
+                    f"ALTER TABLE {table} ADD FULLTEXT INDEX {index} ({columns}) WITH PARSER ngram",
+                    fetch=None, commit=True
+                )
+            except Exception as e:
+                print(f"创建 FULLTEXT 索引 {index} 失败，{table} 表关键词搜索使用 LIKE: {e}")
+                continue
+            created.append(index)
+        _fulltext_columns.add(columns)
+    return created
+
+
+def _keyword_condition(columns: str, keyword: str) -> tuple:
+    """
+    构造关键词搜索条件
+    
+    列上已确认建有 FULLTEXT 索引且关键词长度足够时按短语在索引上检索，否则回退为 LIKE 扫描
+    
+    Args:
+        columns: 参与搜索的列，如 "name, description"，需与 _FULLTEXT_INDEXES 中的列一致
+        keyword: 关键词
         
-        # 映射数据库字段到Model类字段
-        if 'upload_time' not in row and 'created_at' in row:
-            row['upload_time'] = row['created_at']
-            
-        if 'update_time' not in row and 'updated_at' in row:
-            row['update_time'] = row['updated_at']
-            
-        return row
+    Returns:
+        (条件语句, 参数列表)
+    """
+    words = keyword.translate(_FULLTEXT_OPERATORS).split()
+    if columns in _fulltext_columns and words and all(len(w) >= _FULLTEXT_MIN_KEYWORD_LEN for w in words):
+        return f"MATCH({columns}) AGAINST(%s IN BOOLEAN MODE)", [f'"{" ".join(words)}"']
+    column_list = [c.strip() for c in columns.split(",")]
+    clause = "(" + " OR ".join(f"{c} LIKE %s" for c in column_list) + ")"
+    return clause, [f"%{keyword}%"] * len(column_list)
+
+# 查询时只取对应 Pydantic 模型需要的列，不传输 classes、file_size、remark 等未使用的列
+_MODEL_COLUMNS_SQL = "id, name, version, description, file_path, type, labels, status, upload_time, update_time"
+_ALERT_COLUMNS_SQL = (
+    "id, title, description, level, status, confidence, task_id, task_name, "
+    "model_name, alert_image, detection_class, created_at, updated_at"
+)
+
+
+class ModelRepository:
+    def __init__(self):
+        self.db = get_db()
+
+    def get_name_map(self) -> Dict[int, str]:
+        """获取模型 id 到名称的映射（带缓存）"""
+        global _model_name_map, _model_name_map_expires
+        with _model_name_map_lock:
+            if _model_name_map is not None and time.monotonic() < _model_name_map_expires:
+                return _model_name_map
+
+        rows = self.db.execute_query("SELECT id, name FROM models", fetch='all')
+        name_map = {row['id']: row['name'] for row in rows} if rows else {}
+        with _model_name_map_lock:
+            _model_name_map = name_map
+            _model_name_map_expires = time.monotonic() + _MODEL_NAME_MAP_TTL
+        return name_map
+
+    @staticmethod
+    def invalidate_name_map():
+        """使模型名称映射缓存失效"""
+        global _model_name_map
+        with _model_name_map_lock:
+            _model_name_map = None
 
     def get_all_models(self, page: int = 1, page_size: int = 10, keyword: Optional[str] = None, status: Optional[str] = None, type: Optional[str] = None):
         offset = (page - 1) * page_size
         
         # Base queries
-        query_base = "SELECT * FROM models"
+        # 总数由窗口函数随分页结果一并返回，只需一次查询
+        query_base = f"SELECT {_MODEL_COLUMNS_SQL}, COUNT(*) OVER() AS _total FROM models"
         count_query_base = "SELECT COUNT(*) as total FROM models"
         
         # Conditions and parameters
@@ -112,8 +303,9 @@ class ModelRepository:
         params = []
 
         if keyword:
-            conditions.append("(name LIKE %s OR description LIKE %s)")
-            params.extend([f"%{keyword}%", f"%{keyword}%"])
+            clause, keyword_params = _keyword_condition("name, description", keyword)
+            conditions.append(clause)
+            params.extend(keyword_params)
 
         if status:
             # 直接使用status字段
@@ -135,24 +327,20 @@ class ModelRepository:
         count_params = tuple(params)
         
         result = self.db.execute_query(query, paginated_params, fetch='all')
-        total_count_result = self.db.execute_query(count_query, count_params, fetch='one')
+        total = _page_total(self.db, result, offset, count_query, count_params)
         
-        # Process and return results
-        processed_results = [self._process_model_row(row) for row in result]
+        # labels 解析及时间字段映射由 Model 的校验器完成
         return {
-            "items": [Model(**row) for row in processed_results],
-            "total": total_count_result['total'] if total_count_result else 0,
+            "items": MODEL_LIST_ADAPTER.validate_python(result),
+            "total": total,
             "page": page,
             "page_size": page_size
         }
 
     def get_model_by_id(self, model_id: int) -> Optional[Model]:
-        query = "SELECT * FROM models WHERE id = %s"
+        query = f"SELECT {_MODEL_COLUMNS_SQL} FROM models WHERE id = %s"
         result = self.db.execute_query(query, (model_id,), fetch='one')
-        if result:
-            processed_result = self._process_model_row(result)
-            return Model(**processed_result)
-        return None
+        return Model.model_validate(result) if result else None
 
     def create_model(self, model: ModelCreate) -> Model:
         import os
@@ -163,7 +351,7 @@ class ModelRepository:
             file_size = os.path.getsize(model.file_path)
         
         # 处理标签
-        labels_json = json.dumps(model.labels) if model.labels else None
+        labels_json = json_dumps(model.labels) if model.labels else None
         
         query = """
         INSERT INTO models (name, version, type, file_path, file_size, input_size, 
@@ -185,11 +373,26 @@ class ModelRepository:
             'active',   # 默认状态
             labels_json  # labels字段
         ), commit=True, last_row_id=True)
-        return self.get_model_by_id(model_id)
+        self.invalidate_name_map()
+
+        # 直接由输入构造返回值，省去一次回查
+        now = datetime.now()
+        return Model(
+            id=model_id,
+            name=model.name,
+            version=model.version,
+            description=model.description,
+            file_path=model.file_path,
+            type=model.type,
+            labels=model.labels,
+            status='active',
+            upload_time=now,
+            update_time=now
+        )
 
     def update_model(self, model_id: int, model_update: ModelUpdate) -> Optional[Model]:
         """Updates a model's details."""
-        labels_json = json.dumps(model_update.labels) if model_update.labels is not None else None
+        labels_json = json_dumps(model_update.labels) if model_update.labels is not None else None
         
         # Build the update query dynamically to only update provided fields
         update_fields = []
@@ -218,11 +421,14 @@ class ModelRepository:
         params.append(model_id)
 
         self.db.execute_query(query, tuple(params), commit=True)
+        if model_update.name is not None:
+            self.invalidate_name_map()
         return self.get_model_by_id(model_id)
 
     def delete_model_by_id(self, model_id: int) -> bool:
         query = "DELETE FROM models WHERE id = %s"
         self.db.execute_query(query, (model_id,), commit=True)
+        self.invalidate_name_map()
         return True
 
     def update_model_status(self, model_id: int, status: str) -> bool:
@@ -238,9 +444,30 @@ class ModelRepository:
         result = self.db.execute_query(query, fetch='one')
         return result['total'] if result else 0
 
+# 任务/模型表的列名，导入时确定一次，逐行复制时不再遍历 Table.columns
+_TASK_COLUMNS = tuple(column.name for column in TaskDB.__table__.columns)
+_MODEL_COLUMNS = tuple(column.name for column in ModelDB.__table__.columns)
+
+
+def _detach_task(task: TaskDB) -> TaskDB:
+    """复制任务及其关联模型的列值到新的未绑定会话的对象，供会话关闭后使用"""
+    new_task = TaskDB()
+    for name in _TASK_COLUMNS:
+        setattr(new_task, name, getattr(task, name))
+
+    model = task.model
+    if model:
+        new_model = ModelDB()
+        for name in _MODEL_COLUMNS:
+            setattr(new_model, name, getattr(model, name))
+        new_task.model = new_model
+
+    return new_task
+
+
 class TaskRepository:
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = get_db()
 
     def get_task_by_id(self, task_id: int) -> Optional[TaskDB]:
         with self.db.get_session() as session:
@@ -250,24 +477,29 @@ class TaskRepository:
                 return None
             
             # Create a new detached Task object with all data loaded
-            new_task = TaskDB()
-            
-            # Copy all basic attributes
-            for column in TaskDB.__table__.columns:
-                setattr(new_task, column.name, getattr(task, column.name))
-            
-            # Handle the model relationship
-            if task.model:
-                new_model = type(task.model)()  # Create new Model instance
-                for column in task.model.__table__.columns:
-                    setattr(new_model, column.name, getattr(task.model, column.name))
-                new_task.model = new_model
-            
-            return new_task
+            return _detach_task(task)
 
-    def get_all_tasks_for_scheduling(self) -> List[TaskDB]:
-        with self.db.get_session() as session:
-            return session.query(TaskDB).options(joinedload(TaskDB.model)).all()
+    _STREAM_TASKS_QUERY = (
+        "SELECT id, name, description, model_id, video_sources, status, is_enabled, "
+        "schedule_type, schedule_days, start_time, end_time, confidence_threshold, "
+        "alert_debounce_interval, inference_interval, alert_message, create_time, update_time "
+        "FROM tasks"
+    )
+
+    def stream_all_tasks(self, batch_size: int = 500) -> Iterator[Task]:
+        """
+        以非缓冲游标逐批读取全部任务并逐个产出，内存占用与批大小相关而与任务总数无关
+        
+        模型信息由缓存的名称映射补全（仅含 name）
+        """
+        name_map = ModelRepository().get_name_map()
+        rows = self.db.iter_query(self._STREAM_TASKS_QUERY, batch_size=batch_size)
+        columns = next(rows)
+        for row in rows:
+            data = dict(zip(columns, row))
+            name = name_map.get(data['model_id'])
+            data['model'] = {'name': name} if name is not None else None
+            yield Task.model_validate(data)
 
     def get_all_tasks(self, page: int = 1, page_size: int = 10, keyword: Optional[str] = None, 
                      status: Optional[str] = None, model_id: Optional[int] = None, 
@@ -301,61 +533,34 @@ class TaskRepository:
             tasks = query.options(joinedload(TaskDB.model)).order_by(TaskDB.create_time.desc()).offset(offset).limit(page_size).all()
             
             # Create new detached Task objects with all data loaded
-            task_list = []
-            for task in tasks:
-                # Create a new Task object with all attributes manually copied
-                new_task = TaskDB()
-                
-                # Copy all basic attributes
-                for column in TaskDB.__table__.columns:
-                    setattr(new_task, column.name, getattr(task, column.name))
-                
-                # Handle the model relationship
-                if task.model:
-                    new_model = type(task.model)()  # Create new Model instance
-                    for column in task.model.__table__.columns:
-                        setattr(new_model, column.name, getattr(task.model, column.name))
-                    new_task.model = new_model
-                
-                task_list.append(new_task)
+            task_list = [_detach_task(task) for task in tasks]
             
             return {"items": task_list, "total": total, "page": page, "page_size": page_size}
 
     def create_task(self, task: TaskCreate) -> TaskDB:
         with self.db.get_session() as session:
-            db_task = TaskDB(
-                **task.model_dump(exclude={"video_sources", "schedule_days"}),
-                video_sources=json.dumps(task.video_sources),
-                schedule_days=json.dumps(task.schedule_days)
-            )
+            # video_sources/schedule_days 是 JSON 列，由列类型负责序列化，直接传入列表
+            db_task = TaskDB(**task.model_dump())
             session.add(db_task)
             session.commit()
-            session.refresh(db_task)
             
             # Get the task with model relationship loaded before session closes
+            # (this query also reloads the committed row, so no separate refresh is needed)
             task_with_model = session.query(TaskDB).options(
                 joinedload(TaskDB.model)
             ).filter(TaskDB.id == db_task.id).first()
             
             # Create a new detached Task object with all data loaded
-            new_task = TaskDB()
-            
-            # Copy all basic attributes
-            for column in TaskDB.__table__.columns:
-                setattr(new_task, column.name, getattr(task_with_model, column.name))
-            
-            # Handle the model relationship
-            if task_with_model.model:
-                new_model = type(task_with_model.model)()  # Create new Model instance
-                for column in task_with_model.model.__table__.columns:
-                    setattr(new_model, column.name, getattr(task_with_model.model, column.name))
-                new_task.model = new_model
-            
-            return new_task
+            return _detach_task(task_with_model)
 
     def update_task(self, task_id: int, task: TaskCreate) -> Optional[TaskDB]:
         with self.db.get_session() as session:
-            db_task = session.get(TaskDB, task_id)
+            # Load the task together with its model up front; with expiry disabled the
+            # committed instance keeps its values, so no follow-up SELECT is needed
+            session.expire_on_commit = False
+            db_task = session.query(TaskDB).options(
+                joinedload(TaskDB.model)
+            ).filter(TaskDB.id == task_id).first()
             if not db_task:
                 return None
 
@@ -368,26 +573,15 @@ class TaskRepository:
             
             session.commit()
 
-            # Query the fresh instance with the relationship loaded
-            updated_task = session.query(TaskDB).options(
-                joinedload(TaskDB.model)
-            ).filter(TaskDB.id == task_id).first()
+            updated_task = db_task
+            # The loaded relationship is stale if the task was moved to another model
+            if 'model_id' in update_data and (
+                updated_task.model is None or updated_task.model.id != updated_task.model_id
+            ):
+                updated_task.model = session.get(ModelDB, updated_task.model_id)
             
             # Create a new detached Task object with all data loaded
-            new_task = TaskDB()
-            
-            # Copy all basic attributes
-            for column in TaskDB.__table__.columns:
-                setattr(new_task, column.name, getattr(updated_task, column.name))
-            
-            # Handle the model relationship
-            if updated_task.model:
-                new_model = type(updated_task.model)()  # Create new Model instance
-                for column in updated_task.model.__table__.columns:
-                    setattr(new_model, column.name, getattr(updated_task.model, column.name))
-                new_task.model = new_model
-            
-            return new_task
+            return _detach_task(updated_task)
 
     def delete_task(self, task_id: int) -> bool:
         with self.db.get_session() as session:
@@ -433,16 +627,17 @@ class TaskRepository:
             return session.query(TaskDB).count()
 
 class AlertRepository:
-    def __init__(self):
-        self.db = DatabaseManager()
+    # 高频点查询使用固定的 SQL 文本，作为预处理语句按连接缓存（查询列不含 JSON 列）
+    _BY_ID_QUERY = f"SELECT {_ALERT_COLUMNS_SQL} FROM alerts WHERE id = %s"
+    _LATEST_FOR_TASK_QUERY = f"""
+        SELECT {_ALERT_COLUMNS_SQL} FROM alerts 
+        WHERE task_id = %s AND detection_class = %s 
+        ORDER BY created_at DESC 
+        LIMIT 1
+        """
 
-    def _process_alert_row(self, row: dict) -> dict:
-        """Helper to process a raw row from the alerts table."""
-        if not row:
-            return None
-        # Pydantic will handle type conversions for most fields.
-        # This is a good place to handle complex types like JSON if they existed.
-        return row
+    def __init__(self):
+        self.db = get_db()
 
     def create_alert(self, alert: AlertCreate) -> Alert:
         query = """
@@ -454,7 +649,7 @@ class AlertRepository:
         """
         try:
             alert_id = self.db.execute_query(query, (
-                alert.title, alert.description, alert.level.value, alert.status.value,
+                alert.title, alert.description, alert.level, alert.status,
                 alert.confidence, alert.task_id, alert.task_name, alert.model_name,
                 alert.alert_image, alert.detection_class
             ), fetch=None, commit=True, last_row_id=True)
@@ -473,34 +668,56 @@ class AlertRepository:
             print(f"Database error on alert creation: {e}")
             return None
 
+    def bulk_create_alerts(self, alerts: List[AlertCreate], batch_size: int = BULK_INSERT_BATCH_SIZE) -> List[int]:
+        """批量写入告警，返回与 alerts 顺序一致的告警 id"""
+        rows = [
+            (
+                alert.title, alert.description, alert.level, alert.status,
+                alert.confidence, alert.task_id, alert.task_name, alert.model_name,
+                alert.alert_image, alert.detection_class
+            )
+            for alert in alerts
+        ]
+        return _bulk_insert(
+            self.db,
+            "INSERT INTO alerts (title, description, level, status, confidence, task_id, "
+            "task_name, model_name, alert_image, detection_class) VALUES ",
+            "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+            rows,
+            batch_size
+        )
+
     def get_alert_by_id(self, alert_id: int) -> Optional[Alert]:
-        query = "SELECT * FROM alerts WHERE id = %s"
-        result = self.db.execute_query(query, (alert_id,), fetch='one')
-        return Alert(**result) if result else None
+        result = self.db.execute_prepared(self._BY_ID_QUERY, (alert_id,), fetch='one')
+        return Alert.model_validate(result) if result else None
+
+    async def get_alert_by_id_async(self, alert_id: int) -> Optional[Alert]:
+        """get_alert_by_id 的异步版本"""
+        result = await self.db.execute_query_async(self._BY_ID_QUERY, (alert_id,), fetch='one')
+        return Alert.model_validate(result) if result else None
 
     def get_latest_alert_for_task(self, task_id: int, detection_class: str) -> Optional[Alert]:
-        query = """
-        SELECT * FROM alerts 
-        WHERE task_id = %s AND detection_class = %s 
-        ORDER BY created_at DESC 
-        LIMIT 1
-        """
-        result = self.db.execute_query(query, (task_id, detection_class), fetch='one')
-        return Alert(**self._process_alert_row(result)) if result else None
+        result = self.db.execute_prepared(self._LATEST_FOR_TASK_QUERY, (task_id, detection_class), fetch='one')
+        return Alert.model_validate(result) if result else None
 
-    def get_all_alerts(self, page: int = 1, page_size: int = 10, keyword: Optional[str] = None, level: Optional[str] = None, status: Optional[str] = None, start_date: Optional[str] = None, end_date: Optional[str] = None) -> dict:
+    def get_all_alerts(self, page: int = 1, page_size: int = 10, keyword: Optional[str] = None, level: Optional[str] = None, status: Optional[str] = None, start_date: Optional[str] = None, end_date: Optional[str] = None, cursor: Optional[str] = None) -> dict:
         """
         Retrieves a paginated list of alerts with optional filters.
+
+        传入 cursor（上一页返回的 next_cursor）时按 (created_at, id) 键集翻页，
+        查询代价只与 page_size 有关，不再随 OFFSET 增长；未传入时保持按页码分页。
         """
         count_query_base = "SELECT COUNT(*) as total FROM alerts"
-        query_base = "SELECT * FROM alerts"
+        # 总数由窗口函数随分页结果一并返回，只需一次查询
+        query_base = f"SELECT {_ALERT_COLUMNS_SQL}, COUNT(*) OVER() AS _total FROM alerts"
         
         where_clauses = []
         params = []
 
         if keyword:
-            where_clauses.append("(title LIKE %s OR description LIKE %s)")
-            params.extend([f"%{keyword}%", f"%{keyword}%"])
+            clause, keyword_params = _keyword_condition("title, description", keyword)
+            where_clauses.append(clause)
+            params.extend(keyword_params)
         if level:
             where_clauses.append("level = %s")
             params.append(level)
@@ -523,16 +740,37 @@ class AlertRepository:
             count_query = count_query_base
             query = query_base
             
-        total_result = self.db.execute_query(count_query, tuple(params), fetch='one')
-        total = total_result['total'] if total_result else 0
+        count_params = tuple(params)
         
-        query += " ORDER BY created_at DESC LIMIT %s OFFSET %s"
-        offset = (page - 1) * page_size
-        params.extend([page_size, offset])
+        if cursor:
+            # 游标条件不能参与 COUNT(*) OVER()，总数按过滤条件单独计数
+            after_created_at, after_id = decode_cursor(cursor)
+            query = f"SELECT {_ALERT_COLUMNS_SQL} FROM alerts"
+            where_clauses.append("(created_at, id) < (%s, %s)")
+            params.extend([after_created_at, after_id])
+            query += " WHERE " + " AND ".join(where_clauses)
+            query += " ORDER BY created_at DESC, id DESC LIMIT %s"
+            params.append(page_size)
+            result = self.db.execute_query(query, tuple(params), fetch='all')
+            count_result = self.db.execute_query(count_query, count_params, fetch='one')
+            total = count_result['total'] if count_result else 0
+        else:
+            query += " ORDER BY created_at DESC, id DESC LIMIT %s OFFSET %s"
+            offset = (page - 1) * page_size
+            params.extend([page_size, offset])
+            result = self.db.execute_query(query, tuple(params), fetch='all')
+            total = _page_total(self.db, result, offset, count_query, count_params)
         
-        result = self.db.execute_query(query, tuple(params), fetch='all')
-        items = [Alert(**row) for row in result]
-        return {"items": items, "total": total, "page": page, "page_size": page_size}
+        items = ALERT_LIST_ADAPTER.validate_python(result)
+        next_cursor = None
+        if len(items) == page_size:
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+        return {"items": items, "total": total, "page": page, "page_size": page_size, "next_cursor": next_cursor}
+
+    def clear_alert_image(self, image_path: str) -> int:
+        """去掉引用指定图片的告警的图片字段（图片写盘失败时调用），返回受影响的行数"""
+        query = "UPDATE alerts SET alert_image = NULL WHERE alert_image = %s"
+        return self.db.execute_query(query, (image_path,), fetch=None, commit=True)
 
     def update_alert_status(self, alert_id: int, status: str, remark: Optional[str] = None) -> Optional[Alert]:
         # This is a simplified update. A real implementation might involve logging the change.
@@ -541,42 +779,85 @@ class AlertRepository:
         self.db.execute_query(query, tuple(params), commit=True)
         return self.get_alert_by_id(alert_id)
 
+    _COUNTS_BY_STATUS_QUERY = "SELECT status, COUNT(*) as count FROM alerts GROUP BY status"
+    # 递归 CTE 生成连续日期，没有告警的日期也返回 0；按时间范围连接以便使用 created_at 索引。
+    # 日期用 CAST(... AS CHAR) 转为 YYYY-MM-DD，SQL 中不出现 %s 以外的 %：
+    # mysql.connector 不会把 %% 还原为 %，DATE_FORMAT 会原样输出格式串
+    _COUNTS_BY_DAY_QUERY = """
+        WITH RECURSIVE d (dt) AS (
+            SELECT CAST(%s AS DATE)
+            UNION ALL
+            SELECT dt + INTERVAL 1 DAY FROM d WHERE dt < %s
+        )
+        SELECT CAST(d.dt AS CHAR) AS date, COUNT(a.id) AS count
+        FROM d
+        LEFT JOIN alerts a ON a.created_at >= d.dt AND a.created_at < d.dt + INTERVAL 1 DAY
+        GROUP BY d.dt
+        ORDER BY d.dt
+        """
+    _LATEST_QUERY = f"SELECT {_ALERT_COLUMNS_SQL} FROM alerts ORDER BY created_at DESC LIMIT %s"
+
+    @staticmethod
+    def _day_range(days: int) -> tuple:
+        """返回最近 N 天的首日和末日（含）"""
+        last_date = datetime.utcnow().date()
+        return last_date - timedelta(days=days - 1), last_date
+
     def get_alert_counts_by_status(self) -> Dict[str, int]:
         """Counts alerts grouped by their status."""
-        query = "SELECT status, COUNT(*) as count FROM alerts GROUP BY status"
-        result = self.db.execute_query(query, fetch='all')
+        result = self.db.execute_query(self._COUNTS_BY_STATUS_QUERY, fetch='all')
         return {row['status']: row['count'] for row in result} if result else {}
 
     def get_alert_counts_by_day(self, days: int = 7) -> List[Dict[str, Any]]:
         """Counts alerts per day for the last N days."""
-        end_date = datetime.utcnow().date() + timedelta(days=1)
-        start_date = end_date - timedelta(days=days)
+        if days <= 0:
+            return []
+        result = self.db.execute_query(self._COUNTS_BY_DAY_QUERY, self._day_range(days), fetch='all')
+        return result or []
 
-        query = """
-        SELECT DATE(created_at) as date, COUNT(*) as count
-        FROM alerts
-        WHERE created_at >= %s AND created_at < %s
-        GROUP BY DATE(created_at)
-        ORDER BY date
+    def get_latest_alerts(self, limit: int = 5) -> List[Alert]:
+        """Gets the most recent alerts."""
+        result = self.db.execute_query(self._LATEST_QUERY, (limit,), fetch='all')
+        return ALERT_LIST_ADAPTER.validate_python(result) if result else []
+
+    def get_alerts_columnar(self, limit: int = 10, columns: tuple = ('id', 'created_at', 'level')) -> Dict[str, list]:
         """
-        params = [start_date, end_date]
+        按列返回最近的告警，如 {'id': [...], 'created_at': [...], 'level': [...]}
         
-        db_results = self.db.execute_query(query, tuple(params), fetch='all')
+        供只需少数字段的统计类接口使用，不逐行构造字典和 Alert 模型
         
-        # Create a dictionary for quick lookup
-        data_map = {item['date'].strftime('%Y-%m-%d'): item['count'] for item in db_results} if db_results else {}
-        
-        # Generate the full list of dates
-        date_list = [(start_date + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days)]
-        
-        return [{'date': d, 'count': data_map.get(d, 0)} for d in date_list]
+        Args:
+            limit: 返回的告警数
+            columns: 返回的列，须为 alerts 表的列名
+        """
+        query = f"SELECT {', '.join(columns)} FROM alerts ORDER BY created_at DESC LIMIT %s"
+        column_names, rows = self.db.execute_query(query, (limit,), fetch='all', dict_rows=False)
+        if not rows:
+            return {name: [] for name in column_names}
+        return {name: list(values) for name, values in zip(column_names, zip(*rows))}
 
-    def get_latest_alerts(self, limit: int = 5) -> List[Alert]:
-        """Gets the most recent alerts."""
-        query = "SELECT * FROM alerts ORDER BY created_at DESC LIMIT %s"
-        params = [limit]
-        result = self.db.execute_query(query, tuple(params), fetch='all')
-        return [Alert(**row) for row in result] if result else []
+    _RECENT_COUNT_QUERY = "SELECT COUNT(*) AS total FROM (SELECT 1 FROM alerts LIMIT %s) AS recent"
+
+    def get_recent_alert_count(self, limit: int = 10) -> int:
+        """最近告警的条数（最多 limit 条），只在服务端计数，不传输告警行"""
+        result = self.db.execute_query(self._RECENT_COUNT_QUERY, (limit,), fetch='one')
+        return result['total'] if result else 0
+
+    # 以下异步版本供 API 路由在事件循环中直接 await，多条统计查询可并发执行
+
+    async def get_alert_counts_by_status_async(self) -> Dict[str, int]:
+        result = await self.db.execute_query_async(self._COUNTS_BY_STATUS_QUERY, fetch='all')
+        return {row['status']: row['count'] for row in result} if result else {}
+
+    async def get_alert_counts_by_day_async(self, days: int = 7) -> List[Dict[str, Any]]:
+        if days <= 0:
+            return []
+        result = await self.db.execute_query_async(self._COUNTS_BY_DAY_QUERY, self._day_range(days), fetch='all')
+        return result or []
+
+    async def get_latest_alerts_async(self, limit: int = 5) -> List[Alert]:
+        result = await self.db.execute_query_async(self._LATEST_QUERY, (limit,), fetch='all')
+        return ALERT_LIST_ADAPTER.validate_python(result) if result else []
 
     def delete_alerts_older_than(self, days: int, alert_image_dir: str) -> int:
         """
@@ -652,7 +933,7 @@ class AlertRepository:
 
 class InferenceRepository:
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = get_db()
 
     def create_record(self, record: InferenceRecordCreate) -> InferenceRecord:
         query = """
@@ -678,16 +959,16 @@ class InferenceRepository:
         LIMIT 1
         """
         result = self.db.execute_query(query, (user_id,), fetch='one')
-        return InferenceRecord(**result) if result else None
+        return InferenceRecord.model_validate(result) if result else None
 
     def get_user_records(self, user_id: int) -> List[InferenceRecord]:
         query = "SELECT * FROM inference_records WHERE user_id = %s"
         result = self.db.execute_query(query, (user_id,), fetch='all')
-        return [InferenceRecord(**row) for row in result]
+        return [InferenceRecord.model_validate(row) for row in result]
 
 class SystemConfigRepository:
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = get_db()
 
     def get_all_configs(self) -> Dict[str, Any]:
         query = "SELECT `key`, `value` FROM system_configs"
@@ -697,8 +978,8 @@ class SystemConfigRepository:
         for row in results:
             try:
                 # Attempt to parse value as JSON, otherwise keep as string
-                configs[row['key']] = json.loads(row['value'])
-            except (json.JSONDecodeError, TypeError):
+                configs[row['key']] = json_loads(row['value'])
+            except (JSONDecodeError, TypeError):
                 configs[row['key']] = row['value']
         return configs
 
@@ -707,8 +988,8 @@ class SystemConfigRepository:
         result = self.db.execute_query(query, (key,), fetch='one')
         if result and result['value']:
             try:
-                return json.loads(result['value'])
-            except (json.JSONDecodeError, TypeError):
+                return json_loads(result['value'])
+            except (JSONDecodeError, TypeError):
                 return result['value']
         return None
 
@@ -719,7 +1000,7 @@ class SystemConfigRepository:
             
             for key, value in configs.items():
                 # Serialize complex types (dict, list) to a JSON string
-                value_to_store = json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+                value_to_store = json_dumps(value) if isinstance(value, (dict, list)) else str(value)
                 
                 # Use INSERT ... ON DUPLICATE KEY UPDATE to handle both new and existing keys
                 query = """
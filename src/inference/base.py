@@ -7,6 +7,7 @@ import time
 import logging
 from abc import ABC, abstractmethod
 from typing import List, Tuple, Dict, Any, Optional
+import cv2
 import numpy as np
 
 logger = logging.getLogger(__name__)
@@ -48,6 +49,8 @@ class InferenceEngine(ABC):
         self.nms_threshold = self.config.get('nms_threshold', 0.4)
         self.input_size = self.config.get('input_size', (640, 640))
         self.labels = self.config.get('labels', ['person'])
+        # 模型输入是否为动态 batch 维度，由子类在加载模型时设置
+        self.supports_batch = False
         
         logger.info(f"初始化推理引擎: {self.__class__.__name__}")
         logger.info(f"配置参数: {self.config}")
@@ -145,6 +148,74 @@ class InferenceEngine(ABC):
             logger.error(f"检测过程出错: {e}")
             raise
     
+    def detect_batch(self, images: List[np.ndarray]) -> List[Tuple[List[Dict[str, Any]], float]]:
+        """
+        批量检测，模型支持动态 batch 时合并为一次推理，否则逐张检测
+        
+        Args:
+            images: 输入图像列表 (H, W, C)
+            
+        Returns:
+            List[Tuple[List[Dict], float]]: 与输入顺序一致的 (检测结果, 推理耗时) 列表
+        """
+        if not self.supports_batch or len(images) == 1:
+            return [self.detect(image) for image in images]
+        
+        if not self.is_loaded:
+            raise RuntimeError("模型未加载，请先调用 load_model()")
+        
+        start_time = time.time()
+        
+        try:
+            input_data = np.concatenate([self.preprocess(image) for image in images], axis=0)
+            outputs = self.infer(input_data)
+            
+            results = [
+                self.postprocess([output[i:i + 1] for output in outputs], image.shape[:2])
+                for i, image in enumerate(images)
+            ]
+            
+            # 耗时按样本均摊
+            inference_time = (time.time() - start_time) / len(images)
+            for _ in images:
+                self._update_performance_stats(inference_time)
+            
+            logger.debug(f"批量检测完成，batch={len(images)}，单张耗时 {inference_time:.4f}s")
+            
+            return [(detections, inference_time) for detections in results]
+            
+        except Exception as e:
+            logger.error(f"批量检测过程出错: {e}")
+            raise
+    
+    def filter_detections(self, detections: List[Dict[str, Any]],
+                          confidence_threshold: Optional[float] = None,
+                          nms_threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        按调用方给定的阈值再过滤一次检测结果（批量推理统一使用引擎阈值，按请求区分的阈值在推理后应用）
+        
+        只能在引擎阈值的基础上收紧：置信度阈值低于引擎阈值、NMS 阈值高于引擎阈值时不起作用
+        
+        Args:
+            detections: detect 返回的检测结果
+            confidence_threshold: 置信度阈值，None 表示使用引擎阈值
+            nms_threshold: NMS IoU 阈值，None 表示使用引擎阈值
+            
+        Returns:
+            List[Dict]: 过滤后的检测结果
+        """
+        if confidence_threshold is not None and confidence_threshold > self.confidence_threshold:
+            detections = [d for d in detections if d['confidence'] >= confidence_threshold]
+        
+        if nms_threshold is not None and nms_threshold < self.nms_threshold and len(detections) > 1:
+            # bbox 为 [x1, y1, x2, y2]，NMSBoxes 需要 [x, y, w, h]
+            boxes = [[x1, y1, x2 - x1, y2 - y1] for x1, y1, x2, y2 in (d['bbox'] for d in detections)]
+            scores = [float(d['confidence']) for d in detections]
+            keep = cv2.dnn.NMSBoxes(boxes, scores, 0.0, nms_threshold)
+            detections = [detections[i] for i in sorted(np.asarray(keep, dtype=np.int64).flatten().tolist())]
+        
+        return detections
+    
     def _update_performance_stats(self, inference_time: float):
         """更新性能统计"""
         self.performance_stats['total_inferences'] += 1
@@ -0,0 +1,113 @@
+"""
+推理微批处理
+将并发请求的图像合并为一次推理调用，摊薄每次推理的固定开销
+"""
+
+import asyncio
+import logging
+import os
+from typing import List, Dict, Any, Tuple, Optional
+
+import numpy as np
+
+from .base import InferenceEngine
+
+logger = logging.getLogger(__name__)
+
+BATCH_WINDOW_MS = float(os.getenv('INFERENCE_BATCH_WINDOW_MS', '8'))
+MAX_BATCH = int(os.getenv('INFERENCE_MAX_BATCH', '16'))
+
+
+class InferenceBatcher:
+    """推理微批处理器"""
+
+    def __init__(self, engine: InferenceEngine, max_batch: int = MAX_BATCH, window_ms: float = BATCH_WINDOW_MS):
+        """
+        初始化微批处理器
+
+        Args:
+            engine: 推理引擎
+            max_batch: 单次推理的最大图像数
+            window_ms: 收到首个请求后等待合批的时间窗口（毫秒）
+        """
+        self.engine = engine
+        # 模型不支持动态 batch 时退化为串行逐张推理
+        self.max_batch = max_batch if engine.supports_batch else 1
+        self.window = window_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        """启动后台合批任务（需在事件循环中调用）"""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+            logger.info(f"推理微批处理已启动: max_batch={self.max_batch}, window={self.window * 1000:.0f}ms")
+
+    async def stop(self):
+        """停止后台合批任务"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        # 未处理的请求直接失败，避免调用方永久等待
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("推理微批处理已停止"))
+
+    async def detect(self, image: np.ndarray) -> Tuple[List[Dict[str, Any]], float]:
+        """
+        提交单张图像并等待检测结果
+
+        Args:
+            image: 输入图像 (H, W, C)
+
+        Returns:
+            Tuple[List[Dict], float]: (检测结果, 推理耗时)
+        """
+        if self._worker is None:
+            raise RuntimeError("推理微批处理未启动")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, future))
+        return await future
+
+    async def _run(self):
+        """收集时间窗口内的请求，合并后在线程池中推理"""
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.window
+                while len(batch) < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                images = [image for image, _ in batch]
+                try:
+                    results = await asyncio.to_thread(self.engine.detect_batch, images)
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            # 停止时仍在处理中的请求直接失败
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("推理微批处理已停止"))
@@ -19,6 +19,8 @@ from .base import InferenceEngine
 
 logger = logging.getLogger(__name__)
 
+_INV_255 = np.float32(1.0 / 255.0)
+
 
 class CPUInference(InferenceEngine):
     """CPU推理引擎"""
@@ -43,6 +45,8 @@ class CPUInference(InferenceEngine):
         # CPU特定配置
         self.num_threads = self.config.get('num_threads', 4)
         self.use_fp16 = self.config.get('use_fp16', False)
+        # 模型导出时已内置 BGR->RGB 通道交换的，配置 input_channel_order: bgr 跳过运行时交换
+        self.input_channel_order = str(self.config.get('input_channel_order', 'rgb')).lower()
         
         logger.info(f"CPU推理引擎配置: threads={self.num_threads}, fp16={self.use_fp16}")
     
@@ -85,6 +89,8 @@ class CPUInference(InferenceEngine):
             
             # 获取输入尺寸
             input_shape = self.session.get_inputs()[0].shape
+            # batch 维度为符号名或 None 时表示导出时启用了动态 batch
+            self.supports_batch = bool(input_shape) and not isinstance(input_shape[0], int)
             if len(input_shape) == 4:
                 # 处理动态尺寸（可能是字符串）
                 try:
@@ -101,6 +107,7 @@ class CPUInference(InferenceEngine):
             logger.info(f"输入名称: {self.input_name}")
             logger.info(f"输出名称: {self.output_names}")
             logger.info(f"输入尺寸: {self.input_size}")
+            logger.info(f"动态batch: {self.supports_batch}")
             
             return True
             
@@ -121,18 +128,14 @@ class CPUInference(InferenceEngine):
         # 调整尺寸
         resized = cv2.resize(image, self.input_size)
         
-        # BGR转RGB
-        if len(resized.shape) == 3 and resized.shape[2] == 3:
-            resized = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
-        
-        # 归一化到 [0, 1]
-        normalized = resized.astype(np.float32) / 255.0
+        # 转换为 (C, H, W) 视图；BGR转RGB 通过通道维反向索引完成，不再单独 cvtColor 复制整幅图像
+        chw = np.transpose(resized, (2, 0, 1))
+        if self.input_channel_order == 'rgb' and chw.shape[0] == 3:
+            chw = chw[::-1]
         
-        # 转换为 (C, H, W) 格式
-        transposed = np.transpose(normalized, (2, 0, 1))
-        
-        # 添加batch维度 (1, C, H, W)
-        batched = np.expand_dims(transposed, axis=0)
+        # 归一化到 [0, 1]，直接写入 (1, C, H, W) 连续张量
+        batched = np.empty((1,) + chw.shape, dtype=np.float32)
+        np.multiply(chw, _INV_255, out=batched[0])
         
         return batched
     
@@ -199,86 +202,74 @@ class CPUInference(InferenceEngine):
     
     def _process_xyxy_format(self, output: np.ndarray, original_shape: Tuple[int, int]) -> List[Dict[str, Any]]:
         """处理xyxy格式的输出"""
-        detections = []
         orig_h, orig_w = original_shape
         
-        for detection in output:
-            x1, y1, x2, y2, confidence, class_id = detection
-            
-            if confidence < self.confidence_threshold:
-                continue
-            
-            # 坐标缩放到原始图像尺寸
-            x1 = int(x1 * orig_w / self.input_size[0])
-            y1 = int(y1 * orig_h / self.input_size[1])
-            x2 = int(x2 * orig_w / self.input_size[0])
-            y2 = int(y2 * orig_h / self.input_size[1])
-            
-            # 确保坐标在有效范围内
-            x1 = max(0, min(x1, orig_w))
-            y1 = max(0, min(y1, orig_h))
-            x2 = max(0, min(x2, orig_w))
-            y2 = max(0, min(y2, orig_h))
-            
-            detections.append({
-                'bbox': [x1, y1, x2, y2],
-                'confidence': float(confidence),
-                'class_id': int(class_id),
-                'label': self.labels[int(class_id)] if int(class_id) < len(self.labels) else f'class_{int(class_id)}'
-            })
+        keep = output[:, 4] >= self.confidence_threshold
+        output = output[keep]
         
-        return detections
+        # 坐标缩放到原始图像尺寸
+        x1 = output[:, 0] * orig_w / self.input_size[0]
+        y1 = output[:, 1] * orig_h / self.input_size[1]
+        x2 = output[:, 2] * orig_w / self.input_size[0]
+        y2 = output[:, 3] * orig_h / self.input_size[1]
+        
+        boxes = self._clip_boxes(x1, y1, x2, y2, orig_w, orig_h)
+        return self._to_detections(boxes, output[:, 4], output[:, 5].astype(np.int64))
     
     def _process_yolo_format(self, output: np.ndarray, original_shape: Tuple[int, int]) -> List[Dict[str, Any]]:
         """处理YOLO格式的输出"""
-        detections = []
         orig_h, orig_w = original_shape
         
-        for detection in output:
-            # YOLO格式: [x_center, y_center, width, height, confidence, class_probs...]
-            x_center, y_center, width, height, obj_conf = detection[:5]
-            class_probs = detection[5:]
-            
-            # 找到最高概率的类别
-            class_id = np.argmax(class_probs)
-            class_conf = class_probs[class_id]
-            confidence = obj_conf * class_conf
-            
-            if confidence < self.confidence_threshold:
-                continue
-            
-            # 转换为xyxy格式
-            x1 = int((x_center - width / 2) * orig_w / self.input_size[0])
-            y1 = int((y_center - height / 2) * orig_h / self.input_size[1])
-            x2 = int((x_center + width / 2) * orig_w / self.input_size[0])
-            y2 = int((y_center + height / 2) * orig_h / self.input_size[1])
-            
-            # 确保坐标在有效范围内
-            x1 = max(0, min(x1, orig_w))
-            y1 = max(0, min(y1, orig_h))
-            x2 = max(0, min(x2, orig_w))
-            y2 = max(0, min(y2, orig_h))
-            
-            detections.append({
-                'bbox': [x1, y1, x2, y2],
-                'confidence': float(confidence),
-                'class_id': int(class_id),
-                'label': self.labels[int(class_id)] if int(class_id) < len(self.labels) else f'class_{int(class_id)}'
-            })
+        # YOLO格式: [x_center, y_center, width, height, confidence, class_probs...]
+        # 整列向量化计算，只为 NMS 保留下来的目标构造字典
+        class_probs = output[:, 5:]
+        class_ids = np.argmax(class_probs, axis=1)
+        confidences = output[:, 4] * class_probs[np.arange(len(output)), class_ids]
+        
+        keep = confidences >= self.confidence_threshold
+        output, class_ids, confidences = output[keep], class_ids[keep], confidences[keep]
+        
+        x_center, y_center, width, height = output[:, 0], output[:, 1], output[:, 2], output[:, 3]
+        
+        # 转换为xyxy格式
+        x1 = (x_center - width / 2) * orig_w / self.input_size[0]
+        y1 = (y_center - height / 2) * orig_h / self.input_size[1]
+        x2 = (x_center + width / 2) * orig_w / self.input_size[0]
+        y2 = (y_center + height / 2) * orig_h / self.input_size[1]
+        
+        boxes = self._clip_boxes(x1, y1, x2, y2, orig_w, orig_h)
         
         # 应用NMS
-        detections = self._apply_nms(detections)
+        indices = self._apply_nms(boxes, confidences)
         
-        return detections
+        return self._to_detections(boxes[indices], confidences[indices], class_ids[indices])
     
-    def _apply_nms(self, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """应用非极大值抑制"""
-        if not detections:
-            return detections
-        
-        # 转换为numpy数组进行NMS
-        boxes = np.array([det['bbox'] for det in detections])
-        scores = np.array([det['confidence'] for det in detections])
+    @staticmethod
+    def _clip_boxes(x1: np.ndarray, y1: np.ndarray, x2: np.ndarray, y2: np.ndarray,
+                    orig_w: int, orig_h: int) -> np.ndarray:
+        """坐标向零取整并限制在图像范围内，返回 (N, 4) 整数数组"""
+        boxes = np.stack([x1, y1, x2, y2], axis=1).astype(np.int64)
+        np.clip(boxes[:, 0::2], 0, orig_w, out=boxes[:, 0::2])
+        np.clip(boxes[:, 1::2], 0, orig_h, out=boxes[:, 1::2])
+        return boxes
+    
+    def _to_detections(self, boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray) -> List[Dict[str, Any]]:
+        """将检测数组整理为检测结果字典列表"""
+        num_labels = len(self.labels)
+        return [
+            {
+                'bbox': bbox,
+                'confidence': confidence,
+                'class_id': class_id,
+                'label': self.labels[class_id] if class_id < num_labels else f'class_{class_id}'
+            }
+            for bbox, confidence, class_id in zip(boxes.tolist(), scores.tolist(), class_ids.tolist())
+        ]
+    
+    def _apply_nms(self, boxes: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """应用非极大值抑制，返回保留目标的索引"""
+        if len(boxes) == 0:
+            return np.empty(0, dtype=np.int64)
         
         # 使用OpenCV的NMS
         indices = cv2.dnn.NMSBoxes(
@@ -288,11 +279,7 @@ class CPUInference(InferenceEngine):
             self.nms_threshold
         )
         
-        if len(indices) > 0:
-            indices = indices.flatten()
-            return [detections[i] for i in indices]
-        
-        return []
+        return np.asarray(indices, dtype=np.int64).flatten()
     
     def release_resources(self):
         """释放资源"""
@@ -5,10 +5,17 @@
 
 import cv2
 import numpy as np
+from functools import lru_cache
 from typing import Tuple, List, Optional
 from utils.logging import logger
 
 
+@lru_cache(maxsize=256)
+def _label_size(class_name: str) -> Tuple[int, int]:
+    """标签文字尺寸，按类别缓存（Hershey 字体数字等宽，分数取 0.99 测量）"""
+    return cv2.getTextSize(f"{class_name}: 0.99", cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
+
+
 class ImageProcessor:
     """图像处理器"""
     
@@ -191,7 +198,7 @@ class ImageProcessor:
                 
                 # 绘制标签
                 label = f"{class_name}: {confidence:.2f}"
-                label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
+                label_size = _label_size(class_name)
                 
                 # 标签背景
                 cv2.rectangle(result_image, 
@@ -3,27 +3,140 @@
 支持结构化日志输出，适配容器化环境
 """
 
+import atexit
+import json
 import logging
+import queue
 import sys
 import os
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from pythonjsonlogger import jsonlogger
-from typing import Optional
+from typing import Any, Optional
 
+# 日志中 dict/list 消息的序列化：优先使用 C 实现的 orjson，未安装时回退到标准库
+try:
+    import orjson
+    
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(
+            obj, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode('utf-8')
+except ImportError:
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, default=str)
 
-class AtlasLogger:
-    """AI Edge 系统日志管理器"""
+
+class _JsonLazy:
+    """
+    延迟序列化的日志参数，由日志监听线程在输出时执行 json.dumps
     
-    def __init__(self, name: str = "atlas_vision", level: str = "INFO"):
-        self.logger = logging.getLogger(name)
-        self.logger.setLevel(getattr(logging, level.upper()))
+    控制台和文件处理器各自格式化同一条记录，序列化结果缓存后复用
+    """
+    
+    __slots__ = ('obj', '_text')
+    
+    def __init__(self, obj: Any):
+        self.obj = obj
+        self._text = None
+    
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = _json_dumps(self.obj)
+        return self._text
+
+
+# 日志队列上限。队列满时丢弃新记录而不是阻塞：
+# 推理/视频线程不能因日志落盘变慢而被拖住，丢弃数量记录在 _DropQueueHandler.dropped
+LOG_QUEUE_SIZE = 65536
+
+
+class _DropQueueHandler(QueueHandler):
+    """有界队列处理器，队列满时丢弃记录并计数"""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        直接入队原始记录
         
-        # 避免重复添加处理器
-        if not self.logger.handlers:
-            self._setup_handlers()
+        默认实现会在调用线程中执行 self.format(record)（msg % args、_JsonLazy 序列化），
+        以便记录可以跨进程 pickle；这里的队列只在进程内使用，格式化全部留给监听线程中的处理器。
+        因此作为日志参数传入的对象在记录输出前不应再被修改
+        """
+        return record
     
-    def _setup_handlers(self):
-        """设置日志处理器"""
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _CachedTimeFormatter(logging.Formatter):
+    """
+    asctime 的秒级部分按秒缓存，每条记录只拼接毫秒，输出与默认 Formatter 完全一致
+    
+    仅由日志监听线程调用，无需加锁
+    """
+    
+    def __init__(self, fmt: str):
+        super().__init__(fmt)
+        self._time_cache = (None, '')
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, text = self._time_cache
+        if cached_second != second:
+            text = time.strftime(self.default_time_format, self.converter(second))
+            self._time_cache = (second, text)
+        return self.default_msec_format % (text, record.msecs)
+
+
+# LogRecord 自带的属性，其余属性即为 extra 传入的结构化字段
+_RECORD_ATTRS = frozenset(logging.LogRecord('', 0, '', 0, '', None, None).__dict__) | {'message', 'asctime'}
+
+
+class _KeyValueFormatter(_CachedTimeFormatter):
+    """普通文本格式，在消息后以 key=value 形式附加 extra 字段（普通 Formatter 会直接丢弃这些字段）"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = [
+            f"{key}={value}" for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRS and value is not None
+        ]
+        if fields:
+            text = f"{text} {' '.join(fields)}"
+        return text
+
+
+# 本地环境使用的普通格式，模块加载时创建一次
+_PLAIN_FORMATTER = _KeyValueFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+_queue_handler: Optional[_DropQueueHandler] = None
+_queue_handler_lock = threading.Lock()
+
+
+def _shared_queue_handler() -> _DropQueueHandler:
+    """
+    获取进程内共享的队列处理器
+    
+    各模块的 AtlasLogger 共用同一组控制台/文件处理器和同一个监听线程，
+    同一个日志文件只打开一次，不再每个模块各持有一个文件句柄
+    """
+    global _queue_handler
+    with _queue_handler_lock:
+        if _queue_handler is not None:
+            return _queue_handler
+        
         # 控制台输出
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.DEBUG)
@@ -37,12 +150,9 @@ class AtlasLogger:
             )
         else:
             # 本地环境使用普通格式
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
+            formatter = _PLAIN_FORMATTER
         
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
         
         # 文件输出
         log_dir = "logs"
@@ -52,31 +162,69 @@ class AtlasLogger:
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(logging.INFO)
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        
+        # 调用线程只负责入队，控制台和文件写入由后台监听线程完成
+        log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _queue_handler = _DropQueueHandler(log_queue)
+        listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+        listener.start()
+        # 退出时停止监听线程，队列中剩余的记录会先写完
+        atexit.register(listener.stop)
+        return _queue_handler
+
+
+class AtlasLogger:
+    """AI Edge 系统日志管理器"""
+    
+    def __init__(self, name: str = "atlas_vision", level: str = "INFO"):
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(getattr(logging, level.upper()))
+        
+        # 避免重复添加处理器
+        if not self.logger.handlers:
+            self._setup_handlers()
+    
+    def _setup_handlers(self):
+        """设置日志处理器"""
+        self.logger.addHandler(_shared_queue_handler())
+    
+    def isEnabledFor(self, level: int) -> bool:
+        """判断指定级别的日志是否会被输出"""
+        return self.logger.isEnabledFor(level)
+    
+    def _log(self, level: int, message: Any, args: tuple, kwargs: dict):
+        """级别未启用时直接返回；消息格式化推迟到日志监听线程输出时"""
+        if not self.logger.isEnabledFor(level):
+            return
+        if isinstance(message, (dict, list)):
+            message, args = "%s", (_JsonLazy(message),)
+        self.logger.log(level, message, *args, extra=kwargs)
     
-    def debug(self, message: str, **kwargs):
+    def debug(self, message: Any, /, *args, **kwargs):
         """调试日志"""
-        self.logger.debug(message, extra=kwargs)
+        self._log(logging.DEBUG, message, args, kwargs)
     
-    def info(self, message: str, **kwargs):
+    def info(self, message: Any, /, *args, **kwargs):
         """信息日志"""
-        self.logger.info(message, extra=kwargs)
+        self._log(logging.INFO, message, args, kwargs)
     
-    def warning(self, message: str, **kwargs):
+    def warning(self, message: Any, /, *args, **kwargs):
         """警告日志"""
-        self.logger.warning(message, extra=kwargs)
+        self._log(logging.WARNING, message, args, kwargs)
     
-    def error(self, message: str, **kwargs):
+    def error(self, message: Any, /, *args, **kwargs):
         """错误日志"""
-        self.logger.error(message, extra=kwargs)
+        self._log(logging.ERROR, message, args, kwargs)
     
-    def critical(self, message: str, **kwargs):
+    def critical(self, message: Any, /, *args, **kwargs):
         """严重错误日志"""
-        self.logger.critical(message, extra=kwargs)
+        self._log(logging.CRITICAL, message, args, kwargs)
     
     def log_inference(self, model_name: str, inference_time: float, 
                      confidence: float, class_name: str):
         """记录推理性能日志"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         self.info("推理完成", 
                  model=model_name,
                  inference_time_ms=inference_time * 1000,
@@ -86,6 +234,8 @@ class AtlasLogger:
     def log_alert(self, alert_type: str, confidence: float, 
                   class_name: str, image_path: Optional[str] = None):
         """记录告警日志"""
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         self.warning("告警触发",
                     alert_type=alert_type,
                     confidence=confidence,
@@ -95,10 +245,12 @@ class AtlasLogger:
     def log_push(self, protocol: str, success: bool, 
                  message: str, response_time: float = None):
         """记录推送日志"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         self.info("推送完成",
                  protocol=protocol,
                  success=success,
-                 message=message,
+                 detail=message,
                  response_time_ms=response_time * 1000 if response_time else None)
 
 
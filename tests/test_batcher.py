@@ -0,0 +1,90 @@
+"""
+推理微批处理测试（使用假推理引擎）
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from inference.batcher import InferenceBatcher
+
+
+class _FakeEngine:
+    """按图像像素值返回结果的假推理引擎，记录每次 detect_batch 的批大小"""
+
+    def __init__(self, supports_batch=True, fail=False):
+        self.supports_batch = supports_batch
+        self.fail = fail
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def detect_batch(self, images):
+        with self._lock:
+            self.batch_sizes.append(len(images))
+        if self.fail:
+            raise RuntimeError("inference failed")
+        return [([{"value": int(image[0, 0, 0])}], 0.01) for image in images]
+
+
+def _image(value):
+    return np.full((4, 4, 3), value, dtype=np.uint8)
+
+
+async def _detect_all(batcher, count):
+    batcher.start()
+    try:
+        return await asyncio.gather(*(batcher.detect(_image(i)) for i in range(count)))
+    finally:
+        await batcher.stop()
+
+
+def test_concurrent_requests_are_merged_and_results_fanned_out():
+    """并发请求合并为批推理，每个请求拿到自己图像的结果"""
+    engine = _FakeEngine()
+    batcher = InferenceBatcher(engine, max_batch=4, window_ms=50)
+
+    results = asyncio.run(_detect_all(batcher, 10))
+
+    assert [detections[0]["value"] for detections, _ in results] == list(range(10))
+    assert engine.batch_sizes == [4, 4, 2]
+
+
+def test_engine_without_batch_support_runs_one_image_at_a_time():
+    """模型不支持动态 batch 时逐张推理"""
+    engine = _FakeEngine(supports_batch=False)
+    batcher = InferenceBatcher(engine, max_batch=8, window_ms=50)
+
+    results = asyncio.run(_detect_all(batcher, 3))
+
+    assert len(results) == 3
+    assert engine.batch_sizes == [1, 1, 1]
+
+
+def test_inference_error_is_raised_for_every_request_in_batch():
+    """批推理失败时同批所有请求都收到异常"""
+    engine = _FakeEngine(fail=True)
+    batcher = InferenceBatcher(engine, max_batch=4, window_ms=50)
+
+    async def run():
+        batcher.start()
+        try:
+            return await asyncio.gather(
+                *(batcher.detect(_image(i)) for i in range(3)), return_exceptions=True
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert engine.batch_sizes == [3]
+
+
+def test_detect_requires_started_batcher():
+    """未启动时提交请求直接报错"""
+    batcher = InferenceBatcher(_FakeEngine())
+    with pytest.raises(RuntimeError):
+        asyncio.run(batcher.detect(_image(0)))
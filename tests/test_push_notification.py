@@ -0,0 +1,198 @@
+"""
+推送通知熔断器与发送队列测试（不连接外部服务）
+"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("yaml")
+
+from components import push_notification
+from components.push_notification import CircuitBreaker, SendQueue
+
+
+class _Clock:
+    """可手动推进的 time.monotonic 替身"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(push_notification.time, "monotonic", clock)
+    return clock
+
+
+def test_circuit_breaker_opens_after_consecutive_failures(clock):
+    """连续失败达到阈值后打开"""
+    breaker = CircuitBreaker("test", failure_threshold=3, cooldown=10.0)
+    breaker.record(False)
+    breaker.record(False)
+    assert not breaker.is_open
+    breaker.record(False)
+    assert breaker.is_open
+
+
+def test_circuit_breaker_success_resets_failure_count(clock):
+    """成功一次后重新计数"""
+    breaker = CircuitBreaker("test", failure_threshold=3, cooldown=10.0)
+    breaker.record(False)
+    breaker.record(False)
+    breaker.record(True)
+    breaker.record(False)
+    breaker.record(False)
+    assert not breaker.is_open
+
+
+def test_circuit_breaker_closes_after_cooldown(clock):
+    """冷却期结束后关闭，需重新累计失败才会再次打开"""
+    breaker = CircuitBreaker("test", failure_threshold=2, cooldown=10.0)
+    breaker.record(False)
+    breaker.record(False)
+
+    clock.now += 9.9
+    assert breaker.is_open
+    clock.now += 0.1
+    assert not breaker.is_open
+
+    breaker.record(False)
+    assert not breaker.is_open
+    breaker.record(False)
+    assert breaker.is_open
+
+
+def test_circuit_breaker_counts_failures_from_concurrent_threads():
+    """多个线程同时记录失败时不丢失计数"""
+    breaker = CircuitBreaker("test", failure_threshold=4000, cooldown=10.0)
+    barrier = threading.Barrier(4)
+
+    def fail_many():
+        barrier.wait()
+        for _ in range(1000):
+            breaker.record(False)
+
+    threads = [threading.Thread(target=fail_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert breaker.is_open
+
+
+def test_send_queue_rejects_items_when_full():
+    """队列满时拒绝入队，已入队的消息不受影响"""
+    queue = SendQueue("test", send_batch=lambda batch: None, max_size=3)
+    assert all(queue.put(i) for i in range(3))
+    assert not queue.put(3)
+    assert len(queue) == 3
+
+
+def test_send_queue_drain_sends_in_batches():
+    """drain 按 batch_size 分批发送并保持入队顺序"""
+    batches = []
+    queue = SendQueue("test", send_batch=batches.append, batch_size=4)
+    for i in range(10):
+        queue.put(i)
+
+    queue.drain()
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert len(queue) == 0
+    assert queue.put(10)
+
+
+def test_send_queue_worker_flushes_and_calls_on_idle():
+    """I/O 线程发送入队的消息，每轮发送后调用 on_idle"""
+    sent = []
+    idle = threading.Event()
+
+    def on_idle():
+        if len(sent) == 5:
+            idle.set()
+
+    queue = SendQueue("test", send_batch=sent.extend, batch_size=2, interval=0.01, on_idle=on_idle)
+    queue.start()
+    try:
+        for i in range(5):
+            queue.put(i)
+        assert idle.wait(timeout=2.0)
+    finally:
+        queue.stop()
+    assert sent == [0, 1, 2, 3, 4]
+
+
+def test_send_queue_worker_survives_send_errors():
+    """发送异常不会终止 I/O 线程"""
+    sent = []
+    done = threading.Event()
+
+    def send_batch(batch):
+        if batch == ["bad"]:
+            raise RuntimeError("send failed")
+        sent.extend(batch)
+        done.set()
+
+    queue = SendQueue("test", send_batch=send_batch, batch_size=1, interval=0.01)
+    queue.start()
+    try:
+        queue.put("bad")
+        queue.put("good")
+        assert done.wait(timeout=2.0)
+    finally:
+        queue.stop()
+    assert sent == ["good"]
+
+
+class _SlowPusher:
+    """构造时按配置延迟或失败的假推送器"""
+
+    def __init__(self, config):
+        if config.get("fail"):
+            raise RuntimeError("broker down")
+        time.sleep(config.get("delay", 0))
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_acquire_pusher_does_not_block_other_keys_while_connecting():
+    """某个推送器创建较慢时，其他配置的推送器可以立即获取；同一配置的并发获取共享同一实例"""
+    slow_config = {"delay": 0.5}
+    acquired = []
+    threads = [
+        threading.Thread(target=lambda: acquired.append(
+            push_notification._acquire_pusher("test", _SlowPusher, slow_config)))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+
+    start = time.monotonic()
+    other = push_notification._acquire_pusher("test", _SlowPusher, {"delay": 0})
+    assert time.monotonic() - start < 0.3
+
+    for thread in threads:
+        thread.join()
+    assert len({id(pusher) for pusher in acquired}) == 1
+
+    for _ in range(3):
+        push_notification._release_pusher("test", slow_config)
+    push_notification._release_pusher("test", {"delay": 0})
+    assert acquired[0].closed and other.closed
+
+
+def test_acquire_pusher_drops_reservation_when_creation_fails():
+    """创建失败时撤销占位，异常传给调用方"""
+    config = {"fail": True}
+    with pytest.raises(RuntimeError):
+        push_notification._acquire_pusher("test", _SlowPusher, config)
+    assert push_notification._pusher_key("test", config) not in push_notification._PUSHERS
@@ -0,0 +1,167 @@
+"""
+数据访问层纯逻辑测试（不连接数据库）
+"""
+
+import base64
+from datetime import date, datetime
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+pytest.importorskip("sqlalchemy")
+
+from database import repositories
+from database.repositories import AlertRepository, decode_cursor, encode_cursor
+
+
+def _render_mysql_connector(query: str, params: tuple) -> str:
+    """按 mysql.connector 游标的方式把参数代入 SQL"""
+    from mysql.connector.conversion import MySQLConverter
+    from mysql.connector.cursor import RE_PY_PARAM, _ParamSubstitutor
+
+    converter = MySQLConverter()
+    quoted = [converter.quote(converter.escape(converter.to_mysql(p))) for p in params]
+    return RE_PY_PARAM.sub(_ParamSubstitutor(quoted), query.encode()).decode()
+
+
+def test_counts_by_day_query_renders_without_percent_with_mysql_connector():
+    """mysql.connector 不还原 %%，代入参数后的 SQL 中不应残留 %"""
+    rendered = _render_mysql_connector(
+        AlertRepository._COUNTS_BY_DAY_QUERY, (date(2026, 1, 1), date(2026, 1, 7))
+    )
+    assert "%" not in rendered
+    assert "'2026-01-01'" in rendered and "'2026-01-07'" in rendered
+
+
+def test_counts_by_day_query_renders_without_percent_with_pymysql():
+    """asyncmy 与 PyMySQL 一样用 % 运算符代入参数，结果应与 mysql.connector 一致"""
+    converters = pytest.importorskip("pymysql.converters")
+    params = (date(2026, 1, 1), date(2026, 1, 7))
+    rendered = AlertRepository._COUNTS_BY_DAY_QUERY % tuple(converters.escape_item(p, 'utf8mb4') for p in params)
+    assert rendered == _render_mysql_connector(AlertRepository._COUNTS_BY_DAY_QUERY, params)
+
+
+def test_cursor_round_trip():
+    """游标编码后解码应得到原始的 (created_at, id)"""
+    created_at = datetime(2026, 3, 1, 12, 30, 45, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"no-separator").decode(),
+    base64.urlsafe_b64encode(b"2026-03-01T12:30:45:abc").decode(),
+    base64.urlsafe_b64encode(b"yesterday:1").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe:1").decode(),
+])
+def test_decode_cursor_rejects_invalid_input(cursor):
+    """格式无效的游标统一抛出 ValueError"""
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.fixture
+def fulltext_columns(monkeypatch):
+    """模拟 name, description 列已建有 FULLTEXT 索引"""
+    monkeypatch.setattr(repositories, "_fulltext_columns", {"name, description"})
+
+
+def test_keyword_condition_strips_boolean_operators(fulltext_columns):
+    """布尔模式运算符替换为空格，按短语检索"""
+    clause, params = repositories._keyword_condition("name, description", '+yolo-v5 "helmet"*')
+    assert clause == "MATCH(name, description) AGAINST(%s IN BOOLEAN MODE)"
+    assert params == ['"yolo v5 helmet"']
+
+
+def test_keyword_condition_falls_back_to_like_for_short_words(fulltext_columns):
+    """含短于 ngram 长度的词时回退为 LIKE，参数使用原始关键词"""
+    clause, params = repositories._keyword_condition("name, description", "v5 a")
+    assert clause == "(name LIKE %s OR description LIKE %s)"
+    assert params == ["%v5 a%", "%v5 a%"]
+
+
+def test_keyword_condition_falls_back_to_like_for_operator_only_keyword(fulltext_columns):
+    """只有运算符的关键词不能生成空的 MATCH 短语"""
+    clause, _ = repositories._keyword_condition("name, description", '+-"')
+    assert clause.startswith("(name LIKE")
+
+
+def test_keyword_condition_uses_like_without_fulltext_index(monkeypatch):
+    """未确认建有 FULLTEXT 索引的列使用 LIKE"""
+    monkeypatch.setattr(repositories, "_fulltext_columns", set())
+    clause, params = repositories._keyword_condition("title, description", "helmet")
+    assert clause == "(title LIKE %s OR description LIKE %s)"
+    assert params == ["%helmet%", "%helmet%"]
+
+
+class _FakeDB:
+    """记录执行的语句，LAST_INSERT_ID 按已插入行数递增"""
+
+    def __init__(self, next_id=100, fail_on_batch=None):
+        self.next_id = next_id
+        self.fail_on_batch = fail_on_batch
+        self.queries = []
+        self.events = []
+
+    def start_transaction(self):
+        self.events.append("start")
+
+    def execute_query(self, query, params, fetch=None, last_row_id=False):
+        if len(self.queries) == self.fail_on_batch:
+            raise RuntimeError("insert failed")
+        self.queries.append((query, params))
+        first_id = self.next_id
+        self.next_id += query.count("(%s, %s)")
+        return first_id
+
+    def commit(self):
+        self.events.append("commit")
+
+    def rollback(self):
+        self.events.append("rollback")
+
+    def close_transaction(self):
+        self.events.append("close")
+
+
+def test_bulk_insert_derives_ids_from_last_insert_id_per_batch():
+    """每批的 id 从该批 LAST_INSERT_ID 起连续分配"""
+    db = _FakeDB(next_id=100)
+    rows = [(i, f"row{i}") for i in range(5)]
+    ids = repositories._bulk_insert(db, "INSERT INTO t (a, b) VALUES ", "(%s, %s)", rows, batch_size=2)
+
+    assert ids == [100, 101, 102, 103, 104]
+    assert [q.count("(%s, %s)") for q, _ in db.queries] == [2, 2, 1]
+    assert db.queries[2][1] == (4, "row4")
+    assert db.events == ["start", "commit", "close"]
+
+
+def test_bulk_insert_keeps_ids_of_non_contiguous_batches():
+    """批次之间 id 不连续（如并发插入）时，各批仍以自己的 LAST_INSERT_ID 为起点"""
+    db = _FakeDB(next_id=10)
+    original = db.execute_query
+
+    def execute_query(query, params, fetch=None, last_row_id=False):
+        first_id = original(query, params, fetch, last_row_id)
+        db.next_id += 50  # 其他连接插入了 50 行
+        return first_id
+
+    db.execute_query = execute_query
+    ids = repositories._bulk_insert(db, "INSERT INTO t (a, b) VALUES ", "(%s, %s)", [(1, 2)] * 3, batch_size=2)
+    assert ids == [10, 11, 62]
+
+
+def test_bulk_insert_rolls_back_on_failure():
+    """任一批失败时整体回滚并抛出异常"""
+    db = _FakeDB(fail_on_batch=1)
+    with pytest.raises(RuntimeError):
+        repositories._bulk_insert(db, "INSERT INTO t (a, b) VALUES ", "(%s, %s)", [(1, 2)] * 3, batch_size=2)
+    assert db.events == ["start", "rollback", "close"]
+
+
+def test_bulk_insert_skips_empty_rows():
+    """没有数据时不开启事务"""
+    db = _FakeDB()
+    assert repositories._bulk_insert(db, "INSERT INTO t (a, b) VALUES ", "(%s, %s)", [], batch_size=2) == []
+    assert db.events == []